@@ -2,6 +2,7 @@
 """Base settings to build other settings files upon."""
 
 import ssl
+import tempfile
 from pathlib import Path
 
 import environ
@@ -406,3 +407,55 @@ MESSAGE_TAGS = {
 
 # django-libsass
 COMPRESS_PRECOMPILERS = (("text/x-scss", "django_libsass.SassCompiler"),)
+
+# hebcal
+# ------------------------------------------------------------------------------
+# Hebrew years of Hebrew→Gregorian tables each worker keeps (least recently used
+# years are evicted).
+HEBCAL_CONVERSION_CACHE_YEARS = env.int("HEBCAL_CONVERSION_CACHE_YEARS", default=32)
+# Upper bounds for the ?past= / ?future= horizon a calendar feed may request.
+HEBCAL_FEED_MAX_PAST_YEARS = env.int("HEBCAL_FEED_MAX_PAST_YEARS", default=5)
+HEBCAL_FEED_MAX_FUTURE_YEARS = env.int("HEBCAL_FEED_MAX_FUTURE_YEARS", default=10)
+# Shared, memory-mapped table file covering the largest horizon a feed may
+# request (written by `manage.py build_conversion_table`, and regenerated
+# automatically once it no longer covers the current year).
+# Set to an empty string to build tables in each process instead.
+HEBCAL_CONVERSION_TABLE_PATH = env(
+    "HEBCAL_CONVERSION_TABLE_PATH",
+    default=str(Path(tempfile.gettempdir()) / "my_hebrew_dates-conversion-table.bin"),
+)
+# Calendars with at least this many events are streamed (StreamingHttpResponse)
+# instead of being rendered in one string, and cached once sent. Set to 0 to
+# never stream.
+HEBCAL_FEED_STREAMING_MIN_EVENTS = env.int(
+    "HEBCAL_FEED_STREAMING_MIN_EVENTS",
+    default=1000,
+)
+# Cache alias holding pre-rendered VEVENT fragments per HebrewDate row version.
+# Set to an empty string to render every event on every request.
+HEBCAL_FRAGMENT_CACHE_ALIAS = env("HEBCAL_FRAGMENT_CACHE_ALIAS", default="default")
+HEBCAL_FRAGMENT_CACHE_TIMEOUT = env.int(
+    "HEBCAL_FRAGMENT_CACHE_TIMEOUT",
+    default=60 * 60 * 24 * 7,
+)
+# Cache alias holding generated feeds. Writes invalidate a calendar's entries
+# explicitly, so they can live long. Set to an empty string to disable.
+HEBCAL_FEED_CACHE_ALIAS = env("HEBCAL_FEED_CACHE_ALIAS", default="default")
+HEBCAL_FEED_CACHE_TIMEOUT = env.int(
+    "HEBCAL_FEED_CACHE_TIMEOUT",
+    default=60 * 60 * 24 * 30,
+)
+# Days a sync token stays valid. Changes older than this are dropped by the
+# `compact_sync_changes` task, which should run at least daily.
+HEBCAL_SYNC_RETENTION_DAYS = env.int("HEBCAL_SYNC_RETENTION_DAYS", default=30)
+# Events per page of a calendar's edit table; more load as the user scrolls.
+HEBCAL_EDIT_PAGE_SIZE = env.int("HEBCAL_EDIT_PAGE_SIZE", default=100)
+# How the edit table searches event names (see hebcal/search.py): "trigram"
+# in PostgreSQL with pg_trgm, "python" in the app, or "auto" to use trigram
+# wherever the extension is installed.
+HEBCAL_SEARCH_BACKEND = env("HEBCAL_SEARCH_BACKEND", default="auto")
+# Compression applied once whenever a feed is stored or cached, never per
+# request: gzip level 1-9 and, when the brotli package is installed, brotli
+# quality 0-11. See `manage.py hebcal_benchmark --suite compression`.
+HEBCAL_FEED_GZIP_LEVEL = env.int("HEBCAL_FEED_GZIP_LEVEL", default=9)
+HEBCAL_FEED_BROTLI_QUALITY = env.int("HEBCAL_FEED_BROTLI_QUALITY", default=6)
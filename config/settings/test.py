@@ -2,6 +2,10 @@
 With these settings, tests run faster.
 """
 
+import atexit
+import shutil
+import tempfile
+
 from .base import *  # noqa: F403
 from .base import TEMPLATES
 from .base import env
@@ -34,5 +38,20 @@ TEMPLATES[0]["OPTIONS"]["debug"] = True  # type: ignore[index]
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#media-url
 MEDIA_URL = "http://media.testserver/"
+
+# CELERY
+# ------------------------------------------------------------------------------
+# https://docs.celeryq.dev/en/stable/userguide/configuration.html#task-always-eager
+CELERY_TASK_ALWAYS_EAGER = True
+# https://docs.celeryq.dev/en/stable/userguide/configuration.html#task-eager-propagates
+CELERY_TASK_EAGER_PROPAGATES = True
 # Your stuff...
 # ------------------------------------------------------------------------------
+
+# hebcal
+# ------------------------------------------------------------------------------
+# A table file of this run's own, so tests (some with mocked years) never
+# rewrite the one the host's other processes share.
+_CONVERSION_TABLE_DIR = tempfile.mkdtemp(prefix="my_hebrew_dates-test-")
+atexit.register(shutil.rmtree, _CONVERSION_TABLE_DIR, ignore_errors=True)
+HEBCAL_CONVERSION_TABLE_PATH = f"{_CONVERSION_TABLE_DIR}/conversion-table.bin"
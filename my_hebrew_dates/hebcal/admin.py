@@ -37,7 +37,12 @@ class CalendarAdmin(admin.ModelAdmin):
         return format_html('<a href="{}">{}</a>', url, obj.uuid)
 
     def get_queryset(self, request):
-        queryset = super().get_queryset(request).prefetch_related("owner")
+        queryset = (
+            super()
+            .get_queryset(request)
+            .prefetch_related("owner")
+            .defer(*Calendar.MATERIALIZED_FEED_FIELDS.values())
+        )
         return queryset.annotate(events_count=Count("calendarOf")).order_by(
             "-events_count",
         )
@@ -1,6 +1,12 @@
+from importlib import import_module
+
 from django.apps import AppConfig
 
 
 class HebcalConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "my_hebrew_dates.hebcal"
+
+    def ready(self):
+        # Connects the signal receivers.
+        import_module(f"{self.name}.signals")
@@ -0,0 +1,723 @@
+"""
+Micro-benchmarks for the hebcal feed path.
+
+Run them with ``python manage.py hebcal_benchmark``; every suite returns a
+plain dict so results can be printed or dumped as JSON and diffed.
+"""
+
+# ruff: noqa: PLW2901, S311
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from array import array
+from base64 import urlsafe_b64encode
+from collections.abc import Callable
+from collections.abc import Iterable
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import UTC
+from datetime import datetime
+from datetime import timedelta
+from functools import partial
+from hashlib import sha1
+from typing import Any
+from uuid import uuid4
+
+import django
+import icalendar
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test.utils import override_settings
+from pyluach import dates
+from pyluach.utils import _is_leap as is_leap
+
+from my_hebrew_dates import __version__
+from my_hebrew_dates.hebcal import hebrew_calendar
+from my_hebrew_dates.hebcal import search
+from my_hebrew_dates.hebcal import temp
+from my_hebrew_dates.hebcal.clients import CLIENTS
+from my_hebrew_dates.hebcal.clients import UNKNOWN
+from my_hebrew_dates.hebcal.clients import CalendarClient
+from my_hebrew_dates.hebcal.clients import FeedVariant
+from my_hebrew_dates.hebcal.compression import BROTLI
+from my_hebrew_dates.hebcal.compression import ENCODINGS
+from my_hebrew_dates.hebcal.compression import GZIP
+from my_hebrew_dates.hebcal.compression import compress
+from my_hebrew_dates.hebcal.fragments import fragment_cache
+from my_hebrew_dates.hebcal.hebrew_calendar import ADAR
+from my_hebrew_dates.hebcal.hebrew_calendar import ADAR_2
+from my_hebrew_dates.hebcal.hebrew_date import SLOTS_PER_YEAR
+from my_hebrew_dates.hebcal.hebrew_date import ConversionTable
+from my_hebrew_dates.hebcal.hebrew_date import Horizon
+from my_hebrew_dates.hebcal.hebrew_date import MissingDay
+from my_hebrew_dates.hebcal.hebrew_date import build_year
+from my_hebrew_dates.hebcal.hebrew_date import conversion_table
+from my_hebrew_dates.hebcal.models import Calendar
+from my_hebrew_dates.hebcal.models import HebrewDate
+from my_hebrew_dates.hebcal.models import HebrewDateQuerySet
+from my_hebrew_dates.hebcal.utils import CHARJ_URL
+from my_hebrew_dates.hebcal.utils import EMITTERS
+from my_hebrew_dates.hebcal.utils import MYHEBREWDATES_DOMAIN
+from my_hebrew_dates.hebcal.utils import FeedOptions
+from my_hebrew_dates.hebcal.utils import generate_ical
+from my_hebrew_dates.hebcal.utils import generate_ical_experimental
+from my_hebrew_dates.hebcal.utils import project_rows
+
+# Longest each month can be, as the legacy table iterated them.
+lengths_of_months = [0, 30, 29, 30, 29, 30, 29, 30, 30, 30, 29, 30, 30, 29]
+
+
+@contextmanager
+def synthetic_calendar(rows: int) -> Iterator[Calendar]:
+    """
+    Yield a calendar with ``rows`` random events; everything is rolled back.
+
+    The events are drawn from a generator seeded by ``rows``, so that every
+    run measures the same calendar.
+    """
+    rng = random.Random(rows)
+    event_types = [choice for choice, _ in HebrewDate.EVENT_CHOICES]
+    with transaction.atomic():
+        try:
+            owner = get_user_model().objects.create(
+                username=f"benchmark-{uuid4().hex}",
+            )
+            calendar = Calendar.objects.create(name="Benchmark calendar", owner=owner)
+            # Inserted at once: saving rows one by one would also time the
+            # signal handlers.
+            HebrewDate.objects.bulk_create(
+                HebrewDate(
+                    name=f"Person {index}",
+                    month=rng.randint(1, 13),
+                    day=rng.randint(1, 30),
+                    event_type=rng.choice(event_types),
+                    calendar=calendar,
+                )
+                for index in range(rows)
+            )
+            yield Calendar.objects.prefetch_related("calendarOf").get(pk=calendar.pk)
+        finally:
+            transaction.set_rollback(True)
+
+
+def legacy_hebrew_to_english_dict(start_year: int, years: int) -> dict[str, list]:
+    """The original ``f"{month}-{day}"``-keyed table, kept as a baseline."""
+    hebrew_to_english_dict: dict[str, list] = {}
+    for year in range(start_year, start_year + years):
+        for month in range(1, 14):
+            mstring = month
+            if not is_leap(year) and month == ADAR_2:
+                month = month - 1
+            for day in range(1, lengths_of_months[month] + 1):
+                try:
+                    hebrew_date = dates.HebrewDate(year, month, day)
+                except ValueError:
+                    hebrew_date = dates.HebrewDate(year, month, day - 1)
+                hebrew_to_english_dict.setdefault(f"{mstring}-{day}", []).append(
+                    hebrew_date.to_pydate(),
+                )
+    return hebrew_to_english_dict
+
+
+def precomputed_hebrew_to_english_dict(
+    start_year: int,
+    years: int,
+) -> dict[str, list]:
+    """The legacy table with missing days resolved up front, not via ``ValueError``."""
+    hebrew_to_english_dict: dict[str, list] = {}
+    for year in range(start_year, start_year + years):
+        for month in range(1, 14):
+            mstring = month
+            if not is_leap(year) and month == ADAR_2:
+                month = month - 1
+            length = hebrew_calendar.month_length(year, month)
+            for day in range(1, lengths_of_months[month] + 1):
+                hebrew_date = dates.HebrewDate(year, month, min(day, length))
+                hebrew_to_english_dict.setdefault(f"{mstring}-{day}", []).append(
+                    hebrew_date.to_pydate(),
+                )
+    return hebrew_to_english_dict
+
+
+def legacy_generate_ical(
+    model_calendar: Calendar,
+    user_agent: str = "",
+    alarm_trigger: timedelta = timedelta(hours=9),
+    horizon: Horizon | None = None,
+    dtstamp: datetime | None = None,
+) -> str:
+    """
+    The original feed generator built on the ``icalendar`` object model.
+
+    Kept as the reference :mod:`~my_hebrew_dates.hebcal.ical` output must
+    match byte for byte, and as the serializer benchmark's baseline.
+    """
+    is_google = "google" in user_agent.lower()
+    newcal = icalendar.Calendar()
+    newcal.add("prodid", "-//MyHebrewDates.com//Hebrew Calendar Events//EN")
+    newcal.add("version", "2.0")
+    newcal.add("calscale", "GREGORIAN")
+    newcal.add("method", "PUBLISH")
+    newcal.add("x-wr-calname", model_calendar.name)
+    newcal.add("x-wr-timezone", "UTC" if is_google else model_calendar.timezone)
+    newcal.add("x-wr-caldesc", "Hebrew calendar events created by MyHebrewDates.com")
+
+    events = []
+    now_utc = dtstamp or datetime.now(tz=UTC)
+    for (
+        hebrew_date,
+        english_dates,
+    ) in model_calendar.calendarOf.all().with_english_dates(
+        horizon,
+    ):
+        event_hash = sha1(  # noqa: S324
+            (
+                hebrew_date.event_type
+                + hebrew_date.name
+                + hebrew_date.get_hebrew_date()
+            ).encode("utf-8"),
+        ).digest()
+        for eng_date in english_dates:
+            uid = (
+                eng_date.isoformat()
+                + urlsafe_b64encode(event_hash).decode("ascii")
+                + MYHEBREWDATES_DOMAIN
+            )
+            title = (
+                f"{hebrew_date.get_hebrew_date()} | "
+                f"{hebrew_date.event_type} {hebrew_date.name}"
+            )
+            event = icalendar.Event()
+            event.add("summary", title)
+            event.add(
+                "description",
+                f"{title}\n\nKeep your credit cards active. "
+                f"Prevent closures → {CHARJ_URL}",
+            )
+            event.add("dtstamp", now_utc)
+            event.add("last-modified", hebrew_date.modified)
+            event.add("sequence", 0)
+            event.add("dtstart", eng_date, parameters={"value": "DATE"})
+            event.add(
+                "dtend",
+                eng_date + timedelta(days=1),
+                parameters={"value": "DATE"},
+            )
+            event.add("uid", uid)
+            event.add("transp", "TRANSPARENT")
+            event.add(
+                "categories",
+                ["Hebrew Date", str(hebrew_date.get_event_type_display())],
+            )
+            event.add("x-microsoft-cdo-alldayevent", "TRUE")
+            event.add("x-microsoft-cdo-busystatus", "FREE")
+            alarm = icalendar.Alarm()
+            alarm.add("action", "DISPLAY")
+            alarm.add(
+                "description",
+                f"{hebrew_date.name}'s {hebrew_date.get_event_type_display()} "
+                "is today!",
+            )
+            alarm.add("trigger", alarm_trigger)
+            event.add_component(alarm)
+            events.append(event)
+
+    for event in sorted(events, key=lambda e: e["dtstart"].dt):
+        newcal.add_component(event)
+    return newcal.to_ical().decode("utf8")
+
+
+def deep_size(obj: Any) -> int:
+    """Approximate bytes held by ``obj`` and the containers/values it holds."""
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_size(key) + deep_size(value) for key, value in obj.items())
+    elif isinstance(obj, list | tuple):
+        size += sum(deep_size(item) for item in obj)
+    return size
+
+
+def measure(func: Callable[[], Any]) -> tuple[Any, float, int]:
+    """Run ``func`` once, returning its result, wall time and peak allocation."""
+    tracemalloc.start()
+    try:
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def time_lookups(lookup: Callable[[int, int], Any], pairs: list) -> float:
+    started = time.perf_counter()
+    for month, day in pairs:
+        lookup(month, day)
+    return time.perf_counter() - started
+
+
+def benchmark_conversion_table(
+    years: int = 3,
+    lookups: int = 100_000,
+) -> dict[str, Any]:
+    """Compare the legacy dict with :class:`ConversionTable` storage."""
+    start_year = ConversionTable.current_year()
+    rng = random.Random(0)
+    pairs = [(rng.randint(1, 13), rng.randint(1, 29)) for _ in range(lookups)]
+    # Warm pyluach's internal caches so neither build pays for them.
+    legacy_hebrew_to_english_dict(start_year, 1)
+
+    legacy, legacy_build, legacy_peak = measure(
+        lambda: legacy_hebrew_to_english_dict(start_year, years),
+    )
+
+    def build_table():
+        table = ConversionTable(horizon=Horizon(past=0, future=years - 1))
+        table.get_ordinals(1, 1)
+        return table
+
+    table, table_build, table_peak = measure(build_table)
+
+    return {
+        "years": years,
+        "lookups": lookups,
+        "legacy_dict": {
+            "build_seconds": legacy_build,
+            "peak_bytes": legacy_peak,
+            "table_bytes": deep_size(legacy),
+            "lookup_seconds": time_lookups(
+                lambda month, day: legacy.get(f"{month}-{day}"),
+                pairs,
+            ),
+        },
+        "conversion_table": {
+            "build_seconds": table_build,
+            "peak_bytes": table_peak,
+            "table_bytes": table.stats()["table_bytes"],
+            "lookup_seconds": time_lookups(table.get_english_dates, pairs),
+            "ordinal_lookup_seconds": time_lookups(table.get_ordinals, pairs),
+        },
+    }
+
+
+def benchmark_hebrew_calendar(
+    horizons: tuple[int, ...] = (1, 3, 10, 100, 1000),
+) -> dict[str, Any]:
+    """Time building table horizons with the arithmetic engine vs. pyluach."""
+    start_year = ConversionTable.current_year()
+    results = {}
+    for years in horizons:
+        hebrew_calendar.month_starts.cache_clear()
+        hebrew_calendar.month_lengths.cache_clear()
+        hebrew_calendar.new_year.cache_clear()
+        started = time.perf_counter()
+        for year in range(start_year, start_year + years):
+            build_year(year)
+        engine_seconds = time.perf_counter() - started
+        result = {"engine_seconds": engine_seconds}
+        # pyluach is too slow to be worth timing over the longest horizons.
+        if years <= 100:  # noqa: PLR2004
+            started = time.perf_counter()
+            legacy_hebrew_to_english_dict(start_year, years)
+            result["pyluach_seconds"] = time.perf_counter() - started
+        results[str(years)] = result
+    return {"start_year": start_year, "horizons": results}
+
+
+def benchmark_missing_days(years: int = 10) -> dict[str, Any]:
+    """
+    Table build time with the legacy ``try/except`` missing-day fallback,
+    with the fallback precomputed, and with every :class:`MissingDay` grid
+    built by the arithmetic engine.
+    """
+    start_year = ConversionTable.current_year()
+    # Warm pyluach's internal caches so no build pays for them.
+    legacy_hebrew_to_english_dict(start_year, 1)
+    timings = {}
+    for name, build in (
+        ("exception_seconds", legacy_hebrew_to_english_dict),
+        ("precomputed_seconds", precomputed_hebrew_to_english_dict),
+    ):
+        started = time.perf_counter()
+        build(start_year, years)
+        timings[name] = time.perf_counter() - started
+    hebrew_calendar.month_starts.cache_clear()
+    hebrew_calendar.month_lengths.cache_clear()
+    started = time.perf_counter()
+    for year in range(start_year, start_year + years):
+        build_year(year)
+    timings["rule_table_seconds"] = time.perf_counter() - started
+    return {
+        "years": years,
+        "policies": [policy.name for policy in MissingDay],
+        "fallbacks": sum(
+            lengths_of_months[target] - hebrew_calendar.month_length(year, target)
+            for year in range(start_year, start_year + years)
+            for month in range(1, 14)
+            for target in [month if is_leap(year) or month != ADAR_2 else ADAR]
+        ),
+        **timings,
+    }
+
+
+def benchmark_serializer(
+    sizes: tuple[int, ...] = (10, 100, 1_000, 10_000),
+) -> dict[str, Any]:
+    """
+    Feed generation time with the ``icalendar`` object model vs. the direct
+    serializer, for calendars of ``sizes`` events (one year per event).
+
+    ``direct_seconds`` renders every fragment; ``cached_seconds`` repeats the
+    request with the VEVENT fragment cache warm.
+    """
+    horizon = Horizon(past=0, future=0)
+    conversion_table.window(horizon)  # Build tables outside the timing.
+    results = {}
+    # A cache big enough for every fragment, whatever the default one is.
+    fragment_cache_settings = override_settings(
+        CACHES={
+            **settings.CACHES,
+            "hebcal-benchmark": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                "LOCATION": "hebcal-benchmark",
+                "OPTIONS": {"MAX_ENTRIES": max(sizes) * 2},
+            },
+        },
+        HEBCAL_FRAGMENT_CACHE_ALIAS="hebcal-benchmark",
+    )
+    options = FeedOptions(horizon=horizon)
+    for events in sizes:
+        with fragment_cache_settings, synthetic_calendar(events) as calendar:
+            timings: dict[str, Any] = {}
+            for name, generate in (
+                ("icalendar_seconds", partial(legacy_generate_ical, horizon=horizon)),
+                ("direct_seconds", partial(generate_ical, options=options)),
+            ):
+                started = time.perf_counter()
+                body = generate(calendar)
+                timings[name] = time.perf_counter() - started
+            fragment_cache.reset_stats()
+            started = time.perf_counter()
+            generate_ical(calendar, options)
+            timings["cached_seconds"] = time.perf_counter() - started
+            timings["fragment_cache"] = fragment_cache.stats()
+            timings["speedup"] = (
+                timings["icalendar_seconds"] / timings["direct_seconds"]
+            )
+            timings["output_bytes"] = len(body.encode())
+            results[str(events)] = timings
+    return {"events": results}
+
+
+def benchmark_compression(
+    sizes: tuple[int, ...] = (10, 100, 1_000, 10_000),
+    gzip_levels: tuple[int, ...] = (1, 6, 9),
+    brotli_qualities: tuple[int, ...] = (4, 6, 9),
+) -> dict[str, Any]:
+    """
+    Compressed size and compression time of default-horizon feeds for each
+    gzip level and brotli quality, next to the time it takes to generate the
+    feed. Compression runs once per stored or cached feed, not per request.
+    """
+    settings_grid = [(GZIP, "HEBCAL_FEED_GZIP_LEVEL", level) for level in gzip_levels]
+    if BROTLI in ENCODINGS:
+        settings_grid += [
+            (BROTLI, "HEBCAL_FEED_BROTLI_QUALITY", quality)
+            for quality in brotli_qualities
+        ]
+    results = {}
+    for events in sizes:
+        with synthetic_calendar(events) as calendar:
+            started = time.perf_counter()
+            body = generate_ical(calendar).encode()
+            result: dict[str, Any] = {
+                "generate_seconds": time.perf_counter() - started,
+                "identity_bytes": len(body),
+            }
+        for encoding, setting, value in settings_grid:
+            with override_settings(**{setting: value}):
+                started = time.perf_counter()
+                compressed = compress(body, encoding)
+                result[f"{encoding}-{value}"] = {
+                    "bytes": len(compressed),
+                    "ratio": len(body) / len(compressed),
+                    "compress_seconds": time.perf_counter() - started,
+                }
+        results[str(events)] = result
+    return {"events": results}
+
+
+def benchmark_feed_horizon(
+    rows: int = 1000,
+    horizons: tuple[Horizon, ...] = (
+        Horizon(0, 0),
+        Horizon(0, 2),
+        Horizon(0, 9),
+        Horizon(5, 10),
+    ),
+) -> dict[str, Any]:
+    """Feed generation time, peak memory and size for each horizon."""
+    results = {}
+    with synthetic_calendar(rows) as calendar:
+        for horizon in horizons:
+            conversion_table.window(horizon)  # Build tables outside the timing.
+            started = time.perf_counter()
+            options = FeedOptions(horizon=horizon)
+            body = generate_ical(calendar, options)
+            seconds = time.perf_counter() - started
+            # tracemalloc slows generation down, so measure memory separately.
+            _, _, peak = measure(
+                partial(generate_ical, calendar, options),
+            )
+            years = len(horizon.years(0))
+            results[f"past={horizon.past},future={horizon.future}"] = {
+                "years": years,
+                "generate_seconds": seconds,
+                "peak_bytes": peak,
+                "output_bytes": len(body.encode()),
+                "table_bytes": years * SLOTS_PER_YEAR * array("i").itemsize,
+            }
+    return {
+        "rows": rows,
+        "horizons": results,
+        "conversion_table": conversion_table.stats(),
+    }
+
+
+def generate_ical_rdate(calendar: Calendar, options: FeedOptions) -> str:
+    """``utils.generate_ical`` with one RDATE-listing event per row."""
+    return generate_ical(calendar, options._replace(variant=FeedVariant.RDATE))
+
+
+def temp_generate_ical(calendar: Calendar, options: FeedOptions) -> str:
+    """``temp.generate_ical``, which detects the client from a User-Agent."""
+    user_agent = next(iter(options.client.user_agent_markers), "")
+    return temp.generate_ical(calendar, user_agent)
+
+
+# Every feed generator in the tree, by where it lives.
+GENERATORS: dict[str, Callable[[Calendar, FeedOptions], str]] = {
+    "utils.generate_ical": generate_ical,
+    "utils.generate_ical_experimental": generate_ical_experimental,
+    "utils.generate_ical[rdate]": generate_ical_rdate,
+    "temp.generate_ical": temp_generate_ical,
+}
+
+
+def time_pipeline(calendar: Calendar) -> dict[str, Any]:
+    """
+    Wall time of the stages every ``utils`` feed shares (loading rows and
+    projecting them) and of each variant's emitter on the projected rows.
+    """
+    started = time.perf_counter()
+    rows = calendar.calendarOf.all().with_english_dates()
+    loaded = time.perf_counter()
+    projections = project_rows([hebrew_date for hebrew_date, _ in rows])
+    projected = time.perf_counter()
+    emit_seconds = {}
+    for variant, emitter_class in EMITTERS.items():
+        started_emit = time.perf_counter()
+        emitter = emitter_class()
+        for projection, (_, english_dates) in zip(projections, rows, strict=True):
+            prepared = emitter.prepare(projection)
+            for start in emitter.starts(english_dates):
+                emitter.render(prepared, start, english_dates, "")
+        emit_seconds[str(variant)] = time.perf_counter() - started_emit
+    return {
+        "load_seconds": loaded - started,
+        "project_seconds": projected - loaded,
+        "emit_seconds": emit_seconds,
+    }
+
+
+# Every client recognized by its User-Agent, and one that isn't.
+BENCHMARK_CLIENTS = (
+    *[client for client in CLIENTS if client.user_agent_markers],
+    UNKNOWN,
+)
+
+
+def benchmark_generators(
+    sizes: tuple[int, ...] = (10, 100, 1_000, 10_000),
+    clients: tuple[CalendarClient, ...] = BENCHMARK_CLIENTS,
+) -> dict[str, Any]:
+    """
+    Wall time, peak memory and output size of every generator in
+    :data:`GENERATORS`, for each of ``clients``, over calendars of
+    ``sizes`` events.
+
+    The fragment cache is disabled so every run renders every event; the
+    serializer suite measures the cached path. ``pipeline`` breaks the
+    ``utils`` generators down into their shared and per-variant stages.
+    """
+    conversion_table.window()  # Build tables outside the timing.
+    results = {}
+    pipeline = {}
+    for events in sizes:
+        with (
+            override_settings(HEBCAL_FRAGMENT_CACHE_ALIAS=""),
+            synthetic_calendar(events) as calendar,
+        ):
+            by_generator = {}
+            for name, generate in GENERATORS.items():
+                by_client = {}
+                for client in clients:
+                    options = FeedOptions(client=client)
+                    started = time.perf_counter()
+                    body = generate(calendar, options)
+                    seconds = time.perf_counter() - started
+                    # tracemalloc slows generation down, so measure memory
+                    # separately.
+                    _, _, peak = measure(partial(generate, calendar, options))
+                    by_client[client.name] = {
+                        "generate_seconds": seconds,
+                        "peak_bytes": peak,
+                        "output_bytes": len(body.encode()),
+                        "vevents": body.count("BEGIN:VEVENT"),
+                    }
+                by_generator[name] = by_client
+            results[str(events)] = by_generator
+            pipeline[str(events)] = time_pipeline(calendar)
+    return {"events": results, "pipeline": pipeline}
+
+
+def load_instances(hebrew_dates: HebrewDateQuerySet) -> object:
+    return hebrew_dates.all().with_english_dates()
+
+
+def load_feed_rows(hebrew_dates: HebrewDateQuerySet) -> object:
+    return hebrew_dates.all().feed_rows()
+
+
+def benchmark_orm(sizes: tuple[int, ...] = (1_000, 10_000)) -> dict[str, Any]:
+    """
+    Wall time and peak memory of loading a calendar's events for a feed, as
+    model instances (``with_english_dates``) and as ``values_list`` tuples
+    (``feed_rows``), over calendars of ``sizes`` events.
+    """
+    conversion_table.window()  # Build tables outside the timing.
+    results = {}
+    for events in sizes:
+        with synthetic_calendar(events) as calendar:
+            # Not calendar.calendarOf: its prefetched events would skip the
+            # query.
+            hebrew_dates = HebrewDate.objects.filter(calendar=calendar)
+            timings: dict[str, Any] = {}
+            for name, load in (
+                ("instances", partial(load_instances, hebrew_dates)),
+                ("feed_rows", partial(load_feed_rows, hebrew_dates)),
+            ):
+                started = time.perf_counter()
+                load()
+                seconds = time.perf_counter() - started
+                _, _, peak = measure(load)
+                timings[name] = {"load_seconds": seconds, "peak_bytes": peak}
+            timings["speedup"] = (
+                timings["instances"]["load_seconds"]
+                / timings["feed_rows"]["load_seconds"]
+            )
+            results[str(events)] = timings
+    return {"events": results}
+
+
+# Search queries for the synthetic calendars' "Person <n>" events: one each
+# name contains, and a typo only fuzzy matching finds.
+SEARCH_QUERIES = {"substring": "son 1", "typo": "persn 12"}
+
+
+def search_with(backend: str, calendar: Calendar, query: str) -> list[HebrewDate]:
+    with override_settings(HEBCAL_SEARCH_BACKEND=backend):
+        results = search.search(calendar.calendarOf.all(), query)
+        return list(results.order_by("-search_rank", "pk"))
+
+
+def benchmark_search(sizes: tuple[int, ...] = (1_000, 10_000)) -> dict[str, Any]:
+    """
+    Wall time and matches of searching a calendar's event names with the
+    original ``name__icontains`` lookup and with ``search.search()`` on each
+    backend this database supports, over calendars of ``sizes`` events.
+    """
+    backends = [search.PYTHON]
+    if search.has_pg_trgm("default"):
+        backends.append(search.TRIGRAM)
+    results = {}
+    for events in sizes:
+        with synthetic_calendar(events) as calendar:
+            timings = {}
+            for label, query in SEARCH_QUERIES.items():
+                lookups: dict[str, Callable[[], Iterable[HebrewDate]]] = {
+                    "icontains": partial(
+                        calendar.calendarOf.filter,
+                        name__icontains=query,
+                    ),
+                }
+                for backend in backends:
+                    lookups[backend] = partial(search_with, backend, calendar, query)
+                for name, lookup in lookups.items():
+                    started = time.perf_counter()
+                    matches = len(list(lookup()))
+                    seconds = time.perf_counter() - started
+                    timings[f"{name}[{label}]"] = {
+                        "seconds": seconds,
+                        "matches": matches,
+                    }
+            results[str(events)] = timings
+    return {"backends": backends, "events": results}
+
+
+def environment() -> dict[str, Any]:
+    """What a report was measured on, to tell releases and machines apart."""
+    return {
+        "version": __version__,
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "platform": platform.platform(),
+        "created": datetime.now(tz=UTC).isoformat(),
+    }
+
+
+def compare_reports(baseline: Any, current: Any) -> Any:
+    """
+    Pair every number in ``current`` with the same one in ``baseline``.
+
+    Each number present in both reports becomes ``{"baseline", "current",
+    "change"}``, ``change`` being relative (``0.1`` is 10% more); anything
+    else is left out.
+    """
+    if isinstance(baseline, dict) and isinstance(current, dict):
+        comparison = {}
+        for key in current.keys() & baseline.keys():
+            compared = compare_reports(baseline[key], current[key])
+            if compared is not None:
+                comparison[key] = compared
+        return comparison or None
+    numbers = (int, float)
+    if (
+        isinstance(baseline, numbers)
+        and isinstance(current, numbers)
+        and not isinstance(baseline, bool)
+        and not isinstance(current, bool)
+    ):
+        return {
+            "baseline": baseline,
+            "current": current,
+            "change": (current - baseline) / baseline if baseline else None,
+        }
+    return None
+
+
+SUITES: dict[str, Callable[..., dict[str, Any]]] = {
+    "compression": benchmark_compression,
+    "conversion_table": benchmark_conversion_table,
+    "feed_horizon": benchmark_feed_horizon,
+    "generators": benchmark_generators,
+    "hebrew_calendar": benchmark_hebrew_calendar,
+    "missing_days": benchmark_missing_days,
+    "orm": benchmark_orm,
+    "search": benchmark_search,
+    "serializer": benchmark_serializer,
+}
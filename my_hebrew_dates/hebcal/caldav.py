@@ -0,0 +1,225 @@
+"""
+Read-only CalDAV (RFC 4791) access to calendars.
+
+Each calendar is a collection holding one resource per event, ``<pk>.ics``
+(see ``utils.render_event_resources``). Every resource has its own ETag and
+the collection a CTag (``CS:getctag``) that changes whenever any of them
+does, so a polling client compares one property and then fetches only the
+events whose ETags moved. This module parses PROPFIND / REPORT bodies and
+builds multistatus responses; the view is ``views.CalendarDavView``.
+"""
+
+import xml.etree.ElementTree as ET
+from collections.abc import Iterable
+from collections.abc import Mapping
+from datetime import UTC
+from datetime import date
+from datetime import datetime
+from datetime import timedelta
+from typing import NamedTuple
+
+from defusedxml import DefusedXmlException
+from defusedxml.ElementTree import fromstring
+
+from .hebrew_date import DateWindow
+from .models import Calendar
+from .models import FeedRow
+
+DAV = "DAV:"
+CALDAV = "urn:ietf:params:xml:ns:caldav"
+CALENDARSERVER = "http://calendarserver.org/ns/"
+
+ET.register_namespace("D", DAV)
+ET.register_namespace("C", CALDAV)
+ET.register_namespace("CS", CALENDARSERVER)
+
+RESOURCETYPE = f"{{{DAV}}}resourcetype"
+DISPLAYNAME = f"{{{DAV}}}displayname"
+GETETAG = f"{{{DAV}}}getetag"
+GETCONTENTTYPE = f"{{{DAV}}}getcontenttype"
+CURRENT_USER_PRIVILEGE_SET = f"{{{DAV}}}current-user-privilege-set"
+GETCTAG = f"{{{CALENDARSERVER}}}getctag"
+SUPPORTED_CALENDAR_COMPONENT_SET = f"{{{CALDAV}}}supported-calendar-component-set"
+CALENDAR_DATA = f"{{{CALDAV}}}calendar-data"
+CALENDAR_QUERY = f"{{{CALDAV}}}calendar-query"
+CALENDAR_MULTIGET = f"{{{CALDAV}}}calendar-multiget"
+
+RESOURCE_CONTENT_TYPE = "text/calendar; charset=utf-8; component=vevent"
+
+# A property value: text, or child elements.
+PropValue = str | list[ET.Element]
+
+
+class BadRequestError(ValueError):
+    """The request body isn't a PROPFIND or REPORT this server understands."""
+
+
+def _element(tag: str, *children: ET.Element, **attributes: str) -> ET.Element:
+    element = ET.Element(tag, attributes)
+    element.extend(children)
+    return element
+
+
+def _parse(body: bytes) -> ET.Element | None:
+    if not body.strip():
+        return None
+    try:
+        return fromstring(body)
+    except (ET.ParseError, DefusedXmlException) as error:
+        msg = f"Malformed XML: {error}"
+        raise BadRequestError(msg) from error
+
+
+def _requested_props(root: ET.Element) -> list[str] | None:
+    """The ``<D:prop>`` names under ``root``, or ``None`` for ``<D:allprop>``."""
+    prop = root.find(f"{{{DAV}}}prop")
+    if prop is None:
+        return None
+    return [child.tag for child in prop]
+
+
+def parse_propfind(body: bytes) -> list[str] | None:
+    """The properties a PROPFIND asks for; ``None`` means all of them."""
+    root = _parse(body)
+    if root is None:
+        return None
+    if root.tag != f"{{{DAV}}}propfind":
+        msg = f"Expected DAV:propfind, got {root.tag}"
+        raise BadRequestError(msg)
+    return _requested_props(root)
+
+
+class Report(NamedTuple):
+    tag: str
+    props: list[str] | None
+    # Resource hrefs, for calendar-multiget.
+    hrefs: list[str]
+    # The VEVENT time-range, for calendar-query.
+    window: DateWindow | None
+
+
+def _parse_utc(value: str) -> datetime:
+    try:
+        return datetime.strptime(value, "%Y%m%dT%H%M%SZ").replace(tzinfo=UTC)
+    except ValueError as error:
+        msg = f"Invalid time-range value: {value}"
+        raise BadRequestError(msg) from error
+
+
+def _time_range_window(root: ET.Element) -> DateWindow | None:
+    time_range = root.find(
+        f".//{{{CALDAV}}}comp-filter[@name='VEVENT']/{{{CALDAV}}}time-range",
+    )
+    if time_range is None:
+        return None
+    start = time_range.get("start")
+    end = time_range.get("end")
+    first_day = _parse_utc(start).date() if start else date.min
+    if not end:
+        return DateWindow(first_day, date.max)
+    end_at = _parse_utc(end)
+    if end_at == datetime.min.replace(tzinfo=UTC):
+        # Ends before the first day there is, so nothing is inside it.
+        return DateWindow(date.max, date.min)
+    # An all-day event on ``day`` spans [day, day + 1), and the range's end is
+    # exclusive.
+    return DateWindow(first_day, (end_at - timedelta(microseconds=1)).date())
+
+
+def parse_report(body: bytes) -> Report:
+    root = _parse(body)
+    if root is None or root.tag not in (CALENDAR_QUERY, CALENDAR_MULTIGET):
+        msg = "Only calendar-query and calendar-multiget reports are supported"
+        raise BadRequestError(msg)
+    if root.tag == CALENDAR_MULTIGET:
+        hrefs = [(href.text or "").strip() for href in root.iter(f"{{{DAV}}}href")]
+        return Report(root.tag, _requested_props(root), hrefs, None)
+    return Report(root.tag, _requested_props(root), [], _time_range_window(root))
+
+
+def collection_ctag(calendar: Calendar) -> str:
+    """Changes whenever any resource in the calendar's collection does."""
+    return str(int(calendar.get_feed_last_modified().timestamp() * 1_000_000))
+
+
+def resource_etag(hebrew_date: FeedRow, current_year: int) -> str:
+    """
+    Changes whenever the event's resource does: when the row is written, or
+    when the horizon, and with it the event's dates, rolls into a new year.
+    """
+    modified = int(hebrew_date.modified.timestamp() * 1_000_000)
+    return f'"{hebrew_date.pk}-{modified}-{current_year}"'
+
+
+def collection_props(calendar: Calendar) -> dict[str, PropValue]:
+    return {
+        RESOURCETYPE: [
+            _element(f"{{{DAV}}}collection"),
+            _element(f"{{{CALDAV}}}calendar"),
+        ],
+        DISPLAYNAME: calendar.name,
+        GETCTAG: collection_ctag(calendar),
+        SUPPORTED_CALENDAR_COMPONENT_SET: [
+            _element(f"{{{CALDAV}}}comp", name="VEVENT"),
+        ],
+        CURRENT_USER_PRIVILEGE_SET: [
+            _element(f"{{{DAV}}}privilege", _element(f"{{{DAV}}}read")),
+        ],
+    }
+
+
+def resource_props(etag: str, calendar_data: str | None = None) -> dict[str, PropValue]:
+    props: dict[str, PropValue] = {
+        RESOURCETYPE: [],
+        GETETAG: etag,
+        GETCONTENTTYPE: RESOURCE_CONTENT_TYPE,
+    }
+    if calendar_data is not None:
+        props[CALENDAR_DATA] = calendar_data
+    return props
+
+
+class DavResponse(NamedTuple):
+    href: str
+    # All of the resource's properties; ``None`` if the resource doesn't exist.
+    props: dict[str, PropValue] | None
+
+
+def _propstat(props: Mapping[str, PropValue], status: str) -> ET.Element:
+    prop = _element(f"{{{DAV}}}prop")
+    for tag, value in props.items():
+        child = ET.SubElement(prop, tag)
+        if isinstance(value, str):
+            child.text = value
+        else:
+            child.extend(value)
+    propstat = _element(f"{{{DAV}}}propstat", prop)
+    ET.SubElement(propstat, f"{{{DAV}}}status").text = status
+    return propstat
+
+
+def multistatus(
+    responses: Iterable[DavResponse],
+    requested: list[str] | None,
+) -> bytes:
+    """
+    A 207 Multi-Status body with the ``requested`` properties of each
+    response (all of them if ``None``), and 404 propstats for unknown ones.
+    """
+    root = _element(f"{{{DAV}}}multistatus")
+    for href, props in responses:
+        response = ET.SubElement(root, f"{{{DAV}}}response")
+        ET.SubElement(response, f"{{{DAV}}}href").text = href
+        if props is None:
+            ET.SubElement(response, f"{{{DAV}}}status").text = "HTTP/1.1 404 Not Found"
+            continue
+        if requested is None:
+            found, missing = props, {}
+        else:
+            found = {tag: props[tag] for tag in requested if tag in props}
+            missing = {tag: "" for tag in requested if tag not in props}
+        if found:
+            response.append(_propstat(found, "HTTP/1.1 200 OK"))
+        if missing:
+            response.append(_propstat(missing, "HTTP/1.1 404 Not Found"))
+    return ET.tostring(root, encoding="utf-8", xml_declaration=True)
@@ -0,0 +1,68 @@
+"""
+What each calendar client does with a subscribed feed.
+
+Feeds come in two forms: *expanded*, one VEVENT per occurrence within the
+horizon, which every client understands, and *compact*, one VEVENT per row
+recurring with ``RRULE:RSCALE=hebrew`` (RFC 7529), about a third of the
+size but only usable by clients that implement RSCALE. A third form,
+*rdate*, lists a row's occurrences as RDATEs on one VEVENT; it serves the
+CalDAV resources (see ``caldav.py``) and isn't picked for any client.
+Clients are recognized by their User-Agent, or by an explicit ``?client=``
+for in-browser widgets whose User-Agent is the browser's.
+"""
+
+from dataclasses import dataclass
+from enum import StrEnum
+
+
+class FeedVariant(StrEnum):
+    EXPANDED = "expanded"
+    COMPACT = "compact"
+    RDATE = "rdate"
+
+
+@dataclass(frozen=True)
+class CalendarClient:
+    name: str
+    # Lowercase substrings identifying the client's User-Agent.
+    user_agent_markers: tuple[str, ...] = ()
+    # Expands RRULE:RSCALE=hebrew (RFC 7529).
+    supports_rscale: bool = False
+    # Shows all-day events on the wrong day unless X-WR-TIMEZONE is UTC.
+    utc_all_day_events: bool = False
+
+    @property
+    def variant(self) -> FeedVariant:
+        return FeedVariant.COMPACT if self.supports_rscale else FeedVariant.EXPANDED
+
+    def matches(self, user_agent: str) -> bool:
+        user_agent = user_agent.lower()
+        return any(marker in user_agent for marker in self.user_agent_markers)
+
+
+APPLE = CalendarClient(
+    "apple",
+    # macOS CalendarAgent, iOS dataaccessd; both expand Hebrew RSCALE rules.
+    ("calendaragent", "dataaccessd", "ical/"),
+    supports_rscale=True,
+)
+GOOGLE = CalendarClient("google", ("google",), utc_all_day_events=True)
+OUTLOOK = CalendarClient("outlook", ("microsoft", "outlook", "exchange"))
+THUNDERBIRD = CalendarClient("thunderbird", ("thunderbird",))
+# The @fullcalendar/icalendar plugin (calendar_view.html, calendar_detail.html)
+# expands plain RRULEs only. Its requests carry ``?client=fullcalendar``.
+FULLCALENDAR = CalendarClient("fullcalendar")
+UNKNOWN = CalendarClient("unknown")
+
+CLIENTS = (APPLE, GOOGLE, OUTLOOK, THUNDERBIRD, FULLCALENDAR)
+CLIENTS_BY_NAME = {client.name: client for client in CLIENTS}
+
+
+def detect_client(user_agent: str, name: str | None = None) -> CalendarClient:
+    """The client named by ``name`` if known, else the first matching ``user_agent``."""
+    if name and name in CLIENTS_BY_NAME:
+        return CLIENTS_BY_NAME[name]
+    for client in CLIENTS:
+        if client.matches(user_agent):
+            return client
+    return UNKNOWN
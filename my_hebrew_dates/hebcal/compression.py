@@ -0,0 +1,88 @@
+"""
+Compressed feed variants and ``Accept-Encoding`` negotiation.
+
+Feeds are compressed when they are generated or cached, never per request:
+a subscribed calendar is polled far more often than it changes. Brotli is
+used when the ``brotli`` package is installed; gzip is always available.
+"""
+
+import gzip
+from collections.abc import Iterable
+from collections.abc import Iterator
+
+from django.conf import settings
+from django.utils.text import compress_sequence
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+IDENTITY = "identity"
+GZIP = "gzip"
+BROTLI = "br"
+# Preferred first.
+ENCODINGS = (BROTLI, GZIP) if brotli is not None else (GZIP,)
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == GZIP:
+        # mtime=0 keeps the output a function of the input alone.
+        return gzip.compress(
+            data,
+            compresslevel=settings.HEBCAL_FEED_GZIP_LEVEL,
+            mtime=0,
+        )
+    if encoding == BROTLI and brotli is not None:
+        return brotli.compress(
+            data,
+            mode=brotli.MODE_TEXT,
+            quality=settings.HEBCAL_FEED_BROTLI_QUALITY,
+        )
+    msg = f"Unsupported content encoding: {encoding}"
+    raise ValueError(msg)
+
+
+def compress_variants(data: bytes) -> dict[str, bytes]:
+    """``data`` compressed with every available encoding."""
+    return {encoding: compress(data, encoding) for encoding in ENCODINGS}
+
+
+def accepted_encodings(accept_encoding: str) -> dict[str, float]:
+    """Parse an ``Accept-Encoding`` header into ``{coding: qvalue}``."""
+    weights = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        qvalue = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    qvalue = float(value)
+                except ValueError:
+                    qvalue = 0.0
+        weights[coding] = qvalue
+    return weights
+
+
+def negotiate_encoding(
+    accept_encoding: str,
+    encodings: Iterable[str] = ENCODINGS,
+) -> str:
+    """The first of ``encodings`` the client accepts, else ``identity``."""
+    weights = accepted_encodings(accept_encoding)
+    for encoding in encodings:
+        if weights.get(encoding, weights.get("*", 0.0)) > 0:
+            return encoding
+    return IDENTITY
+
+
+def compress_stream(chunks: Iterable[str], encoding: str) -> Iterator[bytes]:
+    """Encode and compress a streamed feed; only gzip can be streamed."""
+    encoded = (chunk.encode() for chunk in chunks)
+    if encoding == GZIP:
+        return compress_sequence(encoded)
+    return encoded
@@ -0,0 +1,129 @@
+"""
+Cache of generated calendar feeds.
+
+Bodies are stored per calendar, feed variant and content encoding, and
+kept for a long time because they are invalidated explicitly: every write
+to a calendar or one of its events (see ``signals.py``) replaces the
+calendar's *generation* token, which is part of every key, so all of its
+cached variants become unreachable at once and simply expire.
+"""
+
+import logging
+import threading
+import time
+from collections.abc import Iterable
+from collections.abc import Iterator
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "hebcal:feed:v1"
+
+
+class FeedCache:
+    def __init__(self, alias: str | None = None, timeout: int | None = None):
+        self._alias = alias
+        self._timeout = timeout
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def alias(self) -> str | None:
+        if self._alias is not None:
+            return self._alias
+        return settings.HEBCAL_FEED_CACHE_ALIAS
+
+    @property
+    def timeout(self) -> int:
+        if self._timeout is not None:
+            return self._timeout
+        return settings.HEBCAL_FEED_CACHE_TIMEOUT
+
+    def _generation_key(self, calendar_id: int) -> str:
+        return f"{KEY_PREFIX}:generation:{calendar_id}"
+
+    def generation(self, calendar_id: int) -> str:
+        """The calendar's current generation token, creating one if needed."""
+        if not self.alias:
+            return ""
+        cache = caches[self.alias]
+        key = self._generation_key(calendar_id)
+        generation = cache.get(key)
+        if generation is None:
+            # Not a counter: if the token is evicted, its replacement must
+            # not match keys written under an older token.
+            cache.add(key, str(time.time_ns()), self.timeout)
+            generation = cache.get(key)
+        if generation is None:
+            # The cache is unavailable; never reuse a key.
+            return f"unset-{time.time_ns()}"
+        return generation
+
+    def key(self, calendar_id: int, variant: str, encoding: str) -> str:
+        return (
+            f"{KEY_PREFIX}:{calendar_id}:{self.generation(calendar_id)}:"
+            f"{variant}:{encoding}"
+        )
+
+    def get(self, key: str) -> bytes | None:
+        if not self.alias:
+            return None
+        body = caches[self.alias].get(key)
+        with self._lock:
+            if body is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        logger.debug("Feed cache %s: %s", "hit" if body is not None else "miss", key)
+        return body
+
+    def set(self, key: str, body: bytes) -> None:
+        if self.alias:
+            caches[self.alias].set(key, body, self.timeout)
+
+    def tee(self, key: str, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """
+        Yield ``chunks``, and once the last is sent cache them all as one
+        body under ``key``. A stream that is abandoned midway isn't cached.
+        """
+        if not self.alias:
+            yield from chunks
+            return
+        body = []
+        for chunk in chunks:
+            body.append(chunk)
+            yield chunk
+        self.set(key, b"".join(body))
+
+    def invalidate(self, calendar_id: int) -> None:
+        """Make every cached variant of the calendar's feed unreachable."""
+        if not self.alias:
+            return
+        caches[self.alias].set(
+            self._generation_key(calendar_id),
+            str(time.time_ns()),
+            self.timeout,
+        )
+        with self._lock:
+            self.invalidations += 1
+
+    def stats(self) -> dict[str, object]:
+        lookups = self.hits + self.misses
+        return {
+            "alias": self.alias,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else None,
+            "invalidations": self.invalidations,
+        }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.hits = self.misses = self.invalidations = 0
+
+
+feed_cache = FeedCache()
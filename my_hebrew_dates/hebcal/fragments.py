@@ -0,0 +1,98 @@
+"""
+Cache of pre-rendered VEVENT fragments.
+
+A ``HebrewDate`` row almost never changes, so the parts of its VEVENTs
+that depend on nothing but the row (``utils.EventProjection``) are rendered
+once and kept in the Django cache, keyed by the row's primary key and
+``modified`` timestamp. Every feed variant and alarm trigger shares them.
+Editing a row changes its ``modified`` and therefore its key; stale entries
+simply expire.
+"""
+
+import logging
+import threading
+from collections.abc import Callable
+from collections.abc import Sequence
+from datetime import datetime
+from typing import TypeVar
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+KEY_PREFIX = "hebcal:vevent:v3"
+
+
+def fragment_key(pk: int, modified: datetime) -> str:
+    return f"{KEY_PREFIX}:{pk}:{modified.timestamp()}"
+
+
+class FragmentCache:
+    """Fetch fragments in one ``get_many`` and render and store only misses."""
+
+    def __init__(self, alias: str | None = None, timeout: int | None = None):
+        self._alias = alias
+        self._timeout = timeout
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def alias(self) -> str | None:
+        if self._alias is not None:
+            return self._alias
+        return settings.HEBCAL_FRAGMENT_CACHE_ALIAS
+
+    @property
+    def timeout(self) -> int:
+        if self._timeout is not None:
+            return self._timeout
+        return settings.HEBCAL_FRAGMENT_CACHE_TIMEOUT
+
+    def get_many(self, keys: Sequence[str], render: Callable[[int], T]) -> list[T]:
+        """
+        Return the fragment for every key, calling ``render(index)`` for misses.
+
+        With no cache alias configured every fragment is rendered.
+        """
+        if not self.alias:
+            return [render(index) for index in range(len(keys))]
+        cache = caches[self.alias]
+        cached = cache.get_many(keys)
+        fragments = []
+        rendered = {}
+        for index, key in enumerate(keys):
+            fragment = cached.get(key)
+            if fragment is None:
+                fragment = rendered[key] = render(index)
+            fragments.append(fragment)
+        if rendered:
+            cache.set_many(rendered, self.timeout)
+        with self._lock:
+            self.hits += len(keys) - len(rendered)
+            self.misses += len(rendered)
+        logger.debug(
+            "VEVENT fragments: %s cached, %s rendered",
+            len(keys) - len(rendered),
+            len(rendered),
+        )
+        return fragments
+
+    def stats(self) -> dict[str, object]:
+        lookups = self.hits + self.misses
+        return {
+            "alias": self.alias,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else None,
+        }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.hits = self.misses = 0
+
+
+fragment_cache = FragmentCache()
@@ -0,0 +1,134 @@
+"""
+Arithmetic Hebrew calendar.
+
+Converts Hebrew dates to proleptic Gregorian ordinals (``date.toordinal()``)
+from the molad and the four postponement rules, following Reingold &
+Dershowitz, *Calendrical Calculations*. Months use the app's numbering:
+Nisan is 1, Tishrei is 7 and Adar II is 13.
+
+Everything is derived per year (:func:`month_starts`) and memoized, so
+converting a batch of dates costs one table build per distinct year plus an
+index per date.
+"""
+
+from collections.abc import Iterable
+from functools import lru_cache
+
+# Ordinal of 1 Tishrei AM 1 (7 October 3761 BCE, proleptic Julian).
+HEBREW_EPOCH = -1373427
+
+CHESHVAN = 8
+KISLEV = 9
+ADAR = 12
+ADAR_2 = 13
+
+# Months in the order they occur in a year that starts at Tishrei.
+YEAR_ORDER = (7, 8, 9, 10, 11, 12, 13, 1, 2, 3, 4, 5, 6)
+
+# Mean lunation is 29 days, 13753 parts; a day has 25920 parts.
+PARTS_PER_DAY = 25920
+
+
+def is_leap(year: int) -> bool:
+    return (7 * year + 1) % 19 < 7  # noqa: PLR2004
+
+
+def _elapsed_days(year: int) -> int:
+    """Days from the epoch to Rosh Hashana under the molad zaken and ADU rules."""
+    months_elapsed = (235 * year - 234) // 19
+    parts_elapsed = 12084 + 13753 * months_elapsed
+    days = 29 * months_elapsed + parts_elapsed // PARTS_PER_DAY
+    if (3 * (days + 1)) % 7 < 3:  # noqa: PLR2004
+        days += 1
+    return days
+
+
+def _new_year_delay(year: int) -> int:
+    """Extra postponement keeping year lengths within 353-355 / 383-385 days."""
+    ny0 = _elapsed_days(year - 1)
+    ny1 = _elapsed_days(year)
+    ny2 = _elapsed_days(year + 1)
+    if ny2 - ny1 == 356:  # noqa: PLR2004
+        return 2
+    if ny1 - ny0 == 382:  # noqa: PLR2004
+        return 1
+    return 0
+
+
+@lru_cache(maxsize=1024)
+def new_year(year: int) -> int:
+    """Ordinal of 1 Tishrei of ``year``."""
+    return HEBREW_EPOCH + _elapsed_days(year) + _new_year_delay(year)
+
+
+def days_in_year(year: int) -> int:
+    return new_year(year + 1) - new_year(year)
+
+
+def month_length(year: int, month: int) -> int:
+    """Days in ``month`` of ``year``; 0 for Adar II in a common year."""
+    if month == CHESHVAN:
+        return 30 if days_in_year(year) % 10 == 5 else 29  # noqa: PLR2004
+    if month == KISLEV:
+        return 29 if days_in_year(year) % 10 == 3 else 30  # noqa: PLR2004
+    if month == ADAR:
+        return 30 if is_leap(year) else 29
+    if month == ADAR_2:
+        return 29 if is_leap(year) else 0
+    # Nisan, Sivan, Av, Tishrei and Shevat are full; the rest are deficient.
+    return 30 if month in (1, 3, 5, 7, 11) else 29
+
+
+@lru_cache(maxsize=1024)
+def month_lengths(year: int) -> tuple[int, ...]:
+    """:func:`month_length` of every month of ``year``, indexed by month number."""
+    return (0, *(month_length(year, month) for month in range(1, 14)))
+
+
+@lru_cache(maxsize=1024)
+def month_starts(year: int) -> tuple[int, ...]:
+    """
+    Ordinals of the first day of each month, indexed by month number.
+
+    Index 0 is unused; Adar II in a common year gets the start of Nisan so
+    that lookups stay branch-free (its :func:`month_length` is 0).
+    """
+    lengths = month_lengths(year)
+    starts = [0] * 14
+    ordinal = new_year(year)
+    for month in YEAR_ORDER:
+        starts[month] = ordinal
+        ordinal += lengths[month]
+    return tuple(starts)
+
+
+def to_ordinal(year: int, month: int, day: int) -> int:
+    """Ordinal of ``day`` ``month`` ``year``; raises ValueError for invalid dates."""
+    return to_ordinals([(year, month, day)])[0]
+
+
+def to_ordinals(dates: Iterable[tuple[int, int, int]]) -> list[int]:
+    """Convert a batch of ``(year, month, day)`` tuples in one call."""
+    layouts: dict[int, tuple[tuple[int, ...], tuple[int, ...]]] = {}
+    ordinals = []
+    for year, month, day in dates:
+        layout = layouts.get(year)
+        if layout is None:
+            layout = layouts[year] = (month_starts(year), month_lengths(year))
+        starts, lengths = layout
+        if not 1 <= month <= ADAR_2 or not 1 <= day <= lengths[month]:
+            msg = f"Invalid Hebrew date: {year}-{month}-{day}"
+            raise ValueError(msg)
+        ordinals.append(starts[month] + day - 1)
+    return ordinals
+
+
+def year_of(ordinal: int) -> int:
+    """Hebrew year containing the Gregorian ``ordinal``."""
+    # Mean year length is 35975351 / 98496 days.
+    year = (ordinal - HEBREW_EPOCH) * 98496 // 35975351 + 1
+    while new_year(year + 1) <= ordinal:
+        year += 1
+    while new_year(year) > ordinal:
+        year -= 1
+    return year
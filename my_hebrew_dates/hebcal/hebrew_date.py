@@ -1,38 +1,477 @@
-# ruff: noqa: PLW2901
 import logging
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from collections.abc import Iterable
+from datetime import UTC
+from datetime import date
+from datetime import datetime
+from enum import IntEnum
+from pathlib import Path
+from typing import NamedTuple
 
-from pyluach import dates
-from pyluach.utils import _is_leap as is_leap
+from django.conf import settings
+
+from .hebrew_calendar import ADAR
+from .hebrew_calendar import ADAR_2
+from .hebrew_calendar import month_lengths
+from .hebrew_calendar import month_starts
+from .hebrew_calendar import new_year
+from .hebrew_calendar import year_of
 
 logger = logging.getLogger(__name__)
 
-lengths_of_months = [0, 30, 29, 30, 29, 30, 29, 30, 30, 30, 29, 30, 30, 29]
+MAX_DAY = 30
+# One slot per (month, day) pair the app can store: 13 months x 30 days.
+GRID_SIZE = 13 * MAX_DAY
+
+
+class MissingDay(IntEnum):
+    """
+    Where a date that doesn't exist in a given year (30 Cheshvan or Kislev in
+    a short year, 30 Adar I in a common year, 30 Iyar) is observed.
+
+    Each policy gets its own grid in every year table, so choosing one is an
+    index offset rather than a branch at lookup time.
+    """
+
+    # The month's last day; the usual yahrzeit custom.
+    PREVIOUS_DAY = 0
+    # The first day of the next month, as a bar mitzvah is reckoned.
+    NEXT_DAY = 1
+
+
+SLOTS_PER_YEAR = len(MissingDay) * GRID_SIZE
+
+
+class Horizon(NamedTuple):
+    """Hebrew years served around the current one: ``past`` before, ``future`` after."""
+
+    past: int = 0
+    future: int = 2
+
+    def years(self, current_year: int) -> range:
+        return range(current_year - self.past, current_year + self.future + 1)
+
+
+# The current Hebrew year and the two after it.
+DEFAULT_HORIZON = Horizon()
+
+
+class DateWindow(NamedTuple):
+    """Gregorian dates ``start`` through ``end``, both inclusive."""
+
+    start: date
+    end: date
+
+    def includes(self, day: date) -> bool:
+        return self.start <= day <= self.end
+
+    def horizon(self, current_year: int) -> Horizon:
+        """The smallest horizon around ``current_year`` covering the window."""
+        return Horizon(
+            past=max(current_year - year_of(self.start.toordinal()), 0),
+            future=max(year_of(self.end.toordinal()) - current_year, 0),
+        )
+
+
+def slot(month: int, day: int, policy: MissingDay = MissingDay.PREVIOUS_DAY) -> int:
+    """Index of ``month``/``day`` in a year table, or -1 if it can't be stored."""
+    if 1 <= month <= ADAR_2 and 1 <= day <= MAX_DAY:
+        return policy * GRID_SIZE + (month - 1) * MAX_DAY + day - 1
+    return -1
+
+
+def build_year(year: int) -> array:
+    """
+    Gregorian proleptic ordinals of every ``(month, day)`` slot in ``year``,
+    one grid per :class:`MissingDay` policy.
+
+    Adar II falls back to Adar in common years; days missing from short
+    months are resolved by each grid's policy.
+    """
+    starts = month_starts(year)
+    lengths = month_lengths(year)
+    year_table = array("i", bytes(SLOTS_PER_YEAR * array("i").itemsize))
+    for month in range(1, 14):
+        target = month if lengths[month] else ADAR
+        start = starts[target] - 1
+        length = lengths[target]
+        previous_day = MissingDay.PREVIOUS_DAY * GRID_SIZE + (month - 1) * MAX_DAY - 1
+        next_day = MissingDay.NEXT_DAY * GRID_SIZE + (month - 1) * MAX_DAY - 1
+        for day in range(1, MAX_DAY + 1):
+            year_table[previous_day + day] = start + min(day, length)
+            year_table[next_day + day] = start + min(day, length + 1)
+    return year_table
+
+
+# Table file layout: this header, then one native-endian ``build_year`` array
+# per year, in order.
+FILE_MAGIC = b"HDTB"
+FILE_VERSION = 2
+FILE_HEADER = struct.Struct("<4sHcxii")
+BYTE_ORDER = b"<" if sys.byteorder == "little" else b">"
+
+
+def write_table_file(path: str | Path, years: range) -> None:
+    """Write the tables for ``years`` to ``path``, atomically replacing it."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as tmp_file:
+            tmp_file.write(
+                FILE_HEADER.pack(
+                    FILE_MAGIC,
+                    FILE_VERSION,
+                    BYTE_ORDER,
+                    years.start,
+                    len(years),
+                ),
+            )
+            for year in years:
+                build_year(year).tofile(tmp_file)
+        Path(tmp_path).chmod(0o644)
+        Path(tmp_path).replace(path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+
+class MappedTables:
+    """
+    Year tables read from a file written by :func:`write_table_file`.
+
+    The file is memory-mapped read-only, so every process on the host shares
+    the same physical pages instead of building its own copy.
+    """
+
+    def __init__(self, path: str | Path):
+        with Path(path).open("rb") as table_file:
+            self._mmap = mmap.mmap(table_file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self.years = self._read_header(self._mmap, path)
+        except ValueError:
+            self._mmap.close()
+            raise
+        self.path = Path(path)
+        self._view = memoryview(self._mmap)[FILE_HEADER.size :].cast("i")
+
+    @staticmethod
+    def _read_header(buffer: mmap.mmap, path: str | Path) -> range:
+        if len(buffer) < FILE_HEADER.size:
+            msg = f"{path} is not a conversion table file"
+            raise ValueError(msg)
+        magic, version, byte_order, start_year, year_count = FILE_HEADER.unpack_from(
+            buffer,
+        )
+        if (magic, version, byte_order) != (FILE_MAGIC, FILE_VERSION, BYTE_ORDER):
+            msg = f"{path} is not a compatible conversion table file"
+            raise ValueError(msg)
+        if len(buffer) != FILE_HEADER.size + year_count * SLOTS_PER_YEAR * 4:
+            msg = f"{path} is truncated"
+            raise ValueError(msg)
+        return range(start_year, start_year + year_count)
+
+    def covers(self, years: range) -> bool:
+        return years.start >= self.years.start and years.stop <= self.years.stop
+
+    def get(self, year: int) -> memoryview | None:
+        if year not in self.years:
+            return None
+        start = (year - self.years.start) * SLOTS_PER_YEAR
+        return self._view[start : start + SLOTS_PER_YEAR]
+
+    @classmethod
+    def load(cls, path: str | Path) -> "MappedTables | None":
+        """Map ``path``, or return None if it is missing or unreadable."""
+        try:
+            return cls(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as exc:
+            logger.warning("Ignoring conversion table file %s: %s", path, exc)
+            return None
+
+
+class TableWindow:
+    """The year tables covering one horizon, resolved once and then indexed."""
+
+    __slots__ = ("_tables", "years")
+
+    def __init__(self, years: range, tables: tuple[array | memoryview, ...]):
+        self.years = years
+        self._tables = tables
+
+    def get_english_dates(
+        self,
+        month: int,
+        day: int,
+        policy: MissingDay = MissingDay.PREVIOUS_DAY,
+    ) -> list[date]:
+        """Return the Gregorian dates of ``month``/``day`` across the window."""
+        fromordinal = date.fromordinal
+        return [
+            fromordinal(ordinal) for ordinal in self.get_ordinals(month, day, policy)
+        ]
+
+    def get_ordinals(
+        self,
+        month: int,
+        day: int,
+        policy: MissingDay = MissingDay.PREVIOUS_DAY,
+    ) -> list[int]:
+        """Like :meth:`get_english_dates`, as proleptic Gregorian ordinals."""
+        if not (0 < month <= ADAR_2 and 0 < day <= MAX_DAY):
+            return []
+        index = policy * GRID_SIZE + (month - 1) * MAX_DAY + day - 1
+        return [table[index] for table in self._tables]
+
+    def occurrences(
+        self,
+        keys: Iterable[tuple[int, int, MissingDay]],
+    ) -> dict[tuple[int, int, MissingDay], list[date]]:
+        """
+        Map every distinct ``(month, day, policy)`` in ``keys`` to its dates.
+
+        Each key is converted once however often it repeats, and the dates
+        are shared between repeats, so callers must not mutate them.
+        """
+        fromordinal = date.fromordinal
+        tables = self._tables
+        result: dict[tuple[int, int, MissingDay], list[date]] = {}
+        for key in keys:
+            if key in result:
+                continue
+            month, day, policy = key
+            if 0 < month <= ADAR_2 and 0 < day <= MAX_DAY:
+                index = policy * GRID_SIZE + (month - 1) * MAX_DAY + day - 1
+                result[key] = [fromordinal(table[index]) for table in tables]
+            else:
+                result[key] = []
+        return result
+
+
+class ConversionTable:
+    """
+    Hebrew → Gregorian lookup tables, built per Hebrew year on demand.
+
+    Each year is stored as a flat ``array`` of ordinals (see :func:`slot`)
+    rather than ``date`` objects, which keeps the per-worker footprint to a
+    couple of kilobytes per year and makes lookups plain indexing. At most
+    ``max_years`` years are kept, evicting the least recently used, so an
+    occasional long horizon doesn't pin its years in every worker.
+
+    With a ``path``, years are first looked up in a shared memory-mapped
+    table file (see :class:`MappedTables`); the file is (re)written for
+    ``file_horizon`` whenever it doesn't cover the default window.
+
+    Nothing is computed at import time: tables are built (or the file is
+    mapped) on first use, and the default window rolls forward the first
+    time it is requested on or after the next Rosh Hashana, so long-lived
+    workers never serve a stale window.
+    """
+
+    def __init__(
+        self,
+        horizon: Horizon = DEFAULT_HORIZON,
+        max_years: int = 32,
+        recheck_interval: float = 60,
+        path: str | Path | None = None,
+        file_horizon: Horizon | None = None,
+    ):
+        self.horizon = horizon
+        self.path = path
+        self.file_horizon = file_horizon or horizon
+        self._mapped: MappedTables | None = None
+        self.max_years = max(max_years, len(horizon.years(0)))
+        # ``date.today()`` is slow relative to a lookup, so the calendar date
+        # is only consulted every ``recheck_interval`` seconds.
+        self.recheck_interval = recheck_interval
+        self._recheck_at = 0.0
+        self._tables: OrderedDict[int, array] = OrderedDict()
+        self._current_year: int | None = None
+        # Gregorian ordinal of the next Rosh Hashana.
+        self._expires = 0
+        self._default_window: TableWindow | None = None
+        self._lock = threading.Lock()
+        # Seconds spent building each cached Hebrew year, for observability.
+        self.build_timings: dict[int, float] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def today() -> date:
+        return date.today()  # noqa: DTZ011
+
+    @classmethod
+    def current_year(cls) -> int:
+        return year_of(cls.today().toordinal())
+
+    @classmethod
+    def year_started(cls) -> datetime:
+        """
+        Midnight UTC on Rosh Hashana of the current year, when the feed
+        window last rolled forward.
+        """
+        rosh_hashana = date.fromordinal(new_year(cls.current_year()))
+        return datetime(
+            rosh_hashana.year,
+            rosh_hashana.month,
+            rosh_hashana.day,
+            tzinfo=UTC,
+        )
+
+    @property
+    def start_year(self) -> int | None:
+        """First year of the default window, once it has been built."""
+        if self._default_window is None:
+            return None
+        return self._default_window.years.start
+
+    def _check_year(self) -> int:
+        if time.time() >= self._recheck_at:
+            with self._lock:
+                if self.today().toordinal() >= self._expires:
+                    self._current_year = self.current_year()
+                    self._expires = new_year(self._current_year + 1)
+                    self._default_window = None
+                    self._map_file()
+                self._recheck_at = time.time() + self.recheck_interval
+        return self._current_year  # type: ignore[return-value]
+
+    def _map_file(self) -> None:
+        # Callers hold the lock.
+        if not self.path:
+            return
+        needed = self.horizon.years(self._current_year)  # type: ignore[arg-type]
+        if self._mapped is None or not self._mapped.covers(needed):
+            # Another process may already have regenerated it.
+            self._mapped = MappedTables.load(self.path)
+        if self._mapped is not None and self._mapped.covers(needed):
+            return
+        years = self.file_horizon.years(self._current_year)  # type: ignore[arg-type]
+        try:
+            write_table_file(self.path, years)
+        except OSError:
+            logger.exception("Could not write conversion table file %s", self.path)
+            return
+        logger.info(
+            "Wrote conversion table file %s for years %s-%s",
+            self.path,
+            years.start,
+            years.stop - 1,
+        )
+        self._mapped = MappedTables.load(self.path)
+
+    def _year_table(self, year: int) -> array | memoryview:
+        # Callers hold the lock.
+        if self._mapped is not None:
+            mapped_table = self._mapped.get(year)
+            if mapped_table is not None:
+                self.hits += 1
+                return mapped_table
+        table = self._tables.get(year)
+        if table is not None:
+            self._tables.move_to_end(year)
+            self.hits += 1
+            return table
+        self.misses += 1
+        started = time.perf_counter()
+        table = self._tables[year] = build_year(year)
+        self.build_timings[year] = time.perf_counter() - started
+        logger.info(
+            "Built Hebrew year %s conversion table in %.3fs",
+            year,
+            self.build_timings[year],
+        )
+        while len(self._tables) > self.max_years:
+            evicted, _ = self._tables.popitem(last=False)
+            self.build_timings.pop(evicted, None)
+            self.evictions += 1
+        return table
+
+    def window(self, horizon: Horizon | None = None) -> TableWindow:
+        """Resolve the tables for ``horizon`` (the default one if omitted)."""
+        current_year = self._check_year()
+        if horizon is None or horizon == self.horizon:
+            default_window = self._default_window
+            if default_window is not None:
+                return default_window
+            horizon = self.horizon
+        years = horizon.years(current_year)
+        with self._lock:
+            window = TableWindow(years, tuple(self._year_table(y) for y in years))
+            if horizon == self.horizon and current_year == self._current_year:
+                self._default_window = window
+        return window
 
-ADAR_2 = 13
+    def get_english_dates(
+        self,
+        month: int,
+        day: int,
+        horizon: Horizon | None = None,
+        policy: MissingDay = MissingDay.PREVIOUS_DAY,
+    ) -> list[date]:
+        return self.window(horizon).get_english_dates(month, day, policy)
 
+    def get_ordinals(
+        self,
+        month: int,
+        day: int,
+        horizon: Horizon | None = None,
+        policy: MissingDay = MissingDay.PREVIOUS_DAY,
+    ) -> list[int]:
+        return self.window(horizon).get_ordinals(month, day, policy)
 
-def create_hebrew_to_english_dict() -> dict[str, list[object]]:
-    logger.info("Creating hebrew_to_english_dict")
-    hebrew_to_english_dict: dict[str, list[object]] = {}
-    today_year = dates.HebrewDate.today().year
+    def occurrences(
+        self,
+        keys: Iterable[tuple[int, int, MissingDay]],
+        horizon: Horizon | None = None,
+    ) -> dict[tuple[int, int, MissingDay], list[date]]:
+        return self.window(horizon).occurrences(keys)
 
-    for year in range(today_year, today_year + 3):  # three years
-        for month in range(1, 14):
-            mstring = month
-            if not is_leap(year) and month == ADAR_2:
-                month = month - 1
-            for day in range(1, lengths_of_months[month] + 1):
-                try:
-                    hebrew_date = dates.HebrewDate(year, month, day)
-                except ValueError:
-                    hebrew_date = dates.HebrewDate(year, month, day - 1)
-                english_date = hebrew_date.to_pydate()
-                hebrew_to_english_dict.setdefault(f"{mstring}-{day}", []).append(
-                    english_date,
-                )
+    def stats(self) -> dict[str, object]:
+        return {
+            "current_year": self._current_year,
+            "mapped_file": str(self.path) if self._mapped else None,
+            "mapped_years": list(self._mapped.years) if self._mapped else [],
+            "years": sorted(self._tables),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "build_timings": dict(self.build_timings),
+            "total_build_seconds": sum(self.build_timings.values()),
+            "table_bytes": sum(
+                table.buffer_info()[1] * table.itemsize
+                for table in self._tables.values()
+            ),
+        }
 
-    logger.info("Finished creating hebrew_to_english_dict")
-    return hebrew_to_english_dict
+    def clear(self) -> None:
+        with self._lock:
+            self._tables = OrderedDict()
+            self.build_timings = {}
+            self._current_year = None
+            self._expires = 0
+            self._recheck_at = 0.0
+            self._default_window = None
+            self._mapped = None
+            self.hits = self.misses = self.evictions = 0
 
 
-hebrew_to_english_dict: dict[str, list[object]] = create_hebrew_to_english_dict()
+conversion_table = ConversionTable(
+    max_years=settings.HEBCAL_CONVERSION_CACHE_YEARS,
+    path=settings.HEBCAL_CONVERSION_TABLE_PATH,
+    file_horizon=Horizon(
+        past=settings.HEBCAL_FEED_MAX_PAST_YEARS,
+        future=settings.HEBCAL_FEED_MAX_FUTURE_YEARS,
+    ),
+)
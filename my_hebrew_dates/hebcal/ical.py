@@ -0,0 +1,107 @@
+"""
+Direct RFC 5545 serialization.
+
+Writes content lines straight into strings instead of building
+``icalendar`` components and encoding them property by property. Every
+helper reproduces what ``icalendar`` 6 writes for the same value (text
+escaping, folding at 75 octets, DATE / UTC DATE-TIME / DURATION values), so
+feeds stay byte-identical; see ``tests/golden/``.
+"""
+
+from datetime import UTC
+from datetime import date
+from datetime import datetime
+from datetime import timedelta
+
+CRLF = "\r\n"
+# Content lines are folded so no line exceeds 75 octets, excluding the CRLF.
+FOLD_LIMIT = 75
+FOLD_SEPARATOR = "\r\n "
+
+
+def escape_text(value: str) -> str:
+    """Escape a TEXT value (RFC 5545 3.3.11)."""
+    # Same order as icalendar's escape_char, including its ``\N`` quirk.
+    return (
+        value.replace(r"\N", "\n")
+        .replace("\\", "\\\\")
+        .replace(";", r"\;")
+        .replace(",", r"\,")
+        .replace("\r\n", r"\n")
+        .replace("\n", r"\n")
+    )
+
+
+def fold(line: str) -> str:
+    """Fold ``line`` into chunks of at most 75 octets (RFC 5545 3.1)."""
+    if line.isascii():
+        if len(line) < FOLD_LIMIT:
+            return line
+        step = FOLD_LIMIT - 1
+        return FOLD_SEPARATOR.join(
+            line[start : start + step] for start in range(0, len(line), step)
+        )
+    chars = []
+    octets = 0
+    for char in line:
+        code_point = ord(char)
+        if code_point < 0x80:  # noqa: PLR2004
+            width = 1
+        elif code_point < 0x800:  # noqa: PLR2004
+            width = 2
+        elif code_point < 0x10000:  # noqa: PLR2004
+            width = 3
+        else:
+            width = 4
+        octets += width
+        if octets >= FOLD_LIMIT:
+            chars.append(FOLD_SEPARATOR)
+            octets = width
+        chars.append(char)
+    return "".join(chars)
+
+
+def content_line(name: str, value: str, parameters: str = "") -> str:
+    """One folded, CRLF-terminated content line; ``value`` is already encoded."""
+    if parameters:
+        return fold(f"{name};{parameters}:{value}") + CRLF
+    return fold(f"{name}:{value}") + CRLF
+
+
+def text_line(name: str, value: str) -> str:
+    return content_line(name, escape_text(value))
+
+
+def format_date(value: date) -> str:
+    return f"{value.year:04}{value.month:02}{value.day:02}"
+
+
+def format_utc(value: datetime) -> str:
+    """A DATE-TIME in UTC form; naive values are taken to be UTC already."""
+    if value.tzinfo is not None:
+        value = value.astimezone(UTC)
+    return (
+        f"{value.year:04}{value.month:02}{value.day:02}"
+        f"T{value.hour:02}{value.minute:02}{value.second:02}Z"
+    )
+
+
+def format_duration(value: timedelta) -> str:
+    sign = ""
+    if value.days < 0:
+        sign = "-"
+        value = -value
+    time_part = ""
+    if value.seconds:
+        hours, rest = divmod(value.seconds, 3600)
+        minutes, seconds = divmod(rest, 60)
+        time_part = "T"
+        if hours:
+            time_part += f"{hours}H"
+        if minutes or (hours and seconds):
+            time_part += f"{minutes}M"
+        if seconds:
+            time_part += f"{seconds}S"
+    if value.days == 0 and time_part:
+        return f"{sign}P{time_part}"
+    return f"{sign}P{value.days}D{time_part}"
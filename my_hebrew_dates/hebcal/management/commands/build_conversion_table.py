@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from my_hebrew_dates.hebcal.hebrew_date import ConversionTable
+from my_hebrew_dates.hebcal.hebrew_date import MappedTables
+from my_hebrew_dates.hebcal.hebrew_date import write_table_file
+
+
+class Command(BaseCommand):
+    help = (
+        "Write the Hebrew→Gregorian conversion table file that workers memory-map "
+        "(HEBCAL_CONVERSION_TABLE_PATH)."
+    )
+
+    def add_arguments(self, parser):
+        current_year = ConversionTable.current_year()
+        parser.add_argument(
+            "--start-year",
+            type=int,
+            default=current_year - settings.HEBCAL_FEED_MAX_PAST_YEARS,
+            help="First Hebrew year to include.",
+        )
+        parser.add_argument(
+            "--end-year",
+            type=int,
+            default=current_year + settings.HEBCAL_FEED_MAX_FUTURE_YEARS,
+            help="Last Hebrew year to include.",
+        )
+        parser.add_argument(
+            "--output",
+            default=settings.HEBCAL_CONVERSION_TABLE_PATH,
+            help="File to write. Defaults to HEBCAL_CONVERSION_TABLE_PATH.",
+        )
+
+    def handle(self, *args, **options):
+        if not options["output"]:
+            msg = "No --output given and HEBCAL_CONVERSION_TABLE_PATH is not set."
+            raise CommandError(msg)
+        if options["end_year"] < options["start_year"]:
+            msg = "--end-year must not be before --start-year."
+            raise CommandError(msg)
+
+        years = range(options["start_year"], options["end_year"] + 1)
+        write_table_file(options["output"], years)
+        mapped = MappedTables(options["output"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote {options['output']} covering Hebrew years "
+                f"{mapped.years.start}-{mapped.years.stop - 1}.",
+            ),
+        )
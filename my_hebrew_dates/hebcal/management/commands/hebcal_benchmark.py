@@ -0,0 +1,51 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from my_hebrew_dates.hebcal.benchmarks import SUITES
+from my_hebrew_dates.hebcal.benchmarks import compare_reports
+from my_hebrew_dates.hebcal.benchmarks import environment
+
+
+class Command(BaseCommand):
+    help = "Run the hebcal performance benchmarks and print (or save) the results."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--suite",
+            action="append",
+            choices=sorted(SUITES),
+            help="Benchmark suite to run (repeatable). Defaults to all suites.",
+        )
+        parser.add_argument(
+            "--output",
+            help="Write the results as JSON to this file instead of stdout.",
+        )
+        parser.add_argument(
+            "--baseline",
+            help=(
+                "A report written by an earlier run (e.g. the last release); "
+                "adds each number's relative change under 'comparison'."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        results = {}
+        for name in options["suite"] or sorted(SUITES):
+            self.stderr.write(f"Running {name}...")
+            results[name] = SUITES[name]()
+        if options["baseline"]:
+            baseline = json.loads(Path(options["baseline"]).read_text())
+            results["comparison"] = compare_reports(
+                {name: baseline.get(name) for name in results},
+                results,
+            )
+        results["environment"] = environment()
+
+        report = json.dumps(results, indent=2, default=str)
+        if options["output"]:
+            Path(options["output"]).write_text(report + "\n")
+            self.stderr.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+        else:
+            self.stdout.write(report)
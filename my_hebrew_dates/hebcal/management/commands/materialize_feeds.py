@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from my_hebrew_dates.hebcal.models import Calendar
+from my_hebrew_dates.hebcal.tasks import refresh_calendar_feed
+from my_hebrew_dates.hebcal.utils import materialize_feed
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate and store the canonical feed (Calendar.calendar_file_str) of "
+        "every calendar whose stored feed is missing or stale."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="Calendars loaded per query.",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Regenerate fresh feeds too.",
+        )
+        parser.add_argument(
+            "--queue",
+            action="store_true",
+            help="Queue a Celery task per calendar instead of generating inline.",
+        )
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] < 1:
+            msg = "--chunk-size must be at least 1."
+            raise CommandError(msg)
+
+        calendars = Calendar.objects.order_by("pk").only(
+            "pk",
+            "calendar_file_generated",
+        )
+        last_pk = 0
+        checked = refreshed = 0
+        while True:
+            chunk = list(
+                calendars.filter(pk__gt=last_pk)[: options["chunk_size"]],
+            )
+            if not chunk:
+                break
+            last_pk = chunk[-1].pk
+            for calendar in chunk:
+                checked += 1
+                if not options["force"] and calendar.has_fresh_feed():
+                    continue
+                if options["queue"]:
+                    refresh_calendar_feed.delay(calendar.pk, force=options["force"])
+                    refreshed += 1
+                elif materialize_feed(calendar.pk, force=options["force"]):
+                    refreshed += 1
+            self.stderr.write(f"Checked {checked} calendars...")
+
+        verb = "Queued" if options["queue"] else "Refreshed"
+        self.stdout.write(
+            self.style.SUCCESS(f"{verb} {refreshed} of {checked} calendar feeds."),
+        )
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 12:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("hebcal", "0008_alter_calendar_timezone"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="calendar",
+            name="calendar_file_generated",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.1.4 on 2026-10-18 13:05
+
+from base64 import urlsafe_b64encode
+from hashlib import sha1
+
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def fill_uid_hash(apps, schema_editor):
+    # Historical models don't have HebrewDate.compute_uid_hash(); this is the
+    # same digest, so existing subscribers keep seeing the same UIDs.
+    HebrewDate = apps.get_model("hebcal", "HebrewDate")
+    rows = HebrewDate.objects.filter(uid_hash="").order_by("pk")
+    while batch := list(rows[:BATCH_SIZE]):
+        for row in batch:
+            hebrew_date = f"{row.get_day_display()} {row.get_month_display()}"
+            digest = sha1(  # noqa: S324
+                (row.event_type + row.name + hebrew_date).encode("utf-8"),
+            ).digest()
+            row.uid_hash = urlsafe_b64encode(digest).decode("ascii")
+        HebrewDate.objects.bulk_update(batch, ["uid_hash"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("hebcal", "0009_calendar_calendar_file_generated"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="hebrewdate",
+            name="uid_hash",
+            field=models.CharField(blank=True, editable=False, max_length=28),
+        ),
+        migrations.RunPython(fill_uid_hash, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.4 on 2026-10-18 12:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("hebcal", "0010_hebrewdate_uid_hash"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="calendar",
+            name="calendar_file_br",
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="calendar",
+            name="calendar_file_gzip",
+            field=models.BinaryField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.1.4 on 2026-10-18 13:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("hebcal", "0011_calendar_compressed_feeds"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HebrewDateChange",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("calendar_uuid", models.UUIDField()),
+                ("hebrew_date_id", models.BigIntegerField(blank=True, null=True)),
+                ("uid_hash", models.CharField(blank=True, max_length=28)),
+                ("action", models.CharField(choices=[("updated", "Created or modified"), ("deleted", "Deleted")], max_length=7)),
+                ("created", models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                "indexes": [models.Index(fields=["calendar_uuid", "id"], name="hebcal_hebr_calenda_2dd3f2_idx")],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.4 on 2026-10-18 13:21
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("hebcal", "0012_hebrewdatechange"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="calendar",
+            name="uuid",
+            field=models.UUIDField(default=uuid.uuid4, editable=False, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name="hebrewdate",
+            index=models.Index(fields=["calendar", "month", "day", "id"], name="hebcal_hebr_calenda_4806f3_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="hebrewdate",
+            index=models.Index(fields=["calendar", "day", "id"], name="hebcal_hebr_calenda_e2ba27_idx"),
+        ),
+        migrations.AlterField(
+            model_name="hebrewdate",
+            name="calendar",
+            field=models.ForeignKey(db_index=False, help_text="Select the calendar to which this event belongs.", on_delete=django.db.models.deletion.CASCADE, related_name="calendarOf", to="hebcal.calendar"),
+        ),
+    ]
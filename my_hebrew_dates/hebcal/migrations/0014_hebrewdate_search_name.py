@@ -0,0 +1,69 @@
+# Generated by Django 5.1.4 on 2026-10-18 13:28
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+FINAL_LETTERS = str.maketrans("ךםןףץ", "כמנפצ")
+NON_WORD = re.compile(r"[\W_]+")
+
+
+def fill_search_name(apps, schema_editor):
+    # The same normalization as search.normalize(), frozen here so this
+    # migration keeps doing what it did.
+    HebrewDate = apps.get_model("hebcal", "HebrewDate")
+    rows = HebrewDate.objects.order_by("pk")
+    last_pk = 0
+    while batch := list(rows.filter(pk__gt=last_pk)[:BATCH_SIZE]):
+        for row in batch:
+            decomposed = unicodedata.normalize("NFKD", row.name)
+            stripped = "".join(
+                char for char in decomposed if not unicodedata.combining(char)
+            )
+            folded = stripped.casefold().translate(FINAL_LETTERS)
+            row.search_name = NON_WORD.sub(" ", folded).strip()
+        HebrewDate.objects.bulk_update(batch, ["search_name"])
+        last_pk = batch[-1].pk
+
+
+def create_trigram_index(apps, schema_editor):
+    # pg_trgm ships with PostgreSQL's contrib modules, which not every server
+    # has; without it search.search() falls back to matching in Python.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'",
+        )
+        if cursor.fetchone() is None:
+            return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS hebcal_hebrewdate_search_name_trgm "
+        "ON hebcal_hebrewdate USING gin (search_name gin_trgm_ops)",
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS hebcal_hebrewdate_search_name_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("hebcal", "0013_calendar_uuid_unique_hebrewdate_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="hebrewdate",
+            name="search_name",
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.RunPython(fill_search_name, migrations.RunPython.noop),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
@@ -1,14 +1,29 @@
 # ruff: noqa: RUF001, DJ001
 import uuid
 import zoneinfo
+from base64 import urlsafe_b64encode
+from datetime import date
+from datetime import datetime
+from hashlib import sha1
+from typing import NamedTuple
 
 from django.conf import settings
 from django.db import models
 from django.urls import reverse
+from django.utils import timezone
 
 from my_hebrew_dates.core.models import TimeStampedModel
 
-from .hebrew_date import hebrew_to_english_dict
+from .compression import BROTLI
+from .compression import GZIP
+from .compression import IDENTITY
+from .hebrew_calendar import year_of
+from .hebrew_date import ConversionTable
+from .hebrew_date import DateWindow
+from .hebrew_date import Horizon
+from .hebrew_date import MissingDay
+from .hebrew_date import conversion_table
+from .search import normalize
 
 
 class HebrewMonthEnum(models.IntegerChoices):
@@ -62,7 +77,8 @@ class HebrewDayEnum(models.IntegerChoices):
 
 class Calendar(TimeStampedModel):
     name = models.CharField(max_length=255)
-    uuid = models.UUIDField(default=uuid.uuid4, editable=False)
+    # Every public URL looks calendars up by it.
+    uuid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
     owner = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
@@ -79,7 +95,22 @@ class Calendar(TimeStampedModel):
         default="America/New_York",
         help_text="Select the timezone that matches your local time. This ensures your events show up at the correct times.",  # noqa: E501
     )
+    # The canonical feed (default alarm and horizon), regenerated in the
+    # background whenever the calendar or one of its events changes, and
+    # stored once per content encoding.
     calendar_file_str = models.TextField(blank=True, null=True)
+    calendar_file_gzip = models.BinaryField(blank=True, null=True)
+    calendar_file_br = models.BinaryField(blank=True, null=True)
+    calendar_file_generated = models.DateTimeField(
+        blank=True,
+        null=True,
+        editable=False,
+    )
+    MATERIALIZED_FEED_FIELDS = {
+        IDENTITY: "calendar_file_str",
+        GZIP: "calendar_file_gzip",
+        BROTLI: "calendar_file_br",
+    }
 
     def __str__(self):
         return self.name
@@ -87,6 +118,137 @@ class Calendar(TimeStampedModel):
     def get_absolute_url(self):
         return reverse("hebcal:calendar_edit", kwargs={"uuid": self.uuid})
 
+    def get_feed_last_modified(self) -> datetime:
+        """
+        When the calendar's feeds last changed.
+
+        That is the latest write to the calendar or its events (every event
+        write touches the calendar, see ``signals.invalidate_feed``), or the
+        start of the current Hebrew year, when the feed window last rolled
+        forward. Reads nothing but the calendar row.
+        """
+        return max(self.modified, ConversionTable.year_started())
+
+    def has_fresh_feed(self) -> bool:
+        """
+        Whether the stored feed can be served as is.
+
+        Writes clear ``calendar_file_generated``; a feed generated before the
+        current Hebrew year started covers last year's window and is stale too.
+        """
+        if self.calendar_file_generated is None:
+            return False
+        generated_on = timezone.localtime(self.calendar_file_generated).date()
+        return year_of(generated_on.toordinal()) == ConversionTable.current_year()
+
+    def get_materialized_feed(self, encoding: str = IDENTITY) -> bytes | None:
+        """
+        The stored feed in ``encoding``, or ``None`` if it is stale or missing.
+
+        A deferred feed column is loaded on its own, and only if it still
+        belongs to the same generation.
+        """
+        if not self.has_fresh_feed():
+            return None
+        field = self.MATERIALIZED_FEED_FIELDS[encoding]
+        if field in self.get_deferred_fields():
+            feed = (
+                Calendar.objects.filter(
+                    pk=self.pk,
+                    calendar_file_generated=self.calendar_file_generated,
+                )
+                .values_list(field, flat=True)
+                .first()
+            )
+        else:
+            feed = getattr(self, field)
+        if feed is None:
+            return None
+        return feed.encode() if isinstance(feed, str) else bytes(feed)
+
+
+class HebrewDateQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for hebrew_date in objs:
+            hebrew_date.uid_hash = hebrew_date.compute_uid_hash()
+            hebrew_date.search_name = normalize(hebrew_date.name)
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        # auto_now only applies on save(); cached fragments are keyed on
+        # ``modified``, so rows written here must move it too.
+        if fields and "modified" not in fields:
+            now = timezone.now()
+            for hebrew_date in objs:
+                hebrew_date.modified = now
+            fields = [*fields, "modified"]
+        if not set(fields).isdisjoint(HebrewDate.UID_HASH_FIELDS):
+            for hebrew_date in objs:
+                hebrew_date.uid_hash = hebrew_date.compute_uid_hash()
+            fields = [*fields, "uid_hash"]
+        if "name" in fields:
+            for hebrew_date in objs:
+                hebrew_date.search_name = normalize(hebrew_date.name)
+            fields = [*fields, "search_name"]
+        return super().bulk_update(objs, fields, *args, **kwargs)
+
+    def with_english_dates(
+        self,
+        horizon: Horizon | None = None,
+        window: DateWindow | None = None,
+    ) -> list[tuple["HebrewDate", list[date]]]:
+        """
+        Pair every row with its Gregorian dates, converting in one batch.
+
+        Rows sharing a Hebrew day share one (read-only) list of dates. With a
+        ``window``, only dates inside it are kept and rows left without any
+        are dropped. Works on prefetched querysets without hitting the
+        database again.
+        """
+        return pair_english_dates(list(self), horizon, window)
+
+    def feed_rows(
+        self,
+        horizon: Horizon | None = None,
+        window: DateWindow | None = None,
+    ) -> list[tuple["FeedRow", list[date]]]:
+        """
+        Like :meth:`with_english_dates`, with :class:`FeedRow` tuples fetched
+        by ``values_list`` instead of model instances. Prefetched querysets
+        are converted without hitting the database again.
+        """
+        if self._result_cache is not None:
+            rows = [
+                FeedRow._make(getattr(hebrew_date, field) for field in FeedRow._fields)
+                for hebrew_date in self._result_cache
+            ]
+        else:
+            rows = [
+                FeedRow._make(values) for values in self.values_list(*FeedRow._fields)
+            ]
+        return pair_english_dates(rows, horizon, window)
+
+
+def pair_english_dates[Row: HebrewDate | FeedRow](
+    rows: list[Row],
+    horizon: Horizon | None = None,
+    window: DateWindow | None = None,
+) -> list[tuple[Row, list[date]]]:
+    """See :meth:`HebrewDateQuerySet.with_english_dates`."""
+    occurrences = conversion_table.occurrences(
+        (row.occurrence_key for row in rows),
+        horizon,
+    )
+    if window is not None:
+        occurrences = {
+            key: [day for day in english_dates if window.includes(day)]
+            for key, english_dates in occurrences.items()
+        }
+        rows = [row for row in rows if occurrences[row.occurrence_key]]
+    return [(row, occurrences[row.occurrence_key]) for row in rows]
+
 
 class HebrewDate(TimeStampedModel):
     name = models.CharField(
@@ -113,28 +275,88 @@ class HebrewDate(TimeStampedModel):
         help_text="Choose the type of event, such as a Birthday, Anniversary, "
         "or Yartzeit.",
     )
+    # How each event type observes a day its month lacks in a given year.
+    MISSING_DAY_POLICIES = {
+        "🎂": MissingDay.NEXT_DAY,
+        "💍": MissingDay.PREVIOUS_DAY,
+        "🕯️": MissingDay.PREVIOUS_DAY,
+    }
 
     calendar = models.ForeignKey(
         "hebcal.Calendar",
         on_delete=models.CASCADE,
         related_name="calendarOf",
         help_text="Select the calendar to which this event belongs.",
+        # Covered by the (calendar, month, day, id) index.
+        db_index=False,
     )
+    # The date-independent part of every UID this event emits, kept in step
+    # with the fields it is derived from by save() and bulk_create/bulk_update.
+    uid_hash = models.CharField(max_length=28, blank=True, editable=False)
+    UID_HASH_FIELDS = ("event_type", "name", "month", "day")
+    # The name as search.search() matches it, kept in step the same way.
+    search_name = models.CharField(max_length=255, blank=True, editable=False)
+
+    objects = HebrewDateQuerySet.as_manager()
+
+    class Meta:
+        # A calendar's events, filtered by month and day or paged through in
+        # either sort order of the edit table (see views.EDIT_SORTS).
+        indexes = [
+            models.Index(fields=["calendar", "month", "day", "id"]),
+            models.Index(fields=["calendar", "day", "id"]),
+        ]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        # The UIDs being replaced, for the sync change log (signals.py).
+        self.previous_uid_hash = self.uid_hash
+        self.uid_hash = self.compute_uid_hash()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and not set(update_fields).isdisjoint(
+            self.UID_HASH_FIELDS,
+        ):
+            kwargs["update_fields"] = {*update_fields, "uid_hash"}
+        self.search_name = normalize(self.name)
+        if update_fields is not None and "name" in update_fields:
+            kwargs["update_fields"] = {*kwargs["update_fields"], "search_name"}
+        super().save(*args, **kwargs)
+
     def get_absolute_url(self):
         return reverse("hebcal:calendar_edit", kwargs={"uuid": self.calendar.uuid})
 
+    def compute_uid_hash(self) -> str:
+        """URL-safe base64 SHA-1 of the event type, name and Hebrew date."""
+        digest = sha1(  # noqa: S324
+            (self.event_type + self.name + self.get_hebrew_date()).encode("utf-8"),
+        ).digest()
+        return urlsafe_b64encode(digest).decode("ascii")
+
     def get_hebrew_date(self):
         hebrew_month = self.get_month_display()
         hebrew_day = self.get_day_display()
         return f"{hebrew_day} {hebrew_month}"
 
-    def get_english_dates(self):
-        hebrew_str = f"{self.month}-{self.day}"
-        return hebrew_to_english_dict.get(hebrew_str)
+    @property
+    def missing_day_policy(self) -> MissingDay:
+        return self.MISSING_DAY_POLICIES.get(
+            self.event_type,
+            MissingDay.PREVIOUS_DAY,
+        )
+
+    @property
+    def occurrence_key(self) -> tuple[int, int, MissingDay]:
+        return (self.month, self.day, self.missing_day_policy)
+
+    def get_english_dates(self, horizon: Horizon | None = None):
+        return conversion_table.get_english_dates(
+            self.month,
+            self.day,
+            horizon,
+            self.missing_day_policy,
+        )
 
     def get_formatted_name(self):
         capitalized_date = (
@@ -173,3 +395,73 @@ class HebrewDate(TimeStampedModel):
         Get the month number according to RFC 7529 specification.
         """
         return self._month_to_rfc(self.month)
+
+
+class FeedRow(NamedTuple):
+    """
+    The columns of a ``HebrewDate`` that feed generation reads, with the
+    same accessors, for building feeds without instantiating the model.
+    """
+
+    pk: int
+    name: str
+    month: int
+    day: int
+    event_type: str
+    uid_hash: str
+    modified: datetime
+
+    def get_hebrew_date(self) -> str:
+        hebrew_day = HEBREW_DAYS.get(self.day, self.day)
+        hebrew_month = HEBREW_MONTHS.get(self.month, self.month)
+        return f"{hebrew_day} {hebrew_month}"
+
+    def get_event_type_display(self) -> str:
+        return EVENT_TYPES.get(self.event_type, self.event_type)
+
+    @property
+    def missing_day_policy(self) -> MissingDay:
+        return HebrewDate.MISSING_DAY_POLICIES.get(
+            self.event_type,
+            MissingDay.PREVIOUS_DAY,
+        )
+
+    @property
+    def occurrence_key(self) -> tuple[int, int, MissingDay]:
+        return (self.month, self.day, self.missing_day_policy)
+
+    def get_rfc7529_month(self) -> int | str:
+        return HebrewDate._month_to_rfc(self.month)  # noqa: SLF001
+
+
+# Display labels, as the model's get_FOO_display() methods return them.
+HEBREW_MONTHS = dict(HebrewMonthEnum.choices)
+HEBREW_DAYS = dict(HebrewDayEnum.choices)
+EVENT_TYPES = dict(HebrewDate.EVENT_CHOICES)
+
+
+class HebrewDateChange(models.Model):
+    """
+    One write to a calendar's events, for incremental sync (see ``sync.py``).
+
+    Rows are never updated; the primary key orders them. Calendars and events
+    are referenced by value so that tombstones outlive what they describe.
+    """
+
+    class Action(models.TextChoices):
+        UPDATED = "updated", "Created or modified"
+        DELETED = "deleted", "Deleted"
+
+    calendar_uuid = models.UUIDField()
+    # ``None`` for the deletion of the calendar itself.
+    hebrew_date_id = models.BigIntegerField(null=True, blank=True)
+    # The UID suffix shared by the event's occurrences.
+    uid_hash = models.CharField(max_length=28, blank=True)
+    action = models.CharField(max_length=7, choices=Action.choices)
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["calendar_uuid", "id"])]
+
+    def __str__(self):
+        return f"{self.calendar_uuid} {self.hebrew_date_id} {self.action}"
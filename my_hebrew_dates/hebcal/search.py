@@ -0,0 +1,169 @@
+"""
+Fuzzy, ranked search of event names.
+
+Names are matched on ``HebrewDate.search_name``, a normalized copy kept in
+step by ``save()`` and ``bulk_create``/``bulk_update``: case-folded, with
+Latin accents and Hebrew niqqud and cantillation removed, final letters
+written in their regular form (ם→מ) and punctuation turned into spaces.
+So "Yosef", "yosef" and "יוֹסֵף" each find the names they should, whether
+typed with vowel points or not.
+
+A query matches a name that contains it, or whose best-matching words are
+similar enough to it by trigrams (pg_trgm's ``%>``, word similarity);
+results are ranked from 1000 (contains the query) down. On PostgreSQL with
+``pg_trgm`` (see migration 0014) this runs in the database on a GIN index.
+Elsewhere the same scoring runs in Python over the calendar's names, which
+is fine for tests and small calendars; only the best
+``PYTHON_MAX_RESULTS`` matches are kept, so the ranks handed back to the
+database stay small.
+"""
+
+import heapq
+import re
+import unicodedata
+from collections import defaultdict
+from functools import cache
+
+from django.conf import settings
+from django.contrib.postgres.lookups import TrigramWordSimilar
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import connections
+from django.db.models import Case
+from django.db.models import F
+from django.db.models import IntegerField
+from django.db.models import Q
+from django.db.models import QuerySet
+from django.db.models import Value
+from django.db.models import When
+from django.db.models.functions import Cast
+
+TRIGRAM = "trigram"
+PYTHON = "python"
+
+# Ranks are similarities scaled to integers, so results can be paged by
+# keyset on them.
+MAX_RANK = 1000
+# pg_trgm's default pg_trgm.word_similarity_threshold.
+WORD_SIMILARITY_THRESHOLD = 0.6
+# Matches the Python backend returns at most.
+PYTHON_MAX_RESULTS = 500
+
+FINAL_LETTERS = str.maketrans("ךםןףץ", "כמנפצ")
+NON_WORD = re.compile(r"[\W_]+")
+
+
+def normalize(text: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", text)
+    # Accents, niqqud and cantillation marks are all combining characters.
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    folded = stripped.casefold().translate(FINAL_LETTERS)
+    return NON_WORD.sub(" ", folded).strip()
+
+
+def trigrams(text: str) -> set[str]:
+    """pg_trgm's trigrams: those of each word, padded "  word "."""
+    return {
+        padded[index : index + 3]
+        for word in text.split()
+        for padded in (f"  {word} ",)
+        for index in range(len(padded) - 2)
+    }
+
+
+def word_similarity(query: str, text: str) -> float:
+    """
+    How well ``query`` matches the most similar run of words in ``text``.
+
+    An approximation of pg_trgm's ``word_similarity``, which looks for the
+    most similar extent of ``text`` trigram by trigram: this compares the
+    query with every run of as many consecutive words as it has.
+    """
+    query_trigrams = trigrams(query)
+    if not query_trigrams:
+        return 0.0
+    words = text.split()
+    width = min(len(query.split()), len(words))
+    best = 0.0
+    for start in range(len(words) - width + 1):
+        span = trigrams(" ".join(words[start : start + width]))
+        best = max(best, len(query_trigrams & span) / len(query_trigrams))
+    return best
+
+
+def rank(query: str, search_name: str) -> int:
+    """The rank of a normalized name for a normalized query; 0 is no match."""
+    if query in search_name:
+        return MAX_RANK
+    similarity = word_similarity(query, search_name)
+    if similarity < WORD_SIMILARITY_THRESHOLD:
+        return 0
+    return int(similarity * (MAX_RANK - 1))
+
+
+@cache
+def has_pg_trgm(alias: str) -> bool:
+    connection = connections[alias]
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+def get_backend(alias: str = "default") -> str:
+    """``HEBCAL_SEARCH_BACKEND``, with ``"auto"`` resolved for the database."""
+    backend = settings.HEBCAL_SEARCH_BACKEND
+    if backend == "auto":
+        return TRIGRAM if has_pg_trgm(alias) else PYTHON
+    return backend
+
+
+def search[Rows: QuerySet](queryset: Rows, query: str) -> Rows:
+    """
+    The rows of ``queryset`` whose name matches ``query``, annotated with
+    their ``search_rank``; order by ``-search_rank`` for the best first.
+    """
+    query = normalize(query)
+    if not query:
+        return queryset.annotate(search_rank=Value(MAX_RANK))
+    if get_backend(queryset.db) == TRIGRAM:
+        similarity = Cast(
+            TrigramWordSimilarity(query, "search_name") * (MAX_RANK - 1),
+            IntegerField(),
+        )
+        return queryset.filter(
+            Q(search_name__contains=query)
+            # search_name %> query: word_similarity(query, search_name) is
+            # above pg_trgm.word_similarity_threshold.
+            | Q(TrigramWordSimilar(F("search_name"), Value(query))),
+        ).annotate(
+            search_rank=Case(
+                When(search_name__contains=query, then=Value(MAX_RANK)),
+                default=similarity,
+                output_field=IntegerField(),
+            ),
+        )
+    matches = (
+        (row_rank, pk)
+        for pk, search_name in queryset.values_list("pk", "search_name")
+        if (row_rank := rank(query, search_name))
+    )
+    # Best first, as ordered by -search_rank, pk.
+    best = heapq.nsmallest(
+        PYTHON_MAX_RESULTS,
+        matches,
+        key=lambda match: (-match[0], match[1]),
+    )
+    pks_by_rank: dict[int, list[int]] = defaultdict(list)
+    for row_rank, pk in best:
+        pks_by_rank[row_rank].append(pk)
+    return queryset.filter(pk__in=[pk for _, pk in best]).annotate(
+        search_rank=Case(
+            *(
+                When(pk__in=pks, then=Value(row_rank))
+                for row_rank, pks in pks_by_rank.items()
+            ),
+            default=Value(0),
+            output_field=IntegerField(),
+        ),
+    )
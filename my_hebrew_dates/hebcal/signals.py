@@ -0,0 +1,66 @@
+"""
+Keep ``Calendar.calendar_file_str`` in step with the data it was built from.
+
+Any save or delete of a calendar or one of its events clears the stored
+feed's timestamp in the same transaction, so it is never served stale, and
+once the transaction commits invalidates the cached feeds and queues the
+stored feed's regeneration. Event writes are also logged for incremental
+sync (``sync.py``). Bulk queryset operations don't send these signals; run
+``manage.py materialize_feeds`` after them.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import sync
+from .feed_cache import feed_cache
+from .models import Calendar
+from .models import HebrewDate
+from .tasks import refresh_calendar_feed
+
+
+def invalidate_feed(calendar_id: int) -> None:
+    # Touching ``modified`` also moves the feeds' version (ETag) on deletes.
+    Calendar.objects.filter(pk=calendar_id).update(
+        calendar_file_generated=None,
+        modified=timezone.now(),
+    )
+    transaction.on_commit(lambda: feed_changed(calendar_id))
+
+
+def feed_changed(calendar_id: int) -> None:
+    # Only after commit: a request racing the write could otherwise cache
+    # the old feed under the new generation.
+    feed_cache.invalidate(calendar_id)
+    refresh_calendar_feed.delay(calendar_id)
+
+
+@receiver(post_save, sender=Calendar)
+def calendar_saved(sender, instance, **kwargs):
+    if not kwargs.get("raw"):
+        invalidate_feed(instance.pk)
+
+
+@receiver(post_delete, sender=Calendar)
+def calendar_deleted(sender, instance, **kwargs):
+    sync.record_calendar_deleted(instance.uuid)
+
+
+@receiver(post_save, sender=HebrewDate)
+def hebrew_date_saved(sender, instance, **kwargs):
+    if not kwargs.get("raw"):
+        # Logged after ``invalidate_feed`` locks the calendar row.
+        invalidate_feed(instance.calendar_id)
+        sync.record_saved(instance, instance.calendar.uuid)
+
+
+@receiver(post_delete, sender=HebrewDate)
+def hebrew_date_deleted(sender, instance, origin=None, **kwargs):
+    # Deleting the calendar takes its feeds and leaves one tombstone for all
+    # of its events (see calendar_deleted).
+    if not isinstance(origin, Calendar):
+        invalidate_feed(instance.calendar_id)
+        sync.record_deleted(instance, instance.calendar.uuid)
@@ -0,0 +1,164 @@
+"""
+Incremental sync of a calendar's events.
+
+Every save or delete of an event appends a ``HebrewDateChange`` (see
+``signals.py``). A sync token names the last change a client has seen and
+when it was issued; syncing with it returns only the events changed since.
+Tokens older than ``HEBCAL_SYNC_RETENTION_DAYS`` are rejected, because
+:func:`compact_changes` may have dropped the changes after them, and so are
+tokens issued before the current Hebrew year began: the feed window rolled
+forward then, moving every event's occurrences without logging a change.
+Either way the client has to start over with a full sync.
+
+Writes to one calendar are serialized by the row lock ``invalidate_feed``
+takes before logging them, so a calendar's changes commit in primary key
+order and a token never skips a change that commits later.
+"""
+
+from datetime import UTC
+from datetime import datetime
+from datetime import timedelta
+from typing import NamedTuple
+from uuid import UUID
+
+from django.conf import settings
+from django.db.models import Exists
+from django.db.models import Max
+from django.db.models import OuterRef
+from django.utils import timezone
+
+from .hebrew_date import ConversionTable
+from .models import HebrewDate
+from .models import HebrewDateChange
+from .models import HebrewDateQuerySet
+
+
+class SyncToken(NamedTuple):
+    change_id: int
+    issued: datetime
+
+    def __str__(self) -> str:
+        return f"{self.change_id}-{int(self.issued.timestamp())}"
+
+    @classmethod
+    def parse(cls, value: str) -> "SyncToken | None":
+        """The token ``value`` stands for, or ``None`` if it is malformed."""
+        change_id, _, issued = value.partition("-")
+        try:
+            return cls(
+                int(change_id),
+                datetime.fromtimestamp(int(issued), tz=UTC),
+            )
+        except (ValueError, OverflowError, OSError):
+            return None
+
+
+def retention_cutoff() -> datetime:
+    return timezone.now() - timedelta(days=settings.HEBCAL_SYNC_RETENTION_DAYS)
+
+
+def is_valid_token(token: SyncToken) -> bool:
+    return (
+        token.change_id >= 0
+        and token.issued >= retention_cutoff()
+        and token.issued >= ConversionTable.year_started()
+    )
+
+
+def current_token(calendar_uuid: UUID) -> SyncToken:
+    """A token covering every change to the calendar logged so far."""
+    change_id = HebrewDateChange.objects.filter(
+        calendar_uuid=calendar_uuid,
+    ).aggregate(change_id=Max("pk"))["change_id"]
+    return SyncToken(change_id or 0, timezone.now())
+
+
+class Changes(NamedTuple):
+    # Rows created or modified, as they are now (evaluated).
+    updated: HebrewDateQuerySet
+    # UID suffixes of events that no longer exist.
+    deleted: list[str]
+
+
+def changes_since(calendar_id: int, calendar_uuid: UUID, token: SyncToken) -> Changes:
+    """The calendar's events changed after ``token`` was issued."""
+    updated_ids = set()
+    deleted = set()
+    for hebrew_date_id, uid_hash, action in HebrewDateChange.objects.filter(
+        calendar_uuid=calendar_uuid,
+        hebrew_date_id__isnull=False,
+        pk__gt=token.change_id,
+    ).values_list("hebrew_date_id", "uid_hash", "action"):
+        if action == HebrewDateChange.Action.UPDATED:
+            updated_ids.add(hebrew_date_id)
+        else:
+            deleted.add(uid_hash)
+    updated = HebrewDate.objects.filter(calendar_id=calendar_id, pk__in=updated_ids)
+    # An event renamed back to an earlier name gets its old UIDs back.
+    deleted.difference_update(hebrew_date.uid_hash for hebrew_date in updated)
+    return Changes(updated, sorted(deleted))
+
+
+def record_saved(hebrew_date: HebrewDate, calendar_uuid: UUID) -> None:
+    changes = [
+        HebrewDateChange(
+            calendar_uuid=calendar_uuid,
+            hebrew_date_id=hebrew_date.pk,
+            uid_hash=hebrew_date.uid_hash,
+            action=HebrewDateChange.Action.UPDATED,
+        ),
+    ]
+    previous_uid_hash = getattr(hebrew_date, "previous_uid_hash", "")
+    if previous_uid_hash and previous_uid_hash != hebrew_date.uid_hash:
+        # Renaming or moving an event changes its UIDs.
+        changes.insert(
+            0,
+            HebrewDateChange(
+                calendar_uuid=calendar_uuid,
+                hebrew_date_id=hebrew_date.pk,
+                uid_hash=previous_uid_hash,
+                action=HebrewDateChange.Action.DELETED,
+            ),
+        )
+    HebrewDateChange.objects.bulk_create(changes)
+
+
+def record_deleted(hebrew_date: HebrewDate, calendar_uuid: UUID) -> None:
+    HebrewDateChange.objects.create(
+        calendar_uuid=calendar_uuid,
+        hebrew_date_id=hebrew_date.pk,
+        uid_hash=hebrew_date.uid_hash,
+        action=HebrewDateChange.Action.DELETED,
+    )
+
+
+def record_calendar_deleted(calendar_uuid: UUID) -> None:
+    HebrewDateChange.objects.create(
+        calendar_uuid=calendar_uuid,
+        action=HebrewDateChange.Action.DELETED,
+    )
+
+
+def compact_changes() -> int:
+    """
+    Drop changes no client needs, returning how many were deleted.
+
+    A change superseded by a later one to the same event UID tells a client
+    nothing the later one doesn't, and changes past the retention period
+    can only be reached by tokens that are no longer accepted.
+    """
+    superseded = HebrewDateChange.objects.filter(
+        Exists(
+            HebrewDateChange.objects.filter(
+                calendar_uuid=OuterRef("calendar_uuid"),
+                hebrew_date_id=OuterRef("hebrew_date_id"),
+                uid_hash=OuterRef("uid_hash"),
+                pk__gt=OuterRef("pk"),
+            ),
+        ),
+    )
+    deleted, _ = superseded.delete()
+    expired, _ = HebrewDateChange.objects.filter(
+        created__lt=retention_cutoff(),
+    ).delete()
+    return deleted + expired
@@ -0,0 +1,28 @@
+from celery import shared_task
+
+from . import sync
+from .models import Calendar
+from .utils import materialize_feed
+
+
+@shared_task()
+def refresh_calendar_feed(calendar_id: int, *, force: bool = False) -> bool:
+    """Regenerate the stored feed of one calendar."""
+    return materialize_feed(calendar_id, force=force)
+
+
+@shared_task()
+def refresh_stale_calendar_feeds() -> int:
+    """Queue a refresh for every calendar whose stored feed is stale."""
+    queued = 0
+    for calendar in Calendar.objects.only("pk", "calendar_file_generated").iterator():
+        if not calendar.has_fresh_feed():
+            refresh_calendar_feed.delay(calendar.pk)
+            queued += 1
+    return queued
+
+
+@shared_task()
+def compact_sync_changes() -> int:
+    """Drop sync changes no client needs any more; see ``sync.compact_changes``."""
+    return sync.compact_changes()
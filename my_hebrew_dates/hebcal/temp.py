@@ -1,9 +1,6 @@
-# ruff: noqa: S324, ERA001
 import logging
-from base64 import urlsafe_b64encode
 from datetime import datetime
 from datetime import timedelta
-from hashlib import sha1
 from zoneinfo import ZoneInfo
 
 from icalendar import Alarm
@@ -39,20 +36,11 @@ def generate_ical(
 
     events = []
 
-    for hebrew_date in model_calendar.calendarOf.all():
-        event_hash = sha1(
-            (
-                hebrew_date.event_type
-                + hebrew_date.name
-                + hebrew_date.get_hebrew_date()
-            ).encode("utf-8"),
-        ).digest()
-        eng_date = hebrew_date.get_english_dates()[0]
-        uid = (
-            eng_date.isoformat()
-            + urlsafe_b64encode(event_hash).decode("ascii")
-            + "@myhebrewdates.com"
-        )
+    rows = model_calendar.calendarOf.all().with_english_dates()
+
+    for hebrew_date, english_dates in rows:
+        eng_date = english_dates[0]
+        uid = eng_date.isoformat() + hebrew_date.uid_hash + "@myhebrewdates.com"
         event = Event()
         title = (
             f"{hebrew_date.get_hebrew_date()} | "
@@ -115,8 +103,8 @@ def generate_ical(
 
         alarm.add("trigger", alarm_trigger)
         event.add_component(alarm)
-        next_year = hebrew_date.get_english_dates()[1]
-        two_year = hebrew_date.get_english_dates()[2]
+        next_year = english_dates[1]
+        two_year = english_dates[2]
 
         event.add("rdate", [next_year, two_year])
 
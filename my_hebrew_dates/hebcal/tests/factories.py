@@ -0,0 +1,30 @@
+from factory import Faker
+from factory import Sequence
+from factory import SubFactory
+from factory.django import DjangoModelFactory
+
+from my_hebrew_dates.hebcal.models import Calendar
+from my_hebrew_dates.hebcal.models import HebrewDate
+from my_hebrew_dates.users.tests.factories import UserFactory
+
+
+class CalendarFactory(DjangoModelFactory[Calendar]):
+    name = Faker("catch_phrase")
+    owner = SubFactory(UserFactory)
+
+    class Meta:
+        model = Calendar
+
+
+class HebrewDateFactory(DjangoModelFactory[HebrewDate]):
+    name = Sequence(lambda index: f"Person {index}")
+    month = Faker("random_int", min=1, max=13)
+    day = Faker("random_int", min=1, max=30)
+    event_type = Faker(
+        "random_element",
+        elements=[choice for choice, _ in HebrewDate.EVENT_CHOICES],
+    )
+    calendar = SubFactory(CalendarFactory)
+
+    class Meta:
+        model = HebrewDate
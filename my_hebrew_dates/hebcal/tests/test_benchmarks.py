@@ -0,0 +1,139 @@
+from django.test import SimpleTestCase
+from django.test import TestCase
+
+from my_hebrew_dates.hebcal.benchmarks import GENERATORS
+from my_hebrew_dates.hebcal.benchmarks import benchmark_compression
+from my_hebrew_dates.hebcal.benchmarks import benchmark_conversion_table
+from my_hebrew_dates.hebcal.benchmarks import benchmark_generators
+from my_hebrew_dates.hebcal.benchmarks import benchmark_missing_days
+from my_hebrew_dates.hebcal.benchmarks import benchmark_orm
+from my_hebrew_dates.hebcal.benchmarks import benchmark_search
+from my_hebrew_dates.hebcal.benchmarks import benchmark_serializer
+from my_hebrew_dates.hebcal.benchmarks import compare_reports
+from my_hebrew_dates.hebcal.benchmarks import legacy_hebrew_to_english_dict
+from my_hebrew_dates.hebcal.benchmarks import precomputed_hebrew_to_english_dict
+from my_hebrew_dates.hebcal.benchmarks import synthetic_calendar
+from my_hebrew_dates.hebcal.clients import GOOGLE
+from my_hebrew_dates.hebcal.clients import UNKNOWN
+from my_hebrew_dates.hebcal.hebrew_date import ConversionTable
+from my_hebrew_dates.hebcal.models import Calendar
+
+
+class BenchmarkConversionTableTest(SimpleTestCase):
+    def test_reports_both_storages(self):
+        result = benchmark_conversion_table(years=1, lookups=10)
+        assert result["legacy_dict"]["table_bytes"] > 0
+        assert (
+            result["conversion_table"]["table_bytes"]
+            < result["legacy_dict"]["table_bytes"]
+        )
+
+
+class BenchmarkMissingDaysTest(SimpleTestCase):
+    def test_precomputed_table_matches_legacy(self):
+        start_year = ConversionTable.current_year()
+        assert precomputed_hebrew_to_english_dict(
+            start_year,
+            3,
+        ) == legacy_hebrew_to_english_dict(start_year, 3)
+
+    def test_reports_every_build(self):
+        result = benchmark_missing_days(years=3)
+        assert result["policies"] == ["PREVIOUS_DAY", "NEXT_DAY"]
+        # Every three years include a common year, whose Adar lacks a 30th.
+        assert result["fallbacks"] > 0
+        assert result["rule_table_seconds"] > 0
+
+
+class BenchmarkSerializerTest(TestCase):
+    def test_reports_each_size(self):
+        result = benchmark_serializer(sizes=(5,))
+        assert set(result["events"]["5"]) == {
+            "icalendar_seconds",
+            "direct_seconds",
+            "cached_seconds",
+            "fragment_cache",
+            "speedup",
+            "output_bytes",
+        }
+        assert result["events"]["5"]["fragment_cache"]["hits"] == 5  # noqa: PLR2004
+
+
+class BenchmarkCompressionTest(TestCase):
+    def test_reports_each_setting(self):
+        result = benchmark_compression(
+            sizes=(5,),
+            gzip_levels=(6,),
+            brotli_qualities=(4,),
+        )
+        report = result["events"]["5"]
+        assert set(report) == {"generate_seconds", "identity_bytes", "gzip-6", "br-4"}
+        assert report["gzip-6"]["bytes"] < report["identity_bytes"]
+
+
+class BenchmarkGeneratorsTest(TestCase):
+    def test_reports_each_generator_and_client(self):
+        result = benchmark_generators(sizes=(5,), clients=(GOOGLE, UNKNOWN))
+        report = result["events"]["5"]
+        assert set(report) == set(GENERATORS)
+        assert set(report["utils.generate_ical"]) == {"google", "unknown"}
+        expanded = report["utils.generate_ical"]["unknown"]
+        compact = report["utils.generate_ical_experimental"]["unknown"]
+        assert expanded["vevents"] == 15  # noqa: PLR2004
+        assert compact["vevents"] == 5  # noqa: PLR2004
+        assert compact["output_bytes"] < expanded["output_bytes"]
+        assert expanded["peak_bytes"] > 0
+        assert report["utils.generate_ical[rdate]"]["unknown"]["vevents"] == 5  # noqa: PLR2004
+        pipeline = result["pipeline"]["5"]
+        assert pipeline["project_seconds"] > 0
+        assert set(pipeline["emit_seconds"]) == {"expanded", "compact", "rdate"}
+
+    def test_synthetic_calendars_are_reproducible(self):
+        with synthetic_calendar(5) as calendar:
+            first = [
+                (hebrew_date.name, hebrew_date.month, hebrew_date.day)
+                for hebrew_date in calendar.calendarOf.all()
+            ]
+        with synthetic_calendar(5) as calendar:
+            second = [
+                (hebrew_date.name, hebrew_date.month, hebrew_date.day)
+                for hebrew_date in calendar.calendarOf.all()
+            ]
+        assert first == second
+        assert not Calendar.objects.exists()
+
+
+class BenchmarkOrmTest(TestCase):
+    def test_times_both_loaders(self):
+        result = benchmark_orm(sizes=(5,))["events"]["5"]
+        assert result["instances"]["load_seconds"] > 0
+        assert result["feed_rows"]["peak_bytes"] > 0
+        assert result["speedup"] > 0
+
+
+class BenchmarkSearchTest(TestCase):
+    def test_times_every_lookup(self):
+        report = benchmark_search(sizes=(20,))
+        result = report["events"]["20"]
+        assert result["icontains[substring]"]["matches"] > 0
+        assert result["icontains[typo]"]["matches"] == 0
+        for backend in report["backends"]:
+            assert (
+                result[f"{backend}[substring]"]["matches"]
+                == result["icontains[substring]"]["matches"]
+            )
+            assert result[f"{backend}[typo]"]["matches"] > 0
+
+
+class CompareReportsTest(SimpleTestCase):
+    def test_pairs_numbers(self):
+        baseline = {"suite": {"seconds": 2.0, "label": "a", "gone": 1}}
+        current = {"suite": {"seconds": 3.0, "label": "b", "new": 1}}
+        assert compare_reports(baseline, current) == {
+            "suite": {"seconds": {"baseline": 2.0, "current": 3.0, "change": 0.5}},
+        }
+
+    def test_zero_baseline(self):
+        assert compare_reports({"n": 0}, {"n": 1}) == {
+            "n": {"baseline": 0, "current": 1, "change": None},
+        }
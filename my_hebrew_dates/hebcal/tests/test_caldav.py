@@ -0,0 +1,217 @@
+from http import HTTPStatus
+
+from defusedxml.ElementTree import fromstring
+from django.contrib.auth import get_user_model
+from django.test import Client
+from django.test import TestCase
+from django.urls import reverse
+
+from my_hebrew_dates.hebcal.caldav import CALDAV
+from my_hebrew_dates.hebcal.caldav import DAV
+from my_hebrew_dates.hebcal.hebrew_date import conversion_table
+from my_hebrew_dates.hebcal.models import Calendar
+from my_hebrew_dates.hebcal.models import HebrewDate
+
+User = get_user_model()
+
+PROPFIND_CTAG = b"""<?xml version="1.0" encoding="utf-8"?>
+<D:propfind xmlns:D="DAV:" xmlns:CS="http://calendarserver.org/ns/">
+  <D:prop><D:resourcetype/><CS:getctag/><D:getetag/><D:quota-used-bytes/></D:prop>
+</D:propfind>"""
+
+
+def calendar_query(time_range: str = "") -> bytes:
+    return f"""<?xml version="1.0" encoding="utf-8"?>
+<C:calendar-query xmlns:D="DAV:" xmlns:C="urn:ietf:params:xml:ns:caldav">
+  <D:prop><D:getetag/><C:calendar-data/></D:prop>
+  <C:filter><C:comp-filter name="VCALENDAR"><C:comp-filter name="VEVENT">
+    {time_range}
+  </C:comp-filter></C:comp-filter></C:filter>
+</C:calendar-query>""".encode()
+
+
+def calendar_multiget(*hrefs: str) -> bytes:
+    href_elements = "".join(f"<D:href>{href}</D:href>" for href in hrefs)
+    return f"""<?xml version="1.0" encoding="utf-8"?>
+<C:calendar-multiget xmlns:D="DAV:" xmlns:C="urn:ietf:params:xml:ns:caldav">
+  <D:prop><D:getetag/><C:calendar-data/></D:prop>
+  {href_elements}
+</C:calendar-multiget>""".encode()
+
+
+class CalendarDavViewTest(TestCase):
+    def setUp(self):
+        # CalDAV clients send no CSRF token.
+        self.client = Client(enforce_csrf_checks=True)
+        user = User.objects.create_user("testuser", "test@example.com", "password")
+        self.calendar = Calendar.objects.create(name="Test Calendar", owner=user)
+        self.birthday = HebrewDate.objects.create(
+            name="Test Hebrew Date",
+            month=1,
+            day=1,
+            event_type="🎂",
+            calendar=self.calendar,
+        )
+        self.anniversary = HebrewDate.objects.create(
+            name="Other Hebrew Date",
+            month=7,
+            day=15,
+            event_type="💍",
+            calendar=self.calendar,
+        )
+        self.url = reverse("hebcal:calendar_dav", args=[self.calendar.uuid])
+        self.birthday_url = reverse(
+            "hebcal:calendar_dav_event",
+            args=[self.calendar.uuid, self.birthday.pk],
+        )
+        self.anniversary_url = reverse(
+            "hebcal:calendar_dav_event",
+            args=[self.calendar.uuid, self.anniversary.pk],
+        )
+
+    def request(self, method, url, body=b"", **headers):
+        return self.client.generic(
+            method,
+            url,
+            body,
+            content_type="application/xml",
+            headers=headers,
+        )
+
+    def responses(self, response):
+        assert response.status_code == HTTPStatus.MULTI_STATUS
+        root = fromstring(response.content)
+        return {
+            element.findtext(f"{{{DAV}}}href"): element
+            for element in root.findall(f"{{{DAV}}}response")
+        }
+
+    def ctag(self):
+        response = self.request("PROPFIND", self.url, PROPFIND_CTAG, depth="0")
+        return self.responses(response)[self.url].findtext(
+            ".//{http://calendarserver.org/ns/}getctag",
+        )
+
+    def etags(self):
+        response = self.request("PROPFIND", self.url, PROPFIND_CTAG, depth="1")
+        return {
+            href: element.findtext(f".//{{{DAV}}}getetag")
+            for href, element in self.responses(response).items()
+            if href != self.url
+        }
+
+    def test_options(self):
+        response = self.request("OPTIONS", self.url)
+        assert "calendar-access" in response["DAV"]
+        assert "REPORT" in response["Allow"]
+        assert "PUT" not in response["Allow"]
+
+    def test_propfind_collection(self):
+        response = self.request("PROPFIND", self.url, PROPFIND_CTAG, depth="0")
+        (collection,) = self.responses(response).values()
+        assert collection.find(f".//{{{CALDAV}}}calendar") is not None
+        assert self.ctag()
+        # Unknown properties are reported missing, not dropped.
+        missing = collection.findall(f"{{{DAV}}}propstat")[1]
+        assert missing.findtext(f"{{{DAV}}}status") == "HTTP/1.1 404 Not Found"
+        assert missing.find(f".//{{{DAV}}}quota-used-bytes") is not None
+
+    def test_propfind_lists_resources_with_etags(self):
+        etags = self.etags()
+        assert set(etags) == {self.birthday_url, self.anniversary_url}
+        assert all(etags.values())
+
+    def test_get_resource(self):
+        response = self.client.get(self.birthday_url)
+        assert response.status_code == HTTPStatus.OK
+        assert response["ETag"] == self.etags()[self.birthday_url]
+        body = response.content.decode()
+        assert body.count("BEGIN:VEVENT") == 1
+        assert f"UID:{self.birthday.uid_hash}@myhebrewdates.com" in body
+        first, *rest = conversion_table.get_english_dates(1, 1)
+        assert f"DTSTART;VALUE=DATE:{first:%Y%m%d}" in body
+        assert "RDATE;VALUE=DATE:" + ",".join(f"{day:%Y%m%d}" for day in rest) in body
+
+        response = self.client.get(
+            self.birthday_url,
+            headers={"if-none-match": response["ETag"]},
+        )
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+    def test_get_unknown_resource(self):
+        url = reverse("hebcal:calendar_dav_event", args=[self.calendar.uuid, 0])
+        assert self.client.get(url).status_code == HTTPStatus.NOT_FOUND
+
+    def test_edits_move_the_ctag_and_one_etag(self):
+        ctag = self.ctag()
+        etags = self.etags()
+        self.birthday.name = "Renamed"
+        self.birthday.save()
+        assert self.ctag() != ctag
+        new_etags = self.etags()
+        assert new_etags[self.birthday_url] != etags[self.birthday_url]
+        assert new_etags[self.anniversary_url] == etags[self.anniversary_url]
+
+        self.anniversary.delete()
+        assert set(self.etags()) == {self.birthday_url}
+
+    def test_calendar_query(self):
+        responses = self.responses(self.request("REPORT", self.url, calendar_query()))
+        assert set(responses) == {self.birthday_url, self.anniversary_url}
+        assert "BEGIN:VCALENDAR" in responses[self.birthday_url].findtext(
+            f".//{{{CALDAV}}}calendar-data",
+        )
+
+    def test_calendar_query_time_range(self):
+        day = conversion_table.get_english_dates(1, 1)[0]
+        time_range = (
+            f'<C:time-range start="{day:%Y%m%d}T120000Z" end="{day:%Y%m%d}T130000Z"/>'
+        )
+        responses = self.responses(
+            self.request("REPORT", self.url, calendar_query(time_range)),
+        )
+        assert set(responses) == {self.birthday_url}
+        assert "RDATE" in responses[self.birthday_url].findtext(
+            f".//{{{CALDAV}}}calendar-data",
+        )
+
+    def test_calendar_query_time_range_before_every_date(self):
+        time_range = '<C:time-range end="00010101T000000Z"/>'
+        responses = self.responses(
+            self.request("REPORT", self.url, calendar_query(time_range)),
+        )
+        assert responses == {}
+
+    def test_calendar_multiget(self):
+        unknown = reverse("hebcal:calendar_dav_event", args=[self.calendar.uuid, 0])
+        responses = self.responses(
+            self.request(
+                "REPORT",
+                self.url,
+                calendar_multiget(self.anniversary_url, unknown),
+            ),
+        )
+        assert set(responses) == {self.anniversary_url, unknown}
+        assert "Other Hebrew Date" in responses[self.anniversary_url].findtext(
+            f".//{{{CALDAV}}}calendar-data",
+        )
+        assert (
+            responses[unknown].findtext(f"{{{DAV}}}status") == "HTTP/1.1 404 Not Found"
+        )
+
+    def test_read_only(self):
+        for method in ("PUT", "DELETE", "PROPPATCH", "MKCALENDAR"):
+            response = self.request(method, self.birthday_url)
+            assert response.status_code == HTTPStatus.METHOD_NOT_ALLOWED
+
+    def test_bad_requests(self):
+        response = self.request("PROPFIND", self.url, b"<not xml")
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = self.request("REPORT", self.url, PROPFIND_CTAG)
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        entities = (
+            b'<?xml version="1.0"?><!DOCTYPE d [<!ENTITY e "e">]>'
+            b'<D:propfind xmlns:D="DAV:"><D:prop>&e;</D:prop></D:propfind>'
+        )
+        response = self.request("PROPFIND", self.url, entities)
+        assert response.status_code == HTTPStatus.BAD_REQUEST
@@ -0,0 +1,93 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError
+from django.core.management import call_command
+from django.test import SimpleTestCase
+from django.test import TestCase
+
+from my_hebrew_dates.hebcal.hebrew_date import MappedTables
+from my_hebrew_dates.hebcal.models import Calendar
+
+
+class BuildConversionTableCommandTest(SimpleTestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.path = Path(tmp_dir.name) / "table.bin"
+
+    def test_writes_requested_years(self):
+        out = StringIO()
+        call_command(
+            "build_conversion_table",
+            start_year=5780,
+            end_year=5800,
+            output=str(self.path),
+            stdout=out,
+        )
+        assert MappedTables(self.path).years == range(5780, 5801)
+        assert "5780-5800" in out.getvalue()
+
+    def test_rejects_reversed_range(self):
+        with pytest.raises(CommandError):
+            call_command(
+                "build_conversion_table",
+                start_year=5800,
+                end_year=5780,
+                output=str(self.path),
+            )
+
+
+class HebcalBenchmarkCommandTest(SimpleTestCase):
+    def test_compares_with_baseline(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        baseline = Path(tmp_dir.name) / "baseline.json"
+        output = Path(tmp_dir.name) / "report.json"
+        call_command(
+            "hebcal_benchmark",
+            suite=["missing_days"],
+            output=str(baseline),
+            stderr=StringIO(),
+        )
+        call_command(
+            "hebcal_benchmark",
+            suite=["missing_days"],
+            output=str(output),
+            baseline=str(baseline),
+            stderr=StringIO(),
+        )
+        report = json.loads(output.read_text())
+        assert report["environment"]["version"]
+        fallbacks = report["comparison"]["missing_days"]["fallbacks"]
+        assert fallbacks["change"] == 0
+
+
+class MaterializeFeedsCommandTest(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(
+            username="testuser",
+            password="testpassword",  # noqa: S106
+        )
+        Calendar.objects.bulk_create(
+            Calendar(name=f"Calendar {index}", owner=user) for index in range(5)
+        )
+
+    def test_backfills_in_chunks(self):
+        out = StringIO()
+        call_command("materialize_feeds", chunk_size=2, stdout=out, stderr=StringIO())
+        assert "Refreshed 5 of 5" in out.getvalue()
+        assert all(calendar.has_fresh_feed() for calendar in Calendar.objects.all())
+
+        out = StringIO()
+        call_command("materialize_feeds", stdout=out, stderr=StringIO())
+        assert "Refreshed 0 of 5" in out.getvalue()
+
+    def test_force(self):
+        out = StringIO()
+        call_command("materialize_feeds", force=True, stdout=out, stderr=StringIO())
+        assert "Refreshed 5 of 5" in out.getvalue()
@@ -0,0 +1,56 @@
+import gzip
+
+import brotli
+from django.test import SimpleTestCase
+
+from my_hebrew_dates.hebcal.compression import BROTLI
+from my_hebrew_dates.hebcal.compression import GZIP
+from my_hebrew_dates.hebcal.compression import IDENTITY
+from my_hebrew_dates.hebcal.compression import accepted_encodings
+from my_hebrew_dates.hebcal.compression import compress
+from my_hebrew_dates.hebcal.compression import compress_stream
+from my_hebrew_dates.hebcal.compression import compress_variants
+from my_hebrew_dates.hebcal.compression import negotiate_encoding
+
+FEED = b"BEGIN:VCALENDAR\r\n" + b"BEGIN:VEVENT\r\nEND:VEVENT\r\n" * 50
+
+
+class NegotiateEncodingTest(SimpleTestCase):
+    def test_prefers_brotli(self):
+        assert negotiate_encoding("gzip, deflate, br") == BROTLI
+        assert negotiate_encoding("gzip, deflate") == GZIP
+        assert negotiate_encoding("") == IDENTITY
+
+    def test_qvalues(self):
+        assert accepted_encodings("gzip;q=0.5, br;q=0") == {"gzip": 0.5, "br": 0.0}
+        assert negotiate_encoding("gzip;q=0.5, br;q=0") == GZIP
+        assert negotiate_encoding("*;q=0") == IDENTITY
+        assert negotiate_encoding("*") == BROTLI
+        assert negotiate_encoding("gzip;q=oops") == IDENTITY
+
+    def test_restricted_encodings(self):
+        assert negotiate_encoding("br, gzip", (GZIP,)) == GZIP
+
+
+class CompressTest(SimpleTestCase):
+    def test_round_trip(self):
+        variants = compress_variants(FEED)
+        assert gzip.decompress(variants[GZIP]) == FEED
+        assert brotli.decompress(variants[BROTLI]) == FEED
+        assert len(variants[GZIP]) < len(FEED)
+
+    def test_gzip_is_deterministic(self):
+        assert compress(FEED, GZIP) == compress(FEED, GZIP)
+
+    def test_unknown_encoding(self):
+        with self.assertRaisesMessage(ValueError, "deflate"):
+            compress(FEED, "deflate")
+
+    def test_compress_stream(self):
+        chunks = ["BEGIN:VCALENDAR\r\n", "END:VCALENDAR\r\n"]
+        assert gzip.decompress(b"".join(compress_stream(chunks, GZIP))) == (
+            b"BEGIN:VCALENDAR\r\nEND:VCALENDAR\r\n"
+        )
+        assert b"".join(compress_stream(chunks, IDENTITY)) == (
+            b"BEGIN:VCALENDAR\r\nEND:VCALENDAR\r\n"
+        )
@@ -0,0 +1,67 @@
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from django.test import override_settings
+
+from my_hebrew_dates.hebcal.feed_cache import FeedCache
+
+
+class FeedCacheTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.feed_cache = FeedCache()
+
+    def test_key_covers_every_input(self):
+        key = self.feed_cache.key(1, "expanded", "gzip")
+        assert key == self.feed_cache.key(1, "expanded", "gzip")
+        assert key != self.feed_cache.key(2, "expanded", "gzip")
+        assert key != self.feed_cache.key(1, "compact", "gzip")
+        assert key != self.feed_cache.key(1, "expanded", "br")
+
+    def test_invalidate_drops_every_variant_of_one_calendar(self):
+        keys = [
+            self.feed_cache.key(1, "expanded", "gzip"),
+            self.feed_cache.key(1, "compact", "identity"),
+        ]
+        other = self.feed_cache.key(2, "expanded", "gzip")
+        for key in [*keys, other]:
+            self.feed_cache.set(key, b"feed")
+
+        self.feed_cache.invalidate(1)
+
+        assert self.feed_cache.get(self.feed_cache.key(1, "expanded", "gzip")) is None
+        assert (
+            self.feed_cache.get(self.feed_cache.key(1, "compact", "identity")) is None
+        )
+        assert (
+            self.feed_cache.get(self.feed_cache.key(2, "expanded", "gzip")) == b"feed"
+        )
+
+    def test_evicted_generation_is_not_reused(self):
+        key = self.feed_cache.key(1, "expanded", "gzip")
+        self.feed_cache.set(key, b"feed")
+        cache.delete(self.feed_cache._generation_key(1))  # noqa: SLF001
+        assert self.feed_cache.key(1, "expanded", "gzip") != key
+
+    def test_stats(self):
+        key = self.feed_cache.key(1, "expanded", "gzip")
+        assert self.feed_cache.get(key) is None
+        self.feed_cache.set(key, b"feed")
+        assert self.feed_cache.get(key) == b"feed"
+        self.feed_cache.invalidate(1)
+        assert self.feed_cache.stats() == {
+            "alias": "default",
+            "hits": 1,
+            "misses": 1,
+            "hit_rate": 0.5,
+            "invalidations": 1,
+        }
+        self.feed_cache.reset_stats()
+        assert self.feed_cache.stats()["hit_rate"] is None
+
+    @override_settings(HEBCAL_FEED_CACHE_ALIAS="")
+    def test_disabled(self):
+        key = self.feed_cache.key(1, "expanded", "gzip")
+        self.feed_cache.set(key, b"feed")
+        assert self.feed_cache.get(key) is None
+        assert not cache.get(key)
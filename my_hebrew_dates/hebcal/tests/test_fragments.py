@@ -0,0 +1,117 @@
+from datetime import UTC
+from datetime import datetime
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from django.test import TestCase
+from django.test import override_settings
+
+from my_hebrew_dates.hebcal.clients import FeedVariant
+from my_hebrew_dates.hebcal.fragments import FragmentCache
+from my_hebrew_dates.hebcal.fragments import fragment_cache
+from my_hebrew_dates.hebcal.fragments import fragment_key
+from my_hebrew_dates.hebcal.models import Calendar
+from my_hebrew_dates.hebcal.models import HebrewDate
+from my_hebrew_dates.hebcal.utils import FeedOptions
+from my_hebrew_dates.hebcal.utils import generate_ical
+from my_hebrew_dates.hebcal.utils import generate_ical_experimental
+
+MODIFIED = datetime(2025, 1, 1, tzinfo=UTC)
+DTSTAMP = datetime(2025, 1, 2, tzinfo=UTC)
+
+
+class FragmentKeyTest(SimpleTestCase):
+    def test_key_covers_every_input(self):
+        key = fragment_key(1, MODIFIED)
+        assert key != fragment_key(2, MODIFIED)
+        assert key != fragment_key(1, MODIFIED + timedelta(microseconds=1))
+
+
+class FragmentCacheTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_renders_only_misses(self):
+        fragments = FragmentCache(alias="default", timeout=60)
+        rendered = []
+
+        def render(index):
+            rendered.append(index)
+            return (f"head {index}", "uid", "tail")
+
+        assert fragments.get_many(["a", "b"], render)[1] == ("head 1", "uid", "tail")
+        assert fragments.get_many(["b", "c"], render) == [
+            ("head 1", "uid", "tail"),
+            ("head 1", "uid", "tail"),
+        ]
+        assert rendered == [0, 1, 1]
+        assert fragments.stats()["hits"] == 1
+        assert fragments.stats()["misses"] == 3  # noqa: PLR2004
+
+    def test_disabled(self):
+        fragments = FragmentCache(alias="", timeout=60)
+        fragments.get_many(["a"], lambda index: ("", "", ""))
+        fragments.get_many(["a"], lambda index: ("", "", ""))
+        assert cache.get("a") is None
+        assert fragments.stats()["hits"] == 0
+
+
+class FeedFragmentCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        fragment_cache.reset_stats()
+        owner = get_user_model().objects.create(username="fragments")
+        self.calendar = Calendar.objects.create(name="Fragments", owner=owner)
+        self.hebrew_date = HebrewDate.objects.create(
+            name="Sarah",
+            month=7,
+            day=10,
+            event_type="🎂",
+            calendar=self.calendar,
+        )
+
+    def generate(self, generator=generate_ical, **options):
+        calendar = Calendar.objects.prefetch_related("calendarOf").get(
+            pk=self.calendar.pk,
+        )
+        return generator(calendar, FeedOptions(**options), dtstamp=DTSTAMP)
+
+    def test_second_feed_is_assembled_from_cache(self):
+        cold = self.generate()
+        warm = self.generate()
+        assert warm == cold
+        assert fragment_cache.stats()["misses"] == 1
+        assert fragment_cache.stats()["hits"] == 1
+
+    def test_variants_share_fragments(self):
+        self.generate()
+        assert "TRIGGER:-PT6H" in self.generate(
+            generate_ical_experimental,
+            alarm_trigger=timedelta(hours=-6),
+        )
+        self.generate(variant=FeedVariant.RDATE)
+        assert fragment_cache.stats()["misses"] == 1
+        assert fragment_cache.stats()["hits"] == 2  # noqa: PLR2004
+
+    def test_edited_row_is_rerendered(self):
+        self.generate()
+        self.hebrew_date.name = "Sarah Imeinu"
+        self.hebrew_date.save()
+        assert "Sarah Imeinu" in self.generate()
+        assert fragment_cache.stats()["misses"] == 2  # noqa: PLR2004
+
+    def test_bulk_updated_row_is_rerendered(self):
+        self.generate()
+        self.hebrew_date.name = "Sarah Imeinu"
+        HebrewDate.objects.bulk_update([self.hebrew_date], ["name"])
+        assert "Sarah Imeinu" in self.generate()
+        assert fragment_cache.stats()["misses"] == 2  # noqa: PLR2004
+
+    @override_settings(HEBCAL_FRAGMENT_CACHE_ALIAS="")
+    def test_can_be_disabled(self):
+        assert self.generate() == self.generate()
+        assert fragment_cache.stats()["misses"] == 0
@@ -0,0 +1,74 @@
+from datetime import date
+
+import pytest
+from django.test import SimpleTestCase
+from pyluach import dates
+
+from my_hebrew_dates.hebcal import hebrew_calendar
+from my_hebrew_dates.hebcal.benchmarks import legacy_hebrew_to_english_dict
+from my_hebrew_dates.hebcal.hebrew_date import build_year
+from my_hebrew_dates.hebcal.hebrew_date import slot
+
+# pyluach's Julian Day of ordinal 0.
+JD_OFFSET = 1721424.5
+
+
+def pyluach_ordinal(year, month, day):
+    return int(dates.HebrewDate(year, month, day).jd - JD_OFFSET)
+
+
+class HebrewCalendarTest(SimpleTestCase):
+    def test_month_starts_match_pyluach(self):
+        for year in range(1, 10000, 3):
+            starts = hebrew_calendar.month_starts(year)
+            for month in range(1, 14):
+                if month == hebrew_calendar.ADAR_2 and not hebrew_calendar.is_leap(
+                    year,
+                ):
+                    continue
+                assert starts[month] == pyluach_ordinal(year, month, 1), (year, month)
+
+    def test_every_day_matches_pyluach(self):
+        for year in range(5700, 5900):
+            lengths = hebrew_calendar.month_lengths(year)
+            batch = [
+                (year, month, day)
+                for month in range(1, 14)
+                for day in range(1, lengths[month] + 1)
+            ]
+            expected = [pyluach_ordinal(*hebrew_date) for hebrew_date in batch]
+            assert hebrew_calendar.to_ordinals(batch) == expected, year
+
+    def test_year_lengths_are_valid(self):
+        valid = {353, 354, 355, 383, 384, 385}
+        for year in range(1, 10000):
+            assert hebrew_calendar.days_in_year(year) in valid, year
+
+    def test_to_ordinal(self):
+        assert hebrew_calendar.to_ordinal(5785, 7, 1) == date(2024, 10, 3).toordinal()
+
+    def test_invalid_dates_raise(self):
+        with pytest.raises(ValueError, match="Invalid Hebrew date"):
+            hebrew_calendar.to_ordinal(5785, 13, 1)  # common year
+        with pytest.raises(ValueError, match="Invalid Hebrew date"):
+            hebrew_calendar.to_ordinal(5785, 2, 30)
+
+    def test_year_of(self):
+        for year in (1, 3762, 5785, 5786, 9000):
+            new_year = hebrew_calendar.new_year(year)
+            assert hebrew_calendar.year_of(new_year) == year
+            assert hebrew_calendar.year_of(new_year - 1) == year - 1
+
+
+class BuildYearMatchesLegacyTest(SimpleTestCase):
+    def test_matches_legacy_dict(self):
+        legacy = legacy_hebrew_to_english_dict(5780, 10)
+        tables = [build_year(year) for year in range(5780, 5790)]
+        for key, english_dates in legacy.items():
+            month, day = map(int, key.split("-"))
+            if len(english_dates) != len(tables):
+                # The legacy table skipped 30 Adar II in leap years.
+                continue
+            assert [
+                date.fromordinal(table[slot(month, day)]) for table in tables
+            ] == english_dates, key
@@ -0,0 +1,253 @@
+import tempfile
+from datetime import UTC
+from datetime import date
+from datetime import datetime
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from my_hebrew_dates.hebcal.hebrew_date import DEFAULT_HORIZON
+from my_hebrew_dates.hebcal.hebrew_date import SLOTS_PER_YEAR
+from my_hebrew_dates.hebcal.hebrew_date import ConversionTable
+from my_hebrew_dates.hebcal.hebrew_date import DateWindow
+from my_hebrew_dates.hebcal.hebrew_date import Horizon
+from my_hebrew_dates.hebcal.hebrew_date import MappedTables
+from my_hebrew_dates.hebcal.hebrew_date import MissingDay
+from my_hebrew_dates.hebcal.hebrew_date import build_year
+from my_hebrew_dates.hebcal.hebrew_date import slot
+from my_hebrew_dates.hebcal.hebrew_date import write_table_file
+
+YEAR = 5785
+NISAN_1_5785 = date(2025, 3, 30)
+ROSH_HASHANA_5786 = date(2025, 9, 23)
+
+
+class ConversionTableTest(SimpleTestCase):
+    def setUp(self):
+        self.table = ConversionTable(recheck_interval=0)
+        patcher = mock.patch.object(
+            ConversionTable,
+            "today",
+            return_value=date(2025, 1, 1),
+        )
+        self.today = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_nothing_built_until_first_use(self):
+        assert self.table.start_year is None
+        assert self.table.stats()["years"] == []
+
+    def test_get_english_dates(self):
+        english_dates = self.table.get_english_dates(1, 1)
+        assert len(english_dates) == len(self.table.horizon.years(YEAR))
+        assert english_dates[0] == NISAN_1_5785
+        assert english_dates == sorted(english_dates)
+
+    def test_adar_2_falls_back_to_adar_in_common_year(self):
+        # 5785 is a common year, 5787 is a leap year.
+        adar, _, _ = self.table.get_english_dates(12, 14)
+        adar_2, _, leap_adar_2 = self.table.get_english_dates(13, 14)
+        assert adar == adar_2
+        _, _, leap_adar_1 = self.table.get_english_dates(12, 14)
+        assert leap_adar_2 > leap_adar_1
+
+    def test_missing_day_falls_back_to_previous_day(self):
+        # Adar has 29 days in the common year 5785, Adar I has 30 in 5787.
+        adar_30, _, leap_adar_30 = self.table.get_english_dates(12, 30)
+        adar_29, _, leap_adar_29 = self.table.get_english_dates(12, 29)
+        assert adar_30 == adar_29
+        assert leap_adar_30 > leap_adar_29
+
+    def test_get_ordinals(self):
+        assert self.table.get_ordinals(1, 1)[0] == NISAN_1_5785.toordinal()
+
+    def test_occurrences_match_single_lookups(self):
+        previous, following = MissingDay.PREVIOUS_DAY, MissingDay.NEXT_DAY
+        keys = [
+            (1, 1, previous),
+            (13, 14, previous),
+            (1, 1, previous),
+            (12, 30, previous),
+            (12, 30, following),
+            (14, 1, previous),
+        ]
+        occurrences = self.table.occurrences(keys)
+        assert list(occurrences) == [
+            (1, 1, previous),
+            (13, 14, previous),
+            (12, 30, previous),
+            (12, 30, following),
+            (14, 1, previous),
+        ]
+        for (month, day, policy), english_dates in occurrences.items():
+            assert english_dates == self.table.get_english_dates(
+                month,
+                day,
+                policy=policy,
+            )
+
+    def test_occurrences_custom_horizon(self):
+        occurrences = self.table.occurrences(
+            [(7, 1, MissingDay.PREVIOUS_DAY)],
+            Horizon(past=1, future=0),
+        )
+        assert len(occurrences[7, 1, MissingDay.PREVIOUS_DAY]) == 2  # noqa: PLR2004
+
+    def test_missing_day_policies(self):
+        # Cheshvan has 30 days in 5785 and 5787 but only 29 in 5786.
+        previous = self.table.get_english_dates(8, 30)
+        following = self.table.get_english_dates(8, 30, policy=MissingDay.NEXT_DAY)
+        assert previous[0] == following[0]
+        assert previous[2] == following[2]
+        assert previous[1] == self.table.get_english_dates(8, 29)[1]
+        assert following[1] == self.table.get_english_dates(9, 1)[1]
+
+    def test_unknown_date_returns_empty_list(self):
+        assert self.table.get_english_dates(14, 1) == []
+
+    def test_year_started(self):
+        assert ConversionTable.year_started() == datetime(2024, 10, 3, tzinfo=UTC)
+        self.today.return_value = ROSH_HASHANA_5786
+        assert ConversionTable.year_started() == datetime(2025, 9, 23, tzinfo=UTC)
+
+    def test_window_rolls_forward_with_new_year(self):
+        self.table.get_english_dates(1, 1)
+        first_timings = dict(self.table.build_timings)
+        assert sorted(first_timings) == [YEAR, YEAR + 1, YEAR + 2]
+
+        self.today.return_value = ROSH_HASHANA_5786 - timedelta(days=1)
+        assert self.table.get_english_dates(1, 1)[0] == NISAN_1_5785
+        self.today.return_value = ROSH_HASHANA_5786
+        english_dates = self.table.get_english_dates(1, 1)
+
+        assert self.table.start_year == YEAR + 1
+        assert self.table.window().years == range(YEAR + 1, YEAR + 4)
+        # Overlapping years are reused rather than rebuilt.
+        assert self.table.build_timings[YEAR + 1] == first_timings[YEAR + 1]
+        assert self.table.stats()["misses"] == len(first_timings) + 1
+        assert english_dates[0] > NISAN_1_5785
+
+    def test_custom_horizon(self):
+        english_dates = self.table.get_english_dates(1, 1, Horizon(past=2, future=5))
+        assert len(english_dates) == 8  # noqa: PLR2004
+        assert english_dates[2] == NISAN_1_5785
+
+    def test_least_recently_used_years_are_evicted(self):
+        table = ConversionTable(max_years=4, recheck_interval=0)
+        table.get_ordinals(1, 1)
+        table.get_ordinals(1, 1, Horizon(past=1, future=0))
+        assert table.stats()["years"] == [YEAR - 1, YEAR, YEAR + 1, YEAR + 2]
+
+        table.get_ordinals(1, 1, Horizon(past=0, future=3))
+        assert table.stats()["years"] == [YEAR, YEAR + 1, YEAR + 2, YEAR + 3]
+        assert table.evictions == 1
+        assert sorted(table.build_timings) == table.stats()["years"]
+
+    def test_max_years_covers_default_horizon(self):
+        table = ConversionTable(max_years=1)
+        assert table.max_years == len(DEFAULT_HORIZON.years(YEAR))
+
+    def test_clear(self):
+        self.table.get_english_dates(1, 1)
+        self.table.clear()
+        assert self.table.start_year is None
+        assert self.table.stats()["total_build_seconds"] == 0
+
+
+class DateWindowTest(SimpleTestCase):
+    def test_includes_both_ends(self):
+        window = DateWindow(NISAN_1_5785, ROSH_HASHANA_5786)
+        assert window.includes(NISAN_1_5785)
+        assert window.includes(ROSH_HASHANA_5786)
+        assert not window.includes(ROSH_HASHANA_5786 + timedelta(days=1))
+
+    def test_horizon_covers_the_window(self):
+        window = DateWindow(NISAN_1_5785, ROSH_HASHANA_5786)
+        assert window.horizon(YEAR) == Horizon(past=0, future=1)
+        assert window.horizon(YEAR + 1) == Horizon(past=1, future=0)
+        assert window.horizon(YEAR + 3) == Horizon(past=3, future=0)
+
+
+class BuildYearTest(SimpleTestCase):
+    def test_one_slot_per_storable_date(self):
+        year_table = build_year(YEAR)
+        assert len(year_table) == SLOTS_PER_YEAR
+        assert year_table[slot(1, 1)] == NISAN_1_5785.toordinal()
+
+    def test_dates_that_never_exist_fall_back_to_last_day(self):
+        # Iyar always has 29 days.
+        year_table = build_year(YEAR)
+        assert year_table[slot(2, 30)] == year_table[slot(2, 29)]
+
+    def test_dates_that_never_exist_move_to_next_month(self):
+        year_table = build_year(YEAR)
+        next_day = MissingDay.NEXT_DAY
+        assert year_table[slot(2, 30, next_day)] == year_table[slot(3, 1)]
+        # 30 Adar I in a common year moves to 1 Nisan, the day after 29 Adar.
+        assert year_table[slot(12, 30, next_day)] == year_table[slot(12, 29)] + 1
+
+    def test_policies_agree_on_existing_dates(self):
+        year_table = build_year(YEAR)
+        for month in range(1, 14):
+            for day in range(1, 30):
+                assert (
+                    year_table[slot(month, day)]
+                    == year_table[slot(month, day, MissingDay.NEXT_DAY)]
+                )
+
+    def test_slot_out_of_range(self):
+        assert slot(0, 1) == -1
+        assert slot(1, 31) == -1
+
+
+class MappedTablesTest(SimpleTestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.path = Path(tmp_dir.name) / "table.bin"
+        patcher = mock.patch.object(
+            ConversionTable,
+            "today",
+            return_value=date(2025, 1, 1),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_round_trip(self):
+        write_table_file(self.path, range(YEAR, YEAR + 2))
+        mapped = MappedTables(self.path)
+        assert mapped.years == range(YEAR, YEAR + 2)
+        table = mapped.get(YEAR + 1)
+        assert table is not None
+        assert list(table) == list(build_year(YEAR + 1))
+        assert mapped.get(YEAR + 2) is None
+        assert mapped.covers(range(YEAR, YEAR + 1))
+        assert not mapped.covers(range(YEAR, YEAR + 3))
+
+    def test_load_missing_or_invalid_file(self):
+        assert MappedTables.load(self.path) is None
+        self.path.write_bytes(b"not a table")
+        assert MappedTables.load(self.path) is None
+
+    def test_table_reads_from_file(self):
+        write_table_file(self.path, range(YEAR - 1, YEAR + 5))
+        table = ConversionTable(path=self.path, recheck_interval=0)
+        assert table.get_english_dates(1, 1)[0] == NISAN_1_5785
+        assert table.stats()["years"] == []
+        assert table.stats()["mapped_years"] == list(range(YEAR - 1, YEAR + 5))
+        # Years outside the file are still built in-process.
+        table.get_ordinals(1, 1, Horizon(past=3, future=0))
+        assert table.stats()["years"] == [YEAR - 3, YEAR - 2]
+
+    def test_stale_file_is_regenerated(self):
+        write_table_file(self.path, range(YEAR - 5, YEAR))
+        table = ConversionTable(
+            path=self.path,
+            file_horizon=Horizon(past=1, future=10),
+            recheck_interval=0,
+        )
+        assert table.get_english_dates(1, 1)[0] == NISAN_1_5785
+        assert MappedTables(self.path).years == range(YEAR - 1, YEAR + 11)
+        assert table.stats()["years"] == []
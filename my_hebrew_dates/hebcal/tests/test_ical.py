@@ -0,0 +1,305 @@
+import re
+from datetime import UTC
+from datetime import date
+from datetime import datetime
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase
+from django.test import TestCase
+from django.urls import reverse
+from icalendar.parser import escape_char
+from icalendar.parser import foldline
+from icalendar.prop import vDuration
+
+from my_hebrew_dates.hebcal import ical
+from my_hebrew_dates.hebcal.benchmarks import legacy_generate_ical
+from my_hebrew_dates.hebcal.clients import GOOGLE
+from my_hebrew_dates.hebcal.clients import UNKNOWN
+from my_hebrew_dates.hebcal.clients import FeedVariant
+from my_hebrew_dates.hebcal.clients import detect_client
+from my_hebrew_dates.hebcal.hebrew_date import ConversionTable
+from my_hebrew_dates.hebcal.hebrew_date import conversion_table
+from my_hebrew_dates.hebcal.models import Calendar
+from my_hebrew_dates.hebcal.models import HebrewDate
+from my_hebrew_dates.hebcal.utils import FeedOptions
+from my_hebrew_dates.hebcal.utils import generate_ical
+from my_hebrew_dates.hebcal.utils import generate_ical_experimental
+from my_hebrew_dates.hebcal.utils import rscale_rule
+
+GOLDEN_DIR = Path(__file__).parent / "golden"
+DTSTAMP = datetime(2025, 1, 1, 12, 30, 15, tzinfo=UTC)
+MODIFIED = datetime(2024, 12, 31, 23, 59, 59, 999, tzinfo=UTC)
+
+
+class IcalHelpersTest(SimpleTestCase):
+    def test_escape_text_matches_icalendar(self):
+        for value in ("plain", "a,b;c\\d", "line\nbreak\r\nx", r"\N", "שלום, עולם"):
+            assert ical.escape_text(value) == escape_char(value), value
+
+    def test_fold_matches_icalendar(self):
+        for line in (
+            "x" * 74,
+            "x" * 75,
+            "x" * 300,
+            "DESCRIPTION:" + "א" * 100,
+            "SUMMARY:🕯️ " * 12,
+            "",
+        ):
+            assert ical.fold(line) == foldline(line), line
+
+    def test_format_duration_matches_icalendar(self):
+        for value in (
+            timedelta(hours=9),
+            timedelta(hours=-3, minutes=30),
+            timedelta(days=-1, hours=15),
+            timedelta(days=2, seconds=5),
+            timedelta(hours=1, seconds=5),
+            timedelta(0),
+        ):
+            assert ical.format_duration(value) == vDuration(value).to_ical().decode()
+
+    def test_format_utc(self):
+        naive = datetime(2025, 1, 1, 12, 0)  # noqa: DTZ001
+        assert ical.format_utc(naive) == "20250101T120000Z"
+        jerusalem = datetime.fromisoformat("2025-01-01T12:00:00+02:00")
+        assert ical.format_utc(jerusalem) == "20250101T100000Z"
+        assert ical.format_date(date(5, 3, 7)) == "00050307"
+
+
+class GoldenCalendarTestCase(TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(
+            ConversionTable,
+            "today",
+            return_value=date(2025, 1, 1),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        conversion_table.clear()
+        self.addCleanup(conversion_table.clear)
+
+        owner = get_user_model().objects.create(username="golden")
+        self.calendar = Calendar.objects.create(
+            name="Family, Friends; & more",
+            owner=owner,
+            timezone="Asia/Jerusalem",
+        )
+        for name, month, day, event_type in (
+            ('Moshe, son of Avraham; "the elder"', 1, 1, "🎂"),
+            ("יוסף בן אברהם הכהן מירושלים עיר הקודש תבנה ותכונן", 8, 30, "🕯️"),
+            ("Chana", 9, 30, "🎂"),
+            ("Back\\slash", 12, 14, "💍"),
+            ("Rivka", 12, 30, "🕯️"),
+            ("Esther", 13, 7, "🎂"),
+        ):
+            HebrewDate.objects.create(
+                name=name,
+                month=month,
+                day=day,
+                event_type=event_type,
+                calendar=self.calendar,
+            )
+        HebrewDate.objects.update(modified=MODIFIED)
+        self.calendar = Calendar.objects.prefetch_related("calendarOf").get(
+            pk=self.calendar.pk,
+        )
+
+    def assert_golden(self, name, output):
+        assert output.encode() == (GOLDEN_DIR / name).read_bytes()
+
+
+class GoldenFeedTest(GoldenCalendarTestCase):
+    """The direct serializer and the icalendar object model write the same bytes."""
+
+    def test_feed(self):
+        self.assert_golden(
+            "feed.ics",
+            generate_ical(self.calendar, dtstamp=DTSTAMP),
+        )
+        self.assert_golden(
+            "feed.ics",
+            legacy_generate_ical(self.calendar, dtstamp=DTSTAMP),
+        )
+
+    def test_experimental_feed(self):
+        alarm_trigger = timedelta(days=-1, hours=15)
+        self.assert_golden(
+            "feed_experimental.ics",
+            generate_ical_experimental(
+                self.calendar,
+                FeedOptions(alarm_trigger=alarm_trigger, client=GOOGLE),
+                dtstamp=DTSTAMP,
+            ),
+        )
+
+
+class EmitterTest(GoldenCalendarTestCase):
+    def dates(self, feed, name):
+        unfolded = feed.replace("\r\n ", "")
+        return [
+            day
+            for line in re.findall(rf"^{name};VALUE=DATE:(.*)\r$", unfolded, re.M)
+            for day in line.split(",")
+        ]
+
+    def test_rdate_feed_lists_every_occurrence(self):
+        expanded = generate_ical(self.calendar, dtstamp=DTSTAMP)
+        compact = generate_ical(
+            self.calendar,
+            FeedOptions(variant=FeedVariant.RDATE),
+            dtstamp=DTSTAMP,
+        )
+        assert compact.count("BEGIN:VEVENT") == 6  # noqa: PLR2004
+        assert "RRULE" not in compact
+        assert sorted(
+            self.dates(compact, "DTSTART") + self.dates(compact, "RDATE"),
+        ) == sorted(self.dates(expanded, "DTSTART"))
+        for hebrew_date in self.calendar.calendarOf.all():
+            assert f"UID:{hebrew_date.uid_hash}@myhebrewdates.com" in compact
+
+    def test_every_variant_has_an_emitter(self):
+        for variant in FeedVariant:
+            with self.subTest(variant=variant):
+                feed = generate_ical(
+                    self.calendar,
+                    FeedOptions(variant=variant),
+                    dtstamp=DTSTAMP,
+                )
+                assert "Esther" in feed
+
+    def test_compact_feed_lists_rows_no_rule_observes(self):
+        expanded = generate_ical(self.calendar, dtstamp=DTSTAMP)
+        compact = generate_ical_experimental(self.calendar, dtstamp=DTSTAMP)
+        rivka = self.calendar.calendarOf.get(name="Rivka")
+        event = next(
+            event for event in compact.split("BEGIN:VEVENT") if "Rivka" in event
+        )
+        assert "RRULE" not in event
+        assert sorted(
+            self.dates(event, "DTSTART") + self.dates(event, "RDATE"),
+        ) == [
+            day.strftime("%Y%m%d")
+            for day in rivka.get_english_dates(FeedOptions().horizon)
+        ]
+        assert self.dates(event, "DTSTART")[0] in self.dates(expanded, "DTSTART")
+
+
+class RscaleRuleTest(SimpleTestCase):
+    def rule(self, month, day, event_type):
+        return rscale_rule(HebrewDate(month=month, day=day, event_type=event_type))
+
+    def test_short_month_day_skips_by_missing_day_policy(self):
+        # 30 Cheshvan and 30 Kislev are missing in short years.
+        assert self.rule(8, 30, "🕯️") == (
+            "RSCALE=hebrew;FREQ=YEARLY;BYMONTHDAY=30;BYMONTH=2;SKIP=BACKWARD"
+        )
+        assert self.rule(9, 30, "🎂") == (
+            "RSCALE=hebrew;FREQ=YEARLY;BYMONTHDAY=30;BYMONTH=3;SKIP=FORWARD"
+        )
+        assert self.rule(9, 30, "💍") == (
+            "RSCALE=hebrew;FREQ=YEARLY;BYMONTHDAY=30;BYMONTH=3;SKIP=BACKWARD"
+        )
+
+    def test_full_month_day_needs_no_skip(self):
+        assert self.rule(7, 30, "🎂") == (
+            "RSCALE=hebrew;FREQ=YEARLY;BYMONTHDAY=30;BYMONTH=1"
+        )
+
+    def test_adar_falls_on_adar_in_common_years(self):
+        # Adar I (5L) only exists in leap years; Adar II (6) is Adar in
+        # common years.
+        assert self.rule(12, 14, "💍") == (
+            "RSCALE=hebrew;FREQ=YEARLY;BYMONTHDAY=14;BYMONTH=5L;SKIP=FORWARD"
+        )
+        assert self.rule(13, 7, "🎂") == (
+            "RSCALE=hebrew;FREQ=YEARLY;BYMONTHDAY=7;BYMONTH=6"
+        )
+        assert self.rule(13, 30, "🕯️") == (
+            "RSCALE=hebrew;FREQ=YEARLY;BYMONTHDAY=30;BYMONTH=6;SKIP=BACKWARD"
+        )
+
+    def test_thirtieth_of_adar_i_has_no_rule(self):
+        for event_type in ("🎂", "🕯️"):
+            assert self.rule(12, 30, event_type) == ""
+
+
+class ClientCompatibilityMatrixTest(GoldenCalendarTestCase):
+    """Each client gets the feed form it can display."""
+
+    MATRIX = (
+        # (User-Agent, ?client=, golden feed)
+        ("macOS/15.1 (24B83) CalendarAgent/1000", None, "feed_compact.ics"),
+        ("iOS/18.1 (22B83) dataaccessd/1.0", None, "feed_compact.ics"),
+        ("Google-Calendar-Importer", None, "feed_google.ics"),
+        (
+            "Microsoft Office/16.0 (Windows NT 10.0; Microsoft Outlook 16.0.17928; "
+            "Pro)",
+            None,
+            "feed.ics",
+        ),
+        (
+            "Mozilla/5.0 (X11; Linux x86_64; rv:128.0) Gecko/20100101 "
+            "Thunderbird/128.4.0",
+            None,
+            "feed.ics",
+        ),
+        (
+            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 "
+            "(KHTML, like Gecko) Chrome/130.0.0.0 Safari/537.36",
+            "fullcalendar",
+            "feed.ics",
+        ),
+        ("curl/8.5.0", None, "feed.ics"),
+    )
+
+    def test_matrix(self):
+        url = reverse("hebcal:calendar_file", args=[self.calendar.uuid])
+        dtstamp = f"DTSTAMP:{ical.format_utc(DTSTAMP)}".encode()
+        for user_agent, client, golden in self.MATRIX:
+            with self.subTest(user_agent=user_agent):
+                params = {"client": client} if client else {}
+                response = self.client.get(url, params, HTTP_USER_AGENT=user_agent)
+                assert "User-Agent" in response["Vary"]
+                body = re.sub(rb"DTSTAMP:\d{8}T\d{6}Z", dtstamp, response.content)
+                assert body == (GOLDEN_DIR / golden).read_bytes()
+
+    def test_client_param_decides_the_timezone(self):
+        # Feeds are cached under the client ?client= names, so the feed must
+        # be that client's whatever the User-Agent says.
+        url = reverse("hebcal:calendar_file", args=[self.calendar.uuid])
+        browser = "Mozilla/5.0 (X11; Linux x86_64) Chrome/130.0.0.0"
+        for user_agent, client, calendar_timezone in (
+            (browser, "google", "UTC"),
+            ("Google-Calendar-Importer", "google", "UTC"),
+            ("Google-Calendar-Importer", "fullcalendar", "Asia/Jerusalem"),
+            (browser, "fullcalendar", "Asia/Jerusalem"),
+        ):
+            with self.subTest(user_agent=user_agent, client=client):
+                response = self.client.get(
+                    url,
+                    {"client": client},
+                    HTTP_USER_AGENT=user_agent,
+                )
+                header = f"X-WR-TIMEZONE:{calendar_timezone}\r\n"
+                assert header in response.content.decode()
+
+    def test_expirimental_flag_forces_compact_feed(self):
+        url = reverse("hebcal:calendar_file", args=[self.calendar.uuid])
+        response = self.client.get(url, {"expirimental": "1"})
+        assert response.content.count(b"RSCALE=hebrew") == 5  # noqa: PLR2004
+
+
+class DetectClientTest(SimpleTestCase):
+    def test_unknown_client_gets_expanded_feed(self):
+        client = detect_client("Mozilla/5.0 (iPhone) CriOS/130.0 Mobile")
+        assert client is UNKNOWN
+        assert client.variant is FeedVariant.EXPANDED
+
+    def test_client_param_overrides_user_agent(self):
+        assert detect_client("Google-Calendar-Importer", "fullcalendar").name == (
+            "fullcalendar"
+        )
+        assert detect_client("Google-Calendar-Importer", "bogus").name == "google"
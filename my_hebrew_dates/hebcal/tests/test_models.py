@@ -1,8 +1,20 @@
 # ruff: noqa: S106
+from base64 import urlsafe_b64encode
+from datetime import UTC
+from datetime import date
+from datetime import datetime
+from hashlib import sha1
+from importlib import import_module
+from unittest import mock
+
+from django.apps import apps
 from django.contrib.auth import get_user_model
 from django.test import TestCase
 from django.urls import reverse
 
+from my_hebrew_dates.hebcal.hebrew_date import ConversionTable
+from my_hebrew_dates.hebcal.hebrew_date import Horizon
+from my_hebrew_dates.hebcal.hebrew_date import conversion_table
 from my_hebrew_dates.hebcal.models import Calendar
 from my_hebrew_dates.hebcal.models import HebrewDate
 
@@ -24,6 +36,24 @@ class CalendarModelTest(TestCase):
         url = reverse("hebcal:calendar_edit", kwargs={"uuid": self.calendar.uuid})
         assert self.calendar.get_absolute_url() == url
 
+    def test_feed_freshness_follows_the_hebrew_year(self):
+        assert self.calendar.get_materialized_feed() is None
+        self.calendar.calendar_file_str = "BEGIN:VCALENDAR"
+        # Generated the day before Rosh Hashana 5786.
+        self.calendar.calendar_file_generated = datetime(2025, 9, 22, 12, tzinfo=UTC)
+        with mock.patch.object(
+            ConversionTable,
+            "today",
+            return_value=date(2025, 9, 22),
+        ):
+            assert self.calendar.get_materialized_feed() == b"BEGIN:VCALENDAR"
+        with mock.patch.object(
+            ConversionTable,
+            "today",
+            return_value=date(2025, 9, 23),
+        ):
+            assert not self.calendar.has_fresh_feed()
+
 
 class HebrewDateModelTest(TestCase):
     def setUp(self):
@@ -52,3 +82,118 @@ class HebrewDateModelTest(TestCase):
     def test_get_absolute_url(self):
         url = reverse("hebcal:calendar_edit", kwargs={"uuid": self.calendar.uuid})
         assert self.hebrew_date.get_absolute_url() == url
+
+    def test_with_english_dates(self):
+        HebrewDate.objects.create(
+            name="Second Hebrew Date",
+            month=1,
+            day=1,
+            event_type="🎂",
+            calendar=self.calendar,
+        )
+        calendar = Calendar.objects.prefetch_related("calendarOf").get(
+            pk=self.calendar.pk,
+        )
+        with self.assertNumQueries(0):
+            rows = calendar.calendarOf.all().with_english_dates()
+        assert [hebrew_date.name for hebrew_date, _ in rows] == [
+            "Test Hebrew Date",
+            "Second Hebrew Date",
+        ]
+        (_, first), (_, second) = rows
+        assert first is second
+        assert first == self.hebrew_date.get_english_dates()
+
+    def test_feed_rows(self):
+        HebrewDate.objects.create(
+            name="Second Hebrew Date",
+            month=12,
+            day=30,
+            event_type="🕯️",
+            calendar=self.calendar,
+        )
+        with self.assertNumQueries(1):
+            rows = self.calendar.calendarOf.order_by("pk").feed_rows()
+        expected = self.calendar.calendarOf.order_by("pk").with_english_dates()
+        assert [english_dates for _, english_dates in rows] == [
+            english_dates for _, english_dates in expected
+        ]
+        for (row, _), (hebrew_date, _) in zip(rows, expected, strict=True):
+            assert row == (
+                hebrew_date.pk,
+                hebrew_date.name,
+                hebrew_date.month,
+                hebrew_date.day,
+                hebrew_date.event_type,
+                hebrew_date.uid_hash,
+                hebrew_date.modified,
+            )
+            assert row.get_hebrew_date() == hebrew_date.get_hebrew_date()
+            assert row.get_event_type_display() == (
+                hebrew_date.get_event_type_display()
+            )
+            assert row.get_rfc7529_month() == hebrew_date.get_rfc7529_month()
+            assert row.occurrence_key == hebrew_date.occurrence_key
+
+        calendar = Calendar.objects.prefetch_related("calendarOf").get(
+            pk=self.calendar.pk,
+        )
+        with self.assertNumQueries(0):
+            assert len(calendar.calendarOf.feed_rows()) == 2  # noqa: PLR2004
+
+    def test_missing_day_policy_depends_on_event_type(self):
+        # Cheshvan has only 29 days in 5786 (2025-26).
+        birthday = HebrewDate(month=8, day=30, event_type="🎂")
+        yartzeit = HebrewDate(month=8, day=30, event_type="🕯️")
+        horizon = Horizon(past=0, future=0)
+        with mock.patch.object(
+            ConversionTable,
+            "today",
+            return_value=date(2025, 10, 1),
+        ):
+            conversion_table.clear()
+            self.addCleanup(conversion_table.clear)
+            assert birthday.get_english_dates(horizon) == [date(2025, 11, 21)]
+            assert yartzeit.get_english_dates(horizon) == [date(2025, 11, 20)]
+
+    def test_uid_hash_matches_legacy_digest(self):
+        digest = sha1(  # noqa: S324
+            ("🎂" + "Test Hebrew Date" + "א ניסן").encode(),
+        ).digest()
+        assert self.hebrew_date.uid_hash == urlsafe_b64encode(digest).decode()
+
+    def test_uid_hash_follows_edits(self):
+        self.hebrew_date.name = "Renamed"
+        self.hebrew_date.save(update_fields=["name"])
+        self.hebrew_date.refresh_from_db()
+        assert self.hebrew_date.uid_hash == self.hebrew_date.compute_uid_hash()
+
+        self.hebrew_date.day = 2
+        HebrewDate.objects.bulk_update([self.hebrew_date], ["day"])
+        self.hebrew_date.refresh_from_db()
+        assert self.hebrew_date.uid_hash == self.hebrew_date.compute_uid_hash()
+
+    def test_bulk_create_sets_uid_hash(self):
+        (hebrew_date,) = HebrewDate.objects.bulk_create(
+            [
+                HebrewDate(
+                    name="Bulk",
+                    month=2,
+                    day=3,
+                    event_type="💍",
+                    calendar=self.calendar,
+                ),
+            ],
+        )
+        assert HebrewDate.objects.get(pk=hebrew_date.pk).uid_hash == (
+            hebrew_date.compute_uid_hash()
+        )
+
+    def test_migration_backfills_uid_hash(self):
+        migration = import_module(
+            "my_hebrew_dates.hebcal.migrations.0010_hebrewdate_uid_hash",
+        )
+        HebrewDate.objects.update(uid_hash="")
+        migration.fill_uid_hash(apps, None)
+        self.hebrew_date.refresh_from_db()
+        assert self.hebrew_date.uid_hash == self.hebrew_date.compute_uid_hash()
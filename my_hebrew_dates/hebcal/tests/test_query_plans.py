@@ -0,0 +1,207 @@
+"""
+Query plans of every hebcal view against a seeded database.
+
+Each view is requested with the queries it issues captured, and every one
+of them is run through ``EXPLAIN`` after ``ANALYZE``; a sequential scan of
+a table that grows with the number of users fails the test. The seed data
+is far smaller than production, where the planner would rightly scan such
+small tables whole, so plans are taken with ``enable_seqscan`` off: a
+sequential scan then only shows up when no index can serve the query.
+"""
+
+import json
+from http import HTTPStatus
+from unittest import skipUnless
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from my_hebrew_dates.hebcal import sync
+from my_hebrew_dates.hebcal.models import Calendar
+from my_hebrew_dates.hebcal.models import HebrewDate
+from my_hebrew_dates.hebcal.models import HebrewDateChange
+from my_hebrew_dates.users.models import User
+
+# hebcal's tables that grow with the number of users.
+LARGE_TABLES = frozenset(
+    {"hebcal_calendar", "hebcal_hebrewdate", "hebcal_hebrewdatechange"},
+)
+OWNERS = 50
+CALENDARS_PER_OWNER = 4
+EVENTS_PER_CALENDAR = 50
+
+PROPFIND = b"""<?xml version="1.0" encoding="utf-8"?>
+<D:propfind xmlns:D="DAV:"><D:prop><D:getetag/></D:prop></D:propfind>"""
+
+
+def sequential_scans(plan: dict) -> set[str]:
+    """The relations ``plan`` (an EXPLAIN JSON node) reads sequentially."""
+    scans = set()
+    if plan["Node Type"] == "Seq Scan":
+        scans.add(plan["Relation Name"])
+    for child in plan.get("Plans", ()):
+        scans |= sequential_scans(child)
+    return scans
+
+
+@skipUnless(connection.vendor == "postgresql", "Checks PostgreSQL query plans")
+class QueryPlanTest(TestCase):
+    user: User
+    calendar: Calendar
+    hebrew_date: HebrewDate
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("owner", "owner@example.com", "password")
+        owners = User.objects.bulk_create(
+            User(username=f"user{index}", email=f"user{index}@example.com")
+            for index in range(OWNERS)
+        )
+        calendars = Calendar.objects.bulk_create(
+            Calendar(name=f"Calendar {index}", owner=owner)
+            for owner in [cls.user, *owners]
+            for index in range(CALENDARS_PER_OWNER)
+        )
+        HebrewDate.objects.bulk_create(
+            HebrewDate(
+                name=f"Person {index}",
+                month=index % 13 + 1,
+                day=index % 30 + 1,
+                event_type="🎂",
+                calendar=calendar,
+            )
+            for calendar in calendars
+            for index in range(EVENTS_PER_CALENDAR)
+        )
+        HebrewDateChange.objects.bulk_create(
+            HebrewDateChange(
+                calendar_uuid=calendar.uuid,
+                hebrew_date_id=hebrew_date_id,
+                uid_hash="x",
+                action=HebrewDateChange.Action.UPDATED,
+            )
+            for calendar in calendars
+            for hebrew_date_id in range(EVENTS_PER_CALENDAR)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {', '.join(sorted(LARGE_TABLES))}")
+        cls.calendar = calendars[0]
+        cls.hebrew_date = cls.calendar.calendarOf.earliest("pk")
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client.force_login(self.user)
+
+    def assert_indexed(self, url: str, *, verb="get", status=HTTPStatus.OK, **kwargs):
+        with CaptureQueriesContext(connection) as queries:
+            if verb in ("get", "post"):
+                response = getattr(self.client, verb)(url, **kwargs)
+            else:
+                response = self.client.generic(verb, url, **kwargs)
+            # Streamed responses run their queries as they are read.
+            if getattr(response, "streaming", False):
+                b"".join(response.streaming_content)
+        assert response.status_code == status, (url, response.status_code)
+        statements = [
+            query["sql"]
+            for query in queries.captured_queries
+            if query["sql"].startswith(("SELECT", "UPDATE", "DELETE"))
+        ]
+        assert statements, url
+        with connection.cursor() as cursor:
+            cursor.execute("SET enable_seqscan = off")
+            try:
+                for sql in statements:
+                    cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}")
+                    plan = cursor.fetchone()[0]
+                    if isinstance(plan, str):
+                        plan = json.loads(plan)
+                    scans = sequential_scans(plan[0]["Plan"]) & LARGE_TABLES
+                    assert not scans, f"{url}: sequential scan of {scans} in\n{sql}"
+            finally:
+                cursor.execute("RESET enable_seqscan")
+
+    def test_calendar_pages(self):
+        uuid = self.calendar.uuid
+        self.assert_indexed(reverse("hebcal:calendar_list"))
+        self.assert_indexed(reverse("hebcal:calendar_detail", args=[uuid]))
+        self.assert_indexed(
+            reverse("hebcal:calendar_edit", args=[uuid]),
+            data={"month": "1", "day": "1", "sort": "month", "order": "desc"},
+        )
+        self.assert_indexed(
+            reverse("hebcal:calendar_edit", args=[uuid]),
+            data={"sort": "month", "after": "3.4.0"},
+            headers={"hx-request": "true"},
+        )
+        self.assert_indexed(
+            reverse("hebcal:calendar_edit", args=[uuid]),
+            data={"search": "persn 1"},
+        )
+        self.assert_indexed(
+            reverse("hebcal:update_calendar", args=[self.calendar.pk]),
+            headers={"hx-request": "true"},
+        )
+        self.assert_indexed(reverse("hebcal:calendar_delete", args=[uuid]))
+
+    def test_htmx_endpoints(self):
+        uuid = self.calendar.uuid
+        htmx = {"headers": {"hx-request": "true"}}
+        self.assert_indexed(
+            reverse(
+                "hebcal:edit_hebrew_date_htmx",
+                args=[uuid, self.hebrew_date.pk],
+            ),
+            **htmx,
+        )
+        self.assert_indexed(
+            reverse("hebcal:create_hebrew_date_htmx", args=[uuid]),
+            **htmx,
+        )
+        self.assert_indexed(
+            reverse("hebcal:update_calendar_links_htmx", args=[uuid]),
+            **htmx,
+        )
+        self.assert_indexed(
+            reverse(
+                "hebcal:delete_hebrew_date_htmx",
+                args=[uuid, self.hebrew_date.pk],
+            ),
+            verb="post",
+            **htmx,
+        )
+
+    def test_feeds(self):
+        uuid = self.calendar.uuid
+        self.assert_indexed(reverse("hebcal:calendar_file", args=[uuid]))
+        self.assert_indexed(
+            reverse("hebcal:calendar_file", args=[uuid]),
+            data={"start": "2025-01-01", "days": "30"},
+        )
+        self.assert_indexed(
+            reverse("hebcal:serve_pixel", args=[uuid, self.hebrew_date.pk]),
+        )
+
+    def test_sync(self):
+        url = reverse("hebcal:calendar_sync", args=[self.calendar.uuid])
+        self.assert_indexed(url)
+        token = sync.current_token(self.calendar.uuid)
+        self.assert_indexed(url, data={"token": str(token)})
+
+    def test_caldav(self):
+        uuid = self.calendar.uuid
+        self.assert_indexed(
+            reverse("hebcal:calendar_dav", args=[uuid]),
+            verb="PROPFIND",
+            status=HTTPStatus.MULTI_STATUS,
+            data=PROPFIND,
+            content_type="application/xml",
+            headers={"depth": "1"},
+        )
+        self.assert_indexed(
+            reverse("hebcal:calendar_dav_event", args=[uuid, self.hebrew_date.pk]),
+        )
@@ -0,0 +1,97 @@
+from unittest import mock
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import SimpleTestCase
+from django.test import TestCase
+from django.test import override_settings
+
+from my_hebrew_dates.hebcal.models import Calendar
+from my_hebrew_dates.hebcal.models import HebrewDate
+from my_hebrew_dates.hebcal.search import MAX_RANK
+from my_hebrew_dates.hebcal.search import has_pg_trgm
+from my_hebrew_dates.hebcal.search import normalize
+from my_hebrew_dates.hebcal.search import rank
+from my_hebrew_dates.hebcal.search import search
+
+User = get_user_model()
+
+
+class NormalizeTest(SimpleTestCase):
+    def test_latin(self):
+        assert normalize("  José-María O'Brien ") == "jose maria o brien"
+        assert normalize("STRASSE") == normalize("straße")
+
+    def test_hebrew(self):
+        # Niqqud dropped, final letters in their regular form.
+        assert normalize("יוֹסֵף") == normalize("יוסף") == "יוספ"
+        assert normalize("מִרְיָם בַּת־שָׂרָה") == "מרימ בת שרה"
+
+
+class RankTest(SimpleTestCase):
+    def test_containing_the_query_ranks_first(self):
+        assert rank("yos", "yosef cohen") == MAX_RANK
+        assert rank("yosef cohen", "yosef cohen") == MAX_RANK
+
+    def test_near_misses(self):
+        near = rank("persn", "person 1")
+        assert 0 < near < MAX_RANK
+        assert rank("persson", "person 1") > 0
+        assert rank("sarah", "person 1") == 0
+
+    def test_matches_the_best_words(self):
+        assert rank("cohenn", "yosef cohen levi") > 0
+        assert rank("yosef coen", "rabbi yosef cohen") > 0
+        assert rank("yosef coen", "yosef levi") == 0
+
+
+class SearchTestMixin:
+    def setUp(self):
+        user = User.objects.create_user("testuser", "test@example.com", "password")
+        self.calendar = Calendar.objects.create(name="Test Calendar", owner=user)
+        for name in ("Yosef Cohen", "יוֹסֵף כֹּהֵן", "Yossef Levi", "Sarah"):
+            HebrewDate.objects.create(
+                name=name,
+                month=1,
+                day=1,
+                event_type="🎂",
+                calendar=self.calendar,
+            )
+
+    def names(self, query):
+        results = search(self.calendar.calendarOf.all(), query).order_by(
+            "-search_rank",
+            "pk",
+        )
+        return [hebrew_date.name for hebrew_date in results]
+
+    def test_ranked(self):
+        assert self.names("yosef") == ["Yosef Cohen", "Yossef Levi"]
+        assert self.names("cohen") == ["Yosef Cohen"]
+
+    def test_hebrew_without_niqqud(self):
+        assert self.names("יוסף") == ["יוֹסֵף כֹּהֵן"]
+        assert self.names("כהן") == ["יוֹסֵף כֹּהֵן"]
+
+    def test_no_match(self):
+        assert self.names("zzz") == []
+
+    def test_empty_query_matches_everything(self):
+        assert len(self.names(" ")) == 4  # noqa: PLR2004
+
+
+@override_settings(HEBCAL_SEARCH_BACKEND="python")
+class PythonSearchTest(SearchTestMixin, TestCase):
+    def test_keeps_the_best_matches(self):
+        with mock.patch("my_hebrew_dates.hebcal.search.PYTHON_MAX_RESULTS", 1):
+            assert self.names("yosef") == ["Yosef Cohen"]
+
+
+@skipUnless(connection.vendor == "postgresql", "Searches with pg_trgm")
+@override_settings(HEBCAL_SEARCH_BACKEND="trigram")
+class TrigramSearchTest(SearchTestMixin, TestCase):
+    def setUp(self):
+        if not has_pg_trgm(connection.alias):
+            self.skipTest("pg_trgm isn't installed")
+        super().setUp()
@@ -0,0 +1,122 @@
+from datetime import UTC
+from datetime import datetime
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase
+from django.test import TestCase
+from django.utils import timezone
+
+from my_hebrew_dates.hebcal.hebrew_date import ConversionTable
+from my_hebrew_dates.hebcal.models import Calendar
+from my_hebrew_dates.hebcal.models import HebrewDate
+from my_hebrew_dates.hebcal.models import HebrewDateChange
+from my_hebrew_dates.hebcal.sync import SyncToken
+from my_hebrew_dates.hebcal.sync import changes_since
+from my_hebrew_dates.hebcal.sync import compact_changes
+from my_hebrew_dates.hebcal.sync import current_token
+from my_hebrew_dates.hebcal.sync import is_valid_token
+
+User = get_user_model()
+
+
+class SyncTokenTest(SimpleTestCase):
+    def test_round_trip(self):
+        token = SyncToken(42, datetime(2025, 1, 1, tzinfo=UTC))
+        assert SyncToken.parse(str(token)) == token
+
+    def test_malformed(self):
+        assert SyncToken.parse("") is None
+        assert SyncToken.parse("42") is None
+        assert SyncToken.parse("a-b") is None
+
+    def test_expired(self):
+        assert is_valid_token(SyncToken(1, timezone.now()))
+        assert not is_valid_token(SyncToken(1, timezone.now() - timedelta(days=31)))
+
+    def test_issued_before_the_year_began(self):
+        # The feed window rolled forward on Rosh Hashana 5786.
+        now = datetime(2025, 9, 24, 12, tzinfo=UTC)
+        with (
+            mock.patch.object(ConversionTable, "today", return_value=now.date()),
+            mock.patch("django.utils.timezone.now", return_value=now),
+        ):
+            assert is_valid_token(SyncToken(1, datetime(2025, 9, 23, tzinfo=UTC)))
+            assert not is_valid_token(
+                SyncToken(1, datetime(2025, 9, 22, 23, 59, tzinfo=UTC)),
+            )
+
+
+class ChangeLogTest(TestCase):
+    def setUp(self):
+        user = User.objects.create_user("testuser", "test@example.com", "password")
+        self.calendar = Calendar.objects.create(name="Test Calendar", owner=user)
+        self.start = current_token(self.calendar.uuid)
+        self.hebrew_date = HebrewDate.objects.create(
+            name="Test Hebrew Date",
+            month=1,
+            day=1,
+            event_type="🎂",
+            calendar=self.calendar,
+        )
+
+    def changes(self, token):
+        return changes_since(self.calendar.pk, self.calendar.uuid, token)
+
+    def test_created(self):
+        updated, deleted = self.changes(self.start)
+        assert list(updated) == [self.hebrew_date]
+        assert deleted == []
+        updated, deleted = self.changes(current_token(self.calendar.uuid))
+        assert not updated
+        assert deleted == []
+
+    def test_renamed_events_replace_their_uids(self):
+        token = current_token(self.calendar.uuid)
+        original_uid_hash = self.hebrew_date.uid_hash
+        self.hebrew_date.name = "Renamed"
+        self.hebrew_date.save()
+        renamed_uid_hash = self.hebrew_date.uid_hash
+        updated, deleted = self.changes(token)
+        assert list(updated) == [self.hebrew_date]
+        assert deleted == [original_uid_hash]
+
+        self.hebrew_date.name = "Test Hebrew Date"
+        self.hebrew_date.save()
+        updated, deleted = self.changes(token)
+        assert list(updated) == [self.hebrew_date]
+        assert deleted == [renamed_uid_hash]
+
+    def test_deleted(self):
+        token = current_token(self.calendar.uuid)
+        uid_hash = self.hebrew_date.uid_hash
+        self.hebrew_date.delete()
+        updated, deleted = self.changes(token)
+        assert not updated
+        assert deleted == [uid_hash]
+
+    def test_deleting_the_calendar_leaves_one_tombstone(self):
+        uuid = self.calendar.uuid
+        HebrewDateChange.objects.all().delete()
+        self.calendar.delete()
+        change = HebrewDateChange.objects.get(calendar_uuid=uuid)
+        assert change.hebrew_date_id is None
+        assert change.action == HebrewDateChange.Action.DELETED
+
+    def test_compaction_keeps_the_latest_change_per_uid(self):
+        token = current_token(self.calendar.uuid)
+        for name in ("Renamed", "Test Hebrew Date", "Renamed"):
+            self.hebrew_date.name = name
+            self.hebrew_date.save()
+        before = self.changes(token)
+        assert compact_changes() == 5  # noqa: PLR2004
+        after = self.changes(token)
+        assert list(after.updated) == list(before.updated)
+        assert after.deleted == before.deleted
+        assert HebrewDateChange.objects.count() == 2  # noqa: PLR2004
+
+    def test_compaction_drops_expired_changes(self):
+        HebrewDateChange.objects.update(created=timezone.now() - timedelta(days=31))
+        assert compact_changes() == 1
+        assert not HebrewDateChange.objects.exists()
@@ -0,0 +1,91 @@
+# ruff: noqa: S106
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from my_hebrew_dates.hebcal.models import Calendar
+from my_hebrew_dates.hebcal.models import HebrewDate
+from my_hebrew_dates.hebcal.tasks import refresh_calendar_feed
+from my_hebrew_dates.hebcal.tasks import refresh_stale_calendar_feeds
+
+User = get_user_model()
+
+
+class MaterializedFeedTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser",
+            password="testpassword",
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.calendar = Calendar.objects.create(
+                name="Test Calendar",
+                owner=self.user,
+            )
+
+    def stored_feed(self) -> str:
+        """The calendar's stored feed, or "" if it has none."""
+        self.calendar.refresh_from_db()
+        feed = self.calendar.get_materialized_feed()
+        return feed.decode() if feed is not None else ""
+
+    def test_new_calendar_is_materialized(self):
+        feed = self.stored_feed()
+        assert feed.startswith("BEGIN:VCALENDAR\r\n")
+        assert "BEGIN:VEVENT" not in feed
+
+    def test_hebrew_date_writes_refresh_feed(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            hebrew_date = HebrewDate.objects.create(
+                name="Moshe",
+                month=1,
+                day=1,
+                event_type="🎂",
+                calendar=self.calendar,
+            )
+        assert "Moshe" in self.stored_feed()
+
+        hebrew_date.name = "Yosef"
+        with self.captureOnCommitCallbacks(execute=True):
+            hebrew_date.save()
+        feed = self.stored_feed()
+        assert "Yosef" in feed
+        assert "Moshe" not in feed
+
+        with self.captureOnCommitCallbacks(execute=True):
+            hebrew_date.delete()
+        assert "Yosef" not in self.stored_feed()
+
+    def test_calendar_delete_skips_its_events_feeds(self):
+        HebrewDate.objects.bulk_create(
+            HebrewDate(
+                name=f"Person {index}",
+                month=1,
+                day=1,
+                event_type="🎂",
+                calendar=self.calendar,
+            )
+            for index in range(5)
+        )
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.calendar.delete()
+        assert callbacks == []
+
+    def test_writes_invalidate_before_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.calendar.name = "Renamed"
+            self.calendar.save()
+        assert self.stored_feed() == ""
+        assert len(callbacks) == 1
+        callbacks[0]()
+        assert "X-WR-CALNAME:Renamed" in self.stored_feed()
+
+    def test_fresh_feeds_are_skipped(self):
+        assert not refresh_calendar_feed(self.calendar.pk)
+        assert refresh_calendar_feed(self.calendar.pk, force=True)
+        assert not refresh_calendar_feed(0)
+
+    def test_refresh_stale_feeds(self):
+        assert refresh_stale_calendar_feeds() == 0
+        Calendar.objects.update(calendar_file_generated=None)
+        assert refresh_stale_calendar_feeds() == 1
+        assert self.stored_feed() != ""
@@ -4,10 +4,12 @@ from django.test import SimpleTestCase
 from django.urls import resolve
 from django.urls import reverse
 
+from my_hebrew_dates.hebcal.views import CalendarDavView
 from my_hebrew_dates.hebcal.views import CalendarDeleteView
 from my_hebrew_dates.hebcal.views import calendar_detail_view
 from my_hebrew_dates.hebcal.views import calendar_edit_view
 from my_hebrew_dates.hebcal.views import calendar_file
+from my_hebrew_dates.hebcal.views import calendar_sync
 from my_hebrew_dates.hebcal.views import create_calendar_view
 from my_hebrew_dates.hebcal.views import create_hebrew_date_htmx
 from my_hebrew_dates.hebcal.views import delete_hebrew_date_htmx
@@ -47,6 +49,18 @@ class TestUrls(SimpleTestCase):
         url = reverse("hebcal:legacy_calendar_file", args=[uuid])
         assert resolve(url).func == calendar_file
 
+    def test_calendar_dav_urls(self):
+        uuid = self.generate_uuid()
+        url = reverse("hebcal:calendar_dav", args=[uuid])
+        assert getattr(resolve(url).func, "view_class", None) is CalendarDavView
+        url = reverse("hebcal:calendar_dav_event", args=[uuid, 1])
+        assert getattr(resolve(url).func, "view_class", None) is CalendarDavView
+
+    def test_calendar_sync_url(self):
+        uuid = self.generate_uuid()
+        url = reverse("hebcal:calendar_sync", args=[uuid])
+        assert resolve(url).func == calendar_sync
+
     def test_calendar_file_url(self):
         uuid = self.generate_uuid()
         url = reverse("hebcal:calendar_file", args=[uuid])
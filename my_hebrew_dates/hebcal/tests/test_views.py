@@ -1,14 +1,32 @@
 # ruff: noqa: S106
+import gzip
+from datetime import UTC
+from datetime import date
+from datetime import datetime
+from datetime import timedelta
 from http import HTTPStatus
+from unittest import mock
 from uuid import uuid4
 
+import brotli
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
 from django.test import Client
 from django.test import TestCase
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import parse_http_date
 
+from my_hebrew_dates.hebcal.feed_cache import feed_cache
+from my_hebrew_dates.hebcal.hebrew_date import ConversionTable
+from my_hebrew_dates.hebcal.hebrew_date import Horizon
+from my_hebrew_dates.hebcal.hebrew_date import conversion_table
 from my_hebrew_dates.hebcal.models import Calendar
 from my_hebrew_dates.hebcal.models import HebrewDate
+from my_hebrew_dates.hebcal.utils import materialize_feed
 
 User = get_user_model()
 
@@ -16,6 +34,10 @@ User = get_user_model()
 class BaseTest(TestCase):
     def setUp(self):
         # Common setup tasks
+        # Feeds are cached by calendar pk, which the database may reuse
+        # between tests.
+        cache.clear()
+        self.addCleanup(cache.clear)
         self.client = Client()
         self.user = User.objects.create_user("testuser", "test@example.com", "password")
 
@@ -173,3 +195,483 @@ class CalendarEditViewTest(BaseTest):
         self.assertContains(response, self.hebrew_date1.name)
         self.assertContains(response, self.hebrew_date2.name)
         self.assertContains(response, self.hebrew_date3.name)
+
+
+@override_settings(HEBCAL_EDIT_PAGE_SIZE=2)
+class CalendarEditPaginationTest(BaseTest):
+    def setUp(self):
+        super().setUp()
+        self.client.login(username="testuser", password="password")
+        self.calendar = Calendar.objects.create(name="Test Calendar", owner=self.user)
+        self.url = reverse("hebcal:calendar_edit", args=[self.calendar.uuid])
+        for name, month, day in (
+            ("Alef", 1, 5),
+            ("Bet", 2, 5),
+            ("Gimel", 1, 3),
+            ("Dalet", 3, 1),
+            ("Hei", 1, 5),
+        ):
+            HebrewDate.objects.create(
+                name=name,
+                month=month,
+                day=day,
+                event_type="🎂",
+                calendar=self.calendar,
+            )
+
+    def pages(self, **params):
+        """Every page of the table, following each page's next-page link."""
+        response = self.client.get(self.url, params)
+        pages = [[hebrew_date.name for hebrew_date in response.context["hebrew_dates"]]]
+        while next_page_url := response.context["next_page_url"]:
+            response = self.client.get(next_page_url, headers={"hx-request": "true"})
+            assert response.templates[0].name == "hebcal/_hebrew_date_rows.html"
+            pages.append(
+                [hebrew_date.name for hebrew_date in response.context["hebrew_dates"]],
+            )
+        return pages
+
+    def test_day_order(self):
+        assert self.pages() == [["Dalet", "Gimel"], ["Alef", "Bet"], ["Hei"]]
+        assert self.pages(order="desc") == [
+            ["Hei", "Bet"],
+            ["Alef", "Gimel"],
+            ["Dalet"],
+        ]
+
+    def test_month_order(self):
+        assert self.pages(sort="month") == [
+            ["Gimel", "Alef"],
+            ["Hei", "Bet"],
+            ["Dalet"],
+        ]
+        assert self.pages(sort="month", order="desc") == [
+            ["Dalet", "Bet"],
+            ["Hei", "Alef"],
+            ["Gimel"],
+        ]
+
+    def test_filters_carry_over(self):
+        assert self.pages(month=["1", "2"], day="5") == [["Alef", "Bet"], ["Hei"]]
+
+    def test_search_results_are_ranked(self):
+        for name in ("Dalet Gimel", "Daled"):
+            HebrewDate.objects.create(
+                name=name,
+                month=4,
+                day=1,
+                event_type="🎂",
+                calendar=self.calendar,
+            )
+        # Names containing the query first, then the near misses; the sort
+        # doesn't apply.
+        expected = [["Dalet", "Dalet Gimel"], ["Daled"]]
+        assert self.pages(search="DALET") == expected
+        assert self.pages(search="dalet", sort="month", order="desc") == expected
+
+    def test_last_row_loads_the_next_page(self):
+        response = self.client.get(self.url)
+        self.assertContains(response, 'hx-trigger="revealed"')
+        response = self.client.get(self.url, {"month": "2"})
+        self.assertNotContains(response, 'hx-trigger="revealed"')
+
+    def test_invalid_cursor_starts_over(self):
+        response = self.client.get(self.url, {"after": "x.1"})
+        assert len(response.context["hebrew_dates"]) == 2  # noqa: PLR2004
+        response = self.client.get(self.url, {"sort": "name"})
+        assert response.status_code == HTTPStatus.OK
+
+
+class CalendarFileViewTest(BaseTest):
+    def setUp(self):
+        super().setUp()
+        self.calendar = Calendar.objects.create(name="Test Calendar", owner=self.user)
+        HebrewDate.objects.create(
+            name="Test Hebrew Date",
+            month=1,
+            day=1,
+            event_type="🎂",
+            calendar=self.calendar,
+        )
+        self.url = reverse("hebcal:calendar_file", args=[self.calendar.uuid])
+
+    def test_default_horizon_is_three_years(self):
+        response = self.client.get(self.url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.content.count(b"BEGIN:VEVENT") == 3  # noqa: PLR2004
+
+    def test_custom_horizon(self):
+        response = self.client.get(self.url, {"past": "1", "future": "4"})
+        assert response.content.count(b"BEGIN:VEVENT") == 6  # noqa: PLR2004
+
+    @override_settings(HEBCAL_FEED_MAX_PAST_YEARS=5)
+    def test_horizon_is_bounded(self):
+        response = self.client.get(self.url, {"past": "1000", "future": "-5"})
+        assert response.content.count(b"BEGIN:VEVENT") == 6  # noqa: PLR2004
+
+    def test_invalid_horizon_uses_default(self):
+        response = self.client.get(self.url, {"future": "lots"})
+        assert response.content.count(b"BEGIN:VEVENT") == 3  # noqa: PLR2004
+
+    def test_date_window(self):
+        first, second, _ = conversion_table.get_english_dates(1, 1)
+        response = self.client.get(
+            self.url,
+            {"start": first.isoformat(), "end": second.isoformat()},
+        )
+        assert response.content.count(b"BEGIN:VEVENT") == 2  # noqa: PLR2004
+        response = self.client.get(self.url, {"start": second.isoformat()})
+        assert response.content.count(b"BEGIN:VEVENT") == 2  # noqa: PLR2004
+        assert first.strftime("DTSTART;VALUE=DATE:%Y%m%d").encode() not in (
+            response.content
+        )
+
+    def test_days_shorthand(self):
+        first, second, _ = conversion_table.get_english_dates(1, 1)
+        response = self.client.get(
+            self.url,
+            {"start": first.isoformat(), "days": "1"},
+        )
+        assert response.content.count(b"BEGIN:VEVENT") == 1
+        response = self.client.get(
+            self.url,
+            {"start": first.isoformat(), "days": str((second - first).days)},
+        )
+        assert response.content.count(b"BEGIN:VEVENT") == 1
+
+    def test_window_reaches_past_years(self):
+        previous = conversion_table.get_english_dates(1, 1, Horizon(past=1, future=0))
+        response = self.client.get(
+            self.url,
+            {"start": previous[0].isoformat(), "days": "1"},
+        )
+        assert response.content.count(b"BEGIN:VEVENT") == 1
+
+    def test_windows_are_cached_separately(self):
+        first, *_ = conversion_table.get_english_dates(1, 1)
+        full = self.client.get(self.url)
+        window = self.client.get(self.url, {"start": first.isoformat(), "days": "1"})
+        assert window["X-Feed-Cache"] == "miss"
+        assert window["ETag"] != full["ETag"]
+        assert self.client.get(self.url)["X-Feed-Cache"] == "hit"
+
+    def test_invalid_window_is_ignored(self):
+        response = self.client.get(self.url, {"start": "soon"})
+        assert response.content.count(b"BEGIN:VEVENT") == 3  # noqa: PLR2004
+        first, *_ = conversion_table.get_english_dates(1, 1)
+        response = self.client.get(
+            self.url,
+            {"start": first.isoformat(), "days": "many"},
+        )
+        assert response.content.count(b"BEGIN:VEVENT") == 3  # noqa: PLR2004
+
+    @override_settings(HEBCAL_FEED_STREAMING_MIN_EVENTS=1)
+    def test_large_calendars_are_streamed(self):
+        response = self.client.get(self.url, {"alarm": "7"})
+        assert response.streaming
+        assert response["Content-Type"] == "text/calendar"
+        body = response.getvalue()
+        assert body.startswith(b"BEGIN:VCALENDAR\r\n")
+        assert body.endswith(b"END:VCALENDAR\r\n")
+        assert body.count(b"BEGIN:VEVENT") == 3  # noqa: PLR2004
+
+    @override_settings(HEBCAL_FEED_STREAMING_MIN_EVENTS=1)
+    def test_streamed_feed_is_cached_once_sent(self):
+        streamed = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip")
+        assert streamed["X-Feed-Cache"] == "miss"
+        body = streamed.getvalue()
+        cached = self.client.get(self.url, HTTP_ACCEPT_ENCODING="br, gzip")
+        assert cached["X-Feed-Cache"] == "hit"
+        assert cached["Content-Encoding"] == "gzip"
+        assert cached.content == body
+
+    @override_settings(HEBCAL_FEED_STREAMING_MIN_EVENTS=1)
+    def test_abandoned_stream_isnt_cached(self):
+        streamed = self.client.get(self.url)
+        next(iter(streamed))
+        assert self.client.get(self.url)["X-Feed-Cache"] == "miss"
+
+    @override_settings(HEBCAL_FEED_STREAMING_MIN_EVENTS=0)
+    def test_streaming_can_be_disabled(self):
+        response = self.client.get(self.url)
+        assert not response.streaming
+
+
+class MaterializedCalendarFileTest(BaseTest):
+    def setUp(self):
+        super().setUp()
+        self.calendar = Calendar.objects.create(name="Test Calendar", owner=self.user)
+        self.url = reverse("hebcal:calendar_file", args=[self.calendar.uuid])
+        Calendar.objects.filter(pk=self.calendar.pk).update(
+            calendar_file_str="BEGIN:VCALENDAR\r\nEND:VCALENDAR\r\n",
+            calendar_file_generated=timezone.now(),
+        )
+
+    def test_serves_stored_feed(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        assert not any('FROM "hebcal_hebrewdate"' in query["sql"] for query in queries)
+        assert response.content == b"BEGIN:VCALENDAR\r\nEND:VCALENDAR\r\n"
+        assert response["Content-Type"] == "text/calendar"
+
+    def test_custom_feeds_are_generated(self):
+        response = self.client.get(self.url, {"alarm": "7"})
+        assert b"X-WR-CALNAME:Test Calendar" in response.content
+
+    def test_stale_feed_is_regenerated(self):
+        last_year = timezone.now() - timedelta(days=400)
+        Calendar.objects.filter(pk=self.calendar.pk).update(
+            calendar_file_generated=last_year,
+        )
+        response = self.client.get(self.url)
+        assert b"X-WR-CALNAME:Test Calendar" in response.content
+        self.calendar.refresh_from_db()
+        assert self.calendar.calendar_file_generated is not None
+        assert self.calendar.calendar_file_generated > last_year
+        assert self.calendar.calendar_file_str is not None
+        assert "X-WR-CALNAME:Test Calendar" in self.calendar.calendar_file_str
+
+
+class CompressedCalendarFileTest(BaseTest):
+    def setUp(self):
+        super().setUp()
+        self.calendar = Calendar.objects.create(name="Test Calendar", owner=self.user)
+        HebrewDate.objects.create(
+            name="Test Hebrew Date",
+            month=1,
+            day=1,
+            event_type="🎂",
+            calendar=self.calendar,
+        )
+        self.url = reverse("hebcal:calendar_file", args=[self.calendar.uuid])
+
+    def test_generated_feed_is_compressed(self):
+        response = self.client.get(
+            self.url,
+            {"alarm": "7"},
+            HTTP_ACCEPT_ENCODING="gzip",
+        )
+        assert response["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in response["Vary"]
+        assert gzip.decompress(response.content).count(b"BEGIN:VEVENT") == 3  # noqa: PLR2004
+
+    def test_identity_when_nothing_is_accepted(self):
+        response = self.client.get(self.url, {"alarm": "7"})
+        assert not response.has_header("Content-Encoding")
+        assert response.content.startswith(b"BEGIN:VCALENDAR")
+
+    def test_serves_stored_variant(self):
+        materialize_feed(self.calendar.pk)
+        identity = self.client.get(self.url).content
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING="br, gzip")
+        assert response["Content-Encoding"] == "br"
+        assert brotli.decompress(response.content) == identity
+        self.calendar.refresh_from_db()
+        assert self.calendar.get_materialized_feed("br") == response.content
+
+    @override_settings(HEBCAL_FEED_STREAMING_MIN_EVENTS=1)
+    def test_streamed_feed_is_gzipped(self):
+        response = self.client.get(
+            self.url,
+            {"alarm": "7"},
+            HTTP_ACCEPT_ENCODING="br, gzip",
+        )
+        assert response.streaming
+        assert response["Content-Encoding"] == "gzip"
+        body = gzip.decompress(response.getvalue())
+        assert body.count(b"BEGIN:VEVENT") == 3  # noqa: PLR2004
+
+
+class ConditionalCalendarFileTest(BaseTest):
+    def setUp(self):
+        super().setUp()
+        self.calendar = Calendar.objects.create(name="Test Calendar", owner=self.user)
+        self.hebrew_date = HebrewDate.objects.create(
+            name="Test Hebrew Date",
+            month=1,
+            day=1,
+            event_type="🎂",
+            calendar=self.calendar,
+        )
+        self.url = reverse("hebcal:calendar_file", args=[self.calendar.uuid])
+
+    def test_validators_and_stable_dtstamp(self):
+        response = self.client.get(self.url)
+        assert response["ETag"].startswith('W/"')
+        last_modified = parse_http_date(response["Last-Modified"])
+        dtstamp = datetime.fromtimestamp(last_modified, tz=UTC).strftime(
+            "DTSTAMP:%Y%m%dT%H%M%SZ",
+        )
+        assert response.content.count(dtstamp.encode()) == 3  # noqa: PLR2004
+
+    def test_not_modified_without_loading_events(self):
+        etag = self.client.get(self.url)["ETag"]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        assert not response.content
+        statements = [
+            query["sql"] for query in queries if "SAVEPOINT" not in query["sql"]
+        ]
+        assert len(statements) == 1
+        # The calendar row alone: no join with its events.
+        assert '"hebcal_hebrewdate"' not in statements[0]
+
+    def test_edits_are_not_served_from_cache(self):
+        assert b"Test Hebrew Date" in self.client.get(self.url).content
+        with self.captureOnCommitCallbacks(execute=True):
+            self.hebrew_date.name = "Renamed"
+            self.hebrew_date.save()
+        content = self.client.get(self.url).content
+        assert b"Renamed" in content
+        assert b"Test Hebrew Date" not in content
+
+    def test_feed_cache_hits_until_invalidated(self):
+        assert self.client.get(self.url, {"alarm": "3"})["X-Feed-Cache"] == "miss"
+        assert self.client.get(self.url, {"alarm": "3"})["X-Feed-Cache"] == "hit"
+        assert self.client.get(self.url, {"alarm": "4"})["X-Feed-Cache"] == "miss"
+
+        with self.captureOnCommitCallbacks(execute=True):
+            HebrewDate.objects.create(
+                name="New Hebrew Date",
+                month=2,
+                day=2,
+                event_type="🎂",
+                calendar=self.calendar,
+            )
+        response = self.client.get(self.url, {"alarm": "3"})
+        assert response["X-Feed-Cache"] == "miss"
+        assert b"New Hebrew Date" in response.content
+
+    def test_feed_cache_misses_new_versions_without_invalidation(self):
+        assert self.client.get(self.url, {"alarm": "3"})["X-Feed-Cache"] == "miss"
+        # The generation bump is lost, e.g. to a cache outage.
+        with (
+            mock.patch.object(feed_cache, "invalidate"),
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            HebrewDate.objects.create(
+                name="New Hebrew Date",
+                month=2,
+                day=2,
+                event_type="🎂",
+                calendar=self.calendar,
+            )
+        response = self.client.get(self.url, {"alarm": "3"})
+        assert response["X-Feed-Cache"] == "miss"
+        assert b"New Hebrew Date" in response.content
+
+    def test_unknown_calendar(self):
+        url = reverse("hebcal:calendar_file", args=[uuid4()])
+        assert self.client.get(url).status_code == HTTPStatus.NOT_FOUND
+
+    def test_if_modified_since(self):
+        last_modified = self.client.get(self.url)["Last-Modified"]
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+    def test_etag_follows_options_and_writes(self):
+        etag = self.client.get(self.url)["ETag"]
+        assert self.client.get(self.url, {"alarm": "7"})["ETag"] != etag
+        assert (
+            self.client.get(self.url, HTTP_USER_AGENT="Google-Calendar-Importer")[
+                "ETag"
+            ]
+            != etag
+        )
+
+        self.hebrew_date.delete()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
+        assert response["ETag"] != etag
+
+    def test_last_modified_rolls_with_the_hebrew_year(self):
+        with mock.patch.object(
+            ConversionTable,
+            "today",
+            return_value=date.today() + timedelta(days=400),  # noqa: DTZ011
+        ):
+            next_year = self.client.get(self.url, {"alarm": "1"})
+        this_year = self.client.get(self.url, {"alarm": "2"})
+        assert parse_http_date(next_year["Last-Modified"]) > parse_http_date(
+            this_year["Last-Modified"],
+        )
+
+    def test_last_modified_moves_with_an_implicit_window_start(self):
+        today = self.client.get(self.url, {"days": "30"})
+        with mock.patch.object(
+            ConversionTable,
+            "today",
+            return_value=date.today() + timedelta(days=1),  # noqa: DTZ011
+        ):
+            tomorrow = self.client.get(
+                self.url,
+                {"days": "30"},
+                HTTP_IF_MODIFIED_SINCE=today["Last-Modified"],
+            )
+        assert tomorrow.status_code == HTTPStatus.OK
+        assert parse_http_date(tomorrow["Last-Modified"]) > parse_http_date(
+            today["Last-Modified"],
+        )
+
+
+class CalendarSyncViewTest(BaseTest):
+    def setUp(self):
+        super().setUp()
+        self.calendar = Calendar.objects.create(name="Test Calendar", owner=self.user)
+        self.hebrew_date = HebrewDate.objects.create(
+            name="Test Hebrew Date",
+            month=1,
+            day=1,
+            event_type="🎂",
+            calendar=self.calendar,
+        )
+        self.url = reverse("hebcal:calendar_sync", args=[self.calendar.uuid])
+        self.uid = self.hebrew_date.uid_hash + "@myhebrewdates.com"
+
+    def test_full_sync_matches_the_feed(self):
+        response = self.client.get(self.url)
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert list(data["updated"]) == [self.uid]
+        assert data["deleted"] == []
+        feed = self.client.get(
+            reverse("hebcal:calendar_file", args=[self.calendar.uuid]),
+        ).content.decode()
+        assert data["updated"][self.uid] in feed
+
+    def test_full_sync_reads_rows_without_model_instances(self):
+        with mock.patch.object(HebrewDate, "from_db", side_effect=AssertionError):
+            response = self.client.get(self.url)
+        assert list(response.json()["updated"]) == [self.uid]
+
+    def test_incremental_sync(self):
+        token = self.client.get(self.url).json()["sync_token"]
+        data = self.client.get(self.url, {"token": token}).json()
+        assert data == {"sync_token": token, "updated": {}, "deleted": []}
+
+        other = HebrewDate.objects.create(
+            name="Other Hebrew Date",
+            month=2,
+            day=2,
+            event_type="💍",
+            calendar=self.calendar,
+        )
+        self.hebrew_date.delete()
+        data = self.client.get(self.url, {"token": token}).json()
+        assert list(data["updated"]) == [other.uid_hash + "@myhebrewdates.com"]
+        assert data["deleted"] == [self.uid]
+        assert data["sync_token"] != token
+
+    def test_invalid_token(self):
+        response = self.client.get(self.url, {"token": "nonsense"})
+        assert response.status_code == HTTPStatus.GONE
+        expired = f"1-{int((timezone.now() - timedelta(days=60)).timestamp())}"
+        response = self.client.get(self.url, {"token": expired})
+        assert response.status_code == HTTPStatus.GONE
+
+    def test_deleted_calendar(self):
+        self.calendar.delete()
+        assert self.client.get(self.url).status_code == HTTPStatus.GONE
+        url = reverse("hebcal:calendar_sync", args=[uuid4()])
+        assert self.client.get(url).status_code == HTTPStatus.NOT_FOUND
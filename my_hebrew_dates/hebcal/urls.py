@@ -1,12 +1,14 @@
 from django.contrib.auth.decorators import login_not_required
 from django.urls import path
 
+from my_hebrew_dates.hebcal.views import CalendarDavView
 from my_hebrew_dates.hebcal.views import CalendarDeleteView
 from my_hebrew_dates.hebcal.views import CalendarUpdateModalView
 from my_hebrew_dates.hebcal.views import calendar_detail_view
 from my_hebrew_dates.hebcal.views import calendar_edit_view
 from my_hebrew_dates.hebcal.views import calendar_file
 from my_hebrew_dates.hebcal.views import calendar_list_view
+from my_hebrew_dates.hebcal.views import calendar_sync
 from my_hebrew_dates.hebcal.views import create_calendar_view
 from my_hebrew_dates.hebcal.views import create_hebrew_date_htmx
 from my_hebrew_dates.hebcal.views import delete_hebrew_date_htmx
@@ -52,6 +54,21 @@ urlpatterns = [
         name="legacy_calendar_file",
     ),
     path("<uuid:uuid>.ics", login_not_required(calendar_file), name="calendar_file"),
+    path(
+        "<uuid:uuid>/dav/",
+        login_not_required(CalendarDavView.as_view()),
+        name="calendar_dav",
+    ),
+    path(
+        "<uuid:uuid>/dav/<int:pk>.ics",
+        login_not_required(CalendarDavView.as_view()),
+        name="calendar_dav_event",
+    ),
+    path(
+        "<uuid:uuid>/sync/",
+        login_not_required(calendar_sync),
+        name="calendar_sync",
+    ),
     path(
         "serve-image/<uuid:pixel_id>/<int:pk>",
         login_not_required(serve_pixel),
@@ -1,215 +1,546 @@
-# ruff: noqa: S324, ERA001
-from base64 import urlsafe_b64encode
+from collections.abc import Iterable
+from collections.abc import Iterator
+from collections.abc import Sequence
+from datetime import date
 from datetime import datetime
 from datetime import timedelta
-from hashlib import sha1
+from typing import NamedTuple
 from zoneinfo import ZoneInfo
 
-from icalendar import Alarm
-from icalendar import Calendar
-from icalendar import Event
-
+from django.db import transaction
+from django.utils import timezone
+
+from my_hebrew_dates.hebcal.clients import UNKNOWN
+from my_hebrew_dates.hebcal.clients import CalendarClient
+from my_hebrew_dates.hebcal.clients import FeedVariant
+from my_hebrew_dates.hebcal.compression import BROTLI
+from my_hebrew_dates.hebcal.compression import GZIP
+from my_hebrew_dates.hebcal.compression import compress_variants
+from my_hebrew_dates.hebcal.fragments import fragment_cache
+from my_hebrew_dates.hebcal.fragments import fragment_key
+from my_hebrew_dates.hebcal.hebrew_calendar import ADAR
+from my_hebrew_dates.hebcal.hebrew_date import DEFAULT_HORIZON
+from my_hebrew_dates.hebcal.hebrew_date import MAX_DAY
+from my_hebrew_dates.hebcal.hebrew_date import DateWindow
+from my_hebrew_dates.hebcal.hebrew_date import Horizon
+from my_hebrew_dates.hebcal.hebrew_date import MissingDay
+from my_hebrew_dates.hebcal.ical import CRLF
+from my_hebrew_dates.hebcal.ical import content_line
+from my_hebrew_dates.hebcal.ical import escape_text
+from my_hebrew_dates.hebcal.ical import format_date
+from my_hebrew_dates.hebcal.ical import format_duration
+from my_hebrew_dates.hebcal.ical import format_utc
+from my_hebrew_dates.hebcal.ical import text_line
 from my_hebrew_dates.hebcal.models import Calendar as ModelCalendar
+from my_hebrew_dates.hebcal.models import FeedRow
+from my_hebrew_dates.hebcal.models import HebrewDate
 
 # Constants
 MYHEBREWDATES_URL = "https://myhebrewdates.com"
 CHARJ_URL = "https://charj.cc"
 MYHEBREWDATES_DOMAIN = "@myhebrewdates.com"
+# VEVENTs serialized per chunk when streaming a feed.
+STREAM_CHUNK_EVENTS = 100
+ONE_DAY = timedelta(days=1)
+DEFAULT_ALARM_TRIGGER = timedelta(hours=9)
+# Months with 30 days in every year: Nisan, Sivan, Av, Tishrei and Shevat.
+FULL_MONTHS = frozenset((1, 3, 5, 7, 11))
+# RFC 7529 SKIP values matching each policy for a day a month doesn't have.
+RSCALE_SKIP = {MissingDay.PREVIOUS_DAY: "BACKWARD", MissingDay.NEXT_DAY: "FORWARD"}
+
+
+class FeedOptions(NamedTuple):
+    """How a calendar's events are rendered into a feed."""
+
+    alarm_trigger: timedelta = DEFAULT_ALARM_TRIGGER
+    horizon: Horizon = DEFAULT_HORIZON
+    client: CalendarClient = UNKNOWN
+    variant: FeedVariant = FeedVariant.EXPANDED
+    window: DateWindow | None = None
+
+    @property
+    def key(self) -> str:
+        """Everything in these options the feed's bytes depend on."""
+        return ":".join(
+            (
+                self.variant,
+                "utc" if self.client.utc_all_day_events else "local",
+                str(int(self.alarm_trigger.total_seconds())),
+                f"{self.horizon.past}-{self.horizon.future}",
+                f"{self.window.start}-{self.window.end}" if self.window else "all",
+            ),
+        )
 
+    @property
+    def is_canonical(self) -> bool:
+        """Whether these are the options of the feed stored on the calendar."""
+        return (
+            self.variant is FeedVariant.EXPANDED
+            and not self.client.utc_all_day_events
+            and self.alarm_trigger == DEFAULT_ALARM_TRIGGER
+            and self.horizon == DEFAULT_HORIZON
+            and self.window is None
+        )
 
-def generate_ical(
-    model_calendar: ModelCalendar,
-    user_agent: str = "",
-    alarm_trigger: timedelta = timedelta(hours=9),
-) -> str:
-    # Google Calendar works better with UTC for all-day events
-    is_google = "google" in user_agent.lower()
-    timezone = "UTC" if is_google else model_calendar.timezone
-
-    newcal = Calendar()
-    newcal.add("prodid", "-//MyHebrewDates.com//Hebrew Calendar Events//EN")
-    newcal.add("version", "2.0")
-    newcal.add("calscale", "GREGORIAN")  # Required for Google Calendar
-    newcal.add("method", "PUBLISH")
-    newcal.add("x-wr-calname", model_calendar.name)
-    newcal.add("x-wr-timezone", timezone)
-    newcal.add("x-wr-caldesc", "Hebrew calendar events created by MyHebrewDates.com")
-
-    # Note: VTIMEZONE component not needed for all-day events
-    # All-day events (VALUE=DATE) don't require timezone conversion
 
-    events = []
-    now_utc = datetime.now(tz=ZoneInfo("UTC"))
-
-    for hebrew_date in model_calendar.calendarOf.all():
-        for eng_date in hebrew_date.get_english_dates():
-            event_hash = sha1(
-                (
-                    hebrew_date.event_type
-                    + hebrew_date.name
-                    + hebrew_date.get_hebrew_date()
-                ).encode("utf-8"),
-            ).digest()
-            uid = (
-                eng_date.isoformat()
-                + urlsafe_b64encode(event_hash).decode("ascii")
-                + MYHEBREWDATES_DOMAIN
-            )
-            event = Event()
-            title = (
-                f"{hebrew_date.get_hebrew_date()} | "
-                f"{hebrew_date.event_type} {hebrew_date.name}"
-            )
-            event.add("summary", title)
-
-            base_description = (
-                f"{title}\n\n"
-                f"Keep your credit cards active. Prevent closures → {CHARJ_URL}"
-            )
-            event.add("description", base_description)
-
-            # Critical for Google Calendar: DTSTAMP, LAST-MODIFIED, and SEQUENCE
-            event.add("dtstamp", now_utc)
-            event.add("last-modified", hebrew_date.modified)
-            event.add("sequence", 0)
-
-            # Use VALUE=DATE to mark as all-day event (no time component)
-            event.add("dtstart", eng_date, parameters={"value": "DATE"})
-            # For all-day events, DTEND should be the next day (RFC 5545)
-            event.add(
-                "dtend",
-                eng_date + timedelta(days=1),
-                parameters={"value": "DATE"},
-            )
-            event.add("uid", uid)
-            event.add("transp", "TRANSPARENT")
-            event.add(
-                "categories",
-                ["Hebrew Date", str(hebrew_date.get_event_type_display())],
-            )
-
-            # Microsoft compatibility
-            event.add("x-microsoft-cdo-alldayevent", "TRUE")
-            event.add("x-microsoft-cdo-busystatus", "FREE")
-
-            # Add alarm to the event
-            alarm = Alarm()
-            alarm.add("action", "DISPLAY")
-            alarm_desc = (
-                f"{hebrew_date.name}'s {hebrew_date.get_event_type_display()} is today!"
-            )
-            alarm.add("description", alarm_desc)
-
-            alarm.add("trigger", alarm_trigger)
-            event.add_component(alarm)
-
-            events.append(event)
-
-    sorted_events = sorted(events, key=lambda e: e["dtstart"].dt)
-
-    for event in sorted_events:
-        newcal.add_component(event)
-
-    ical_str = newcal.to_ical()
-    return ical_str.decode("utf8")
+CANONICAL_FEED = FeedOptions()
 
 
-def generate_ical_experimental(
-    model_calendar: ModelCalendar,
-    user_agent: str = "",
-    alarm_trigger: timedelta = timedelta(hours=9),
-) -> str:
+def _calendar_header(model_calendar: ModelCalendar, client: CalendarClient) -> str:
     # Google Calendar works better with UTC for all-day events
-    is_google = "google" in user_agent.lower()
-    timezone = "UTC" if is_google else model_calendar.timezone
-
-    newcal = Calendar()
-    newcal.add("prodid", "-//MyHebrewDates.com//Hebrew Calendar Events//EN")
-    newcal.add("version", "2.0")
-    newcal.add("calscale", "GREGORIAN")  # Required for Google Calendar
-    newcal.add("method", "PUBLISH")
-    newcal.add("x-wr-calname", model_calendar.name)
-    newcal.add("x-wr-timezone", timezone)
-    newcal.add("x-wr-caldesc", "Hebrew calendar events created by MyHebrewDates.com")
+    calendar_timezone = "UTC" if client.utc_all_day_events else model_calendar.timezone
 
+    # Properties in the order icalendar writes them: VERSION, PRODID,
+    # CALSCALE and METHOD first, the rest alphabetically.
     # Note: VTIMEZONE component not needed for all-day events
     # All-day events (VALUE=DATE) don't require timezone conversion
-
-    events = []
-    now_utc = datetime.now(tz=ZoneInfo("UTC"))
-
-    for hebrew_date in model_calendar.calendarOf.all():
-        event_hash = sha1(
+    return "".join(
+        (
+            "BEGIN:VCALENDAR" + CRLF,
+            text_line("VERSION", "2.0"),
+            text_line("PRODID", "-//MyHebrewDates.com//Hebrew Calendar Events//EN"),
+            text_line("CALSCALE", "GREGORIAN"),  # Required for Google Calendar
+            text_line("METHOD", "PUBLISH"),
+            text_line(
+                "X-WR-CALDESC",
+                "Hebrew calendar events created by MyHebrewDates.com",
+            ),
+            text_line("X-WR-CALNAME", model_calendar.name),
+            text_line("X-WR-TIMEZONE", calendar_timezone),
+        ),
+    )
+
+
+class EventProjection(NamedTuple):
+    """
+    A row's VEVENT properties that don't depend on the feed variant, the
+    occurrence date or the request, serialized once and shared by every
+    :class:`Emitter`.
+    """
+
+    summary: str
+    # The UID after its date, shared by all of the row's VEVENTs.
+    uid_suffix: str
+    # RRULE:RSCALE=hebrew, for variants that recur (RFC 7529); empty when
+    # no rule observes the row on the dates it has.
+    rrule: str
+    # CATEGORIES through TRANSP.
+    body: str
+    # The VALARM up to its TRIGGER.
+    alarm: str
+
+
+def rscale_rule(hebrew_date: HebrewDate | FeedRow) -> str:
+    """
+    The RFC 7529 RRULE value of ``hebrew_date``, or "" when no single rule
+    falls on the dates the row is observed on.
+
+    Without SKIP a rule leaves out the years its date is missing in, so days
+    that months don't always have take the SKIP of the row's missing-day
+    policy, and Adar I (5L) takes FORWARD to fall on Adar in common years.
+    30 Adar I would need both.
+    """
+    month = hebrew_date.month
+    day = hebrew_date.day
+    rule = (
+        "RSCALE=hebrew;FREQ=YEARLY;"
+        f"BYMONTHDAY={day};"
+        f"BYMONTH={hebrew_date.get_rfc7529_month()}"
+    )
+    if month == ADAR:
+        return "" if day == MAX_DAY else rule + ";SKIP=FORWARD"
+    if day == MAX_DAY and month not in FULL_MONTHS:
+        return rule + ";SKIP=" + RSCALE_SKIP[hebrew_date.missing_day_policy]
+    return rule
+
+
+def project_row(hebrew_date: HebrewDate | FeedRow) -> EventProjection:
+    title = (
+        f"{hebrew_date.get_hebrew_date()} | {hebrew_date.event_type} {hebrew_date.name}"
+    )
+    event_type = str(hebrew_date.get_event_type_display())
+    rule = rscale_rule(hebrew_date)
+    return EventProjection(
+        summary=text_line("SUMMARY", title),
+        uid_suffix=hebrew_date.uid_hash + MYHEBREWDATES_DOMAIN,
+        rrule=content_line("RRULE", rule) if rule else "",
+        body="".join(
             (
-                hebrew_date.event_type
-                + hebrew_date.name
-                + hebrew_date.get_hebrew_date()
-            ).encode("utf-8"),
-        ).digest()
-        eng_date = hebrew_date.get_english_dates()[0]
-        uid = (
-            eng_date.isoformat()
-            + urlsafe_b64encode(event_hash).decode("ascii")
-            + MYHEBREWDATES_DOMAIN
-        )
-        event = Event()
-        title = (
-            f"{hebrew_date.get_hebrew_date()} | "
-            f"{hebrew_date.event_type} {hebrew_date.name}"
+                content_line(
+                    "CATEGORIES",
+                    f"{escape_text('Hebrew Date')},{escape_text(event_type)}",
+                ),
+                text_line(
+                    "DESCRIPTION",
+                    f"{title}\n\n"
+                    f"Keep your credit cards active. Prevent closures → {CHARJ_URL}",
+                ),
+                content_line("LAST-MODIFIED", format_utc(hebrew_date.modified)),
+                "TRANSP:TRANSPARENT" + CRLF,
+            ),
+        ),
+        alarm="".join(
+            (
+                "BEGIN:VALARM" + CRLF,
+                "ACTION:DISPLAY" + CRLF,
+                text_line(
+                    "DESCRIPTION",
+                    f"{hebrew_date.name}'s {event_type} is today!",
+                ),
+            ),
+        ),
+    )
+
+
+def project_rows(
+    hebrew_dates: Sequence[HebrewDate | FeedRow],
+) -> list[EventProjection]:
+    """Each row's projection, from the fragment cache where possible."""
+    return fragment_cache.get_many(
+        [
+            fragment_key(hebrew_date.pk, hebrew_date.modified)
+            for hebrew_date in hebrew_dates
+        ],
+        lambda index: project_row(hebrew_dates[index]),
+    )
+
+
+# A projected row as one emitter writes it: everything before DTSTART, the
+# UID after its date, everything after UID, and whether its occurrences
+# after the first are listed as RDATEs.
+PreparedRow = tuple[str, str, str, bool]
+
+
+def _recurrence_dates(english_dates: list[date]) -> str:
+    if len(english_dates) < 2:  # noqa: PLR2004
+        return ""
+    return content_line(
+        "RDATE",
+        ",".join(format_date(eng_date) for eng_date in english_dates[1:]),
+        "VALUE=DATE",
+    )
+
+
+class Emitter:
+    """
+    Turns projected rows into the VEVENTs of one feed variant.
+
+    The base class emits the expanded form, one VEVENT per occurrence;
+    subclasses override :meth:`starts` and the hooks :meth:`prepare` and
+    :meth:`render` call. Everything that depends only on the request is
+    rendered in ``__init__``, and everything that depends only on the row in
+    :meth:`prepare`, once for all of its VEVENTs.
+    """
+
+    # Whether VEVENT UIDs start with their DTSTART date.
+    dated_uids = True
+
+    def __init__(self, alarm_trigger: timedelta = DEFAULT_ALARM_TRIGGER):
+        self.end = (
+            content_line("TRIGGER", format_duration(alarm_trigger))
+            + "END:VALARM"
+            + CRLF
+            + "END:VEVENT"
+            + CRLF
         )
-        event.add("summary", title)
-        base_description = (
-            f"{title}\n\n"
-            f"Keep your credit cards active. Prevent closures → {CHARJ_URL}"
+
+    def starts(self, english_dates: list[date]) -> list[date]:
+        """The dates the row's VEVENTs start on."""
+        return english_dates
+
+    def lists_dates(self, projection: EventProjection) -> bool:
+        """Whether the row's VEVENT lists its later occurrences as RDATEs."""
+        return False
+
+    def recurrence_rule(self, projection: EventProjection) -> str:
+        return ""
+
+    def client_properties(self) -> str:
+        # Microsoft compatibility
+        return (
+            "X-MICROSOFT-CDO-ALLDAYEVENT:TRUE"
+            + CRLF
+            + "X-MICROSOFT-CDO-BUSYSTATUS:FREE"
+            + CRLF
         )
-        event.add("description", base_description)
 
+    def prepare(self, projection: EventProjection) -> PreparedRow:
         # Critical for Google Calendar: DTSTAMP, LAST-MODIFIED, and SEQUENCE
-        event.add("dtstamp", now_utc)
-        event.add("last-modified", hebrew_date.modified)
-        event.add("sequence", 0)
-
-        # Use VALUE=DATE to mark as all-day event (no time component)
-        event.add("dtstart", eng_date, parameters={"value": "DATE"})
-        # For all-day events, DTEND should be the next day (RFC 5545)
-        event.add(
-            "dtend",
-            eng_date + timedelta(days=1),
-            parameters={"value": "DATE"},
+        return (
+            "BEGIN:VEVENT" + CRLF + projection.summary,
+            projection.uid_suffix,
+            "SEQUENCE:0"
+            + CRLF
+            + self.recurrence_rule(projection)
+            + projection.body
+            + self.client_properties()
+            + projection.alarm
+            + self.end,
+            self.lists_dates(projection),
         )
-        event.add("transp", "TRANSPARENT")
-        event.add("uid", uid)
-        event.add(
-            "categories",
-            ["Hebrew Date", str(hebrew_date.get_event_type_display())],
+
+    def render(
+        self,
+        prepared: PreparedRow,
+        start: date,
+        english_dates: list[date],
+        dtstamp_line: str,
+    ) -> str:
+        """The VEVENT starting on ``start`` of a row occurring on ``english_dates``."""
+        head, uid_suffix, tail, lists_dates = prepared
+        uid = start.isoformat() + uid_suffix if self.dated_uids else uid_suffix
+        # Use VALUE=DATE to mark as all-day event (no time component);
+        # for all-day events, DTEND should be the next day (RFC 5545)
+        return (
+            head
+            + content_line("DTSTART", format_date(start), "VALUE=DATE")
+            + content_line("DTEND", format_date(start + ONE_DAY), "VALUE=DATE")
+            + dtstamp_line
+            + (_recurrence_dates(english_dates) if lists_dates else "")
+            + text_line("UID", uid)
+            + tail
         )
 
-        # Add alarm to the event
-        alarm = Alarm()
-        alarm.add("action", "DISPLAY")
-        alarm_desc = (
-            f"{hebrew_date.name}'s {hebrew_date.get_event_type_display()} is today!"
+
+class RscaleEmitter(Emitter):
+    """
+    One VEVENT per row at its first occurrence, recurring by RSCALE RRULE, or
+    listing the rest as RDATEs for rows no RRULE observes correctly.
+    """
+
+    def starts(self, english_dates: list[date]) -> list[date]:
+        return english_dates[:1]
+
+    def lists_dates(self, projection: EventProjection) -> bool:
+        return not projection.rrule
+
+    def recurrence_rule(self, projection: EventProjection) -> str:
+        return projection.rrule
+
+    def client_properties(self) -> str:
+        return ""
+
+
+class RdateEmitter(Emitter):
+    """
+    One VEVENT per row at its first occurrence, listing the rest as RDATEs.
+
+    The event stands for all of the row's occurrences, so its UID has no date.
+    """
+
+    dated_uids = False
+
+    def starts(self, english_dates: list[date]) -> list[date]:
+        return english_dates[:1]
+
+    def lists_dates(self, projection: EventProjection) -> bool:
+        return True
+
+
+EMITTERS: dict[FeedVariant, type[Emitter]] = {
+    FeedVariant.EXPANDED: Emitter,
+    FeedVariant.COMPACT: RscaleEmitter,
+    FeedVariant.RDATE: RdateEmitter,
+}
+
+
+def _iter_calendar(
+    header: str,
+    events: Iterable[str],
+    chunk_size: int = STREAM_CHUNK_EVENTS,
+) -> Iterator[str]:
+    """Yield ``header``, then ``events`` ``chunk_size`` at a time, then the footer."""
+    yield header
+    chunk = []
+    for event in events:
+        chunk.append(event)
+        if len(chunk) >= chunk_size:
+            yield "".join(chunk)
+            chunk = []
+    if chunk:
+        yield "".join(chunk)
+    yield "END:VCALENDAR" + CRLF
+
+
+def _dtstamp_line(dtstamp: datetime | None) -> str:
+    return content_line(
+        "DTSTAMP",
+        format_utc(dtstamp or datetime.now(tz=ZoneInfo("UTC"))),
+    )
+
+
+def _iter_events(
+    rows: Sequence[tuple[FeedRow, list[date]]],
+    emitter: Emitter,
+    dtstamp_line: str,
+) -> Iterator[str]:
+    """
+    The VEVENTs of ``rows`` in date order.
+
+    Events are only ordered by ``(date, row, occurrence)`` tuples, and each
+    one is serialized as it is emitted.
+    """
+    prepared = [
+        emitter.prepare(projection)
+        for projection in project_rows([hebrew_date for hebrew_date, _ in rows])
+    ]
+    order = sorted(
+        (start, index, occurrence)
+        for index, (_, english_dates) in enumerate(rows)
+        for occurrence, start in enumerate(emitter.starts(english_dates))
+    )
+    return (
+        emitter.render(prepared[index], start, rows[index][1], dtstamp_line)
+        for start, index, _ in order
+    )
+
+
+def iter_ical(
+    model_calendar: ModelCalendar,
+    options: FeedOptions = CANONICAL_FEED,
+    dtstamp: datetime | None = None,
+) -> Iterator[str]:
+    """
+    Stream the calendar feed: the VCALENDAR header, then VEVENTs in date order.
+
+    The whole calendar is never held as one string. With a ``window``, only
+    occurrences inside it are emitted; in the one-VEVENT-per-row variants,
+    rows occurring inside it start at their first occurrence there and other
+    rows are left out.
+    """
+    header = _calendar_header(model_calendar, options.client)
+    rows = model_calendar.calendarOf.feed_rows(options.horizon, options.window)
+    events = _iter_events(
+        rows,
+        EMITTERS[options.variant](options.alarm_trigger),
+        _dtstamp_line(dtstamp),
+    )
+    return _iter_calendar(header, events)
+
+
+def iter_ical_experimental(
+    model_calendar: ModelCalendar,
+    options: FeedOptions = CANONICAL_FEED,
+    dtstamp: datetime | None = None,
+) -> Iterator[str]:
+    """:func:`iter_ical` with one RSCALE-recurring event per row."""
+    return iter_ical(
+        model_calendar,
+        options._replace(variant=FeedVariant.COMPACT),
+        dtstamp,
+    )
+
+
+def render_row_events(
+    rows: Sequence[tuple[FeedRow, list[date]]],
+    alarm_trigger: timedelta = DEFAULT_ALARM_TRIGGER,
+    dtstamp: datetime | None = None,
+    variant: FeedVariant = FeedVariant.EXPANDED,
+) -> dict[str, str]:
+    """
+    The VEVENTs of each ``(row, dates)`` pair as the feed has them, keyed by
+    their shared UID suffix.
+    """
+    dtstamp_line = _dtstamp_line(dtstamp)
+    emitter = EMITTERS[variant](alarm_trigger)
+    events = {}
+    for projection, (_, english_dates) in zip(
+        project_rows([hebrew_date for hebrew_date, _ in rows]),
+        rows,
+        strict=True,
+    ):
+        prepared = emitter.prepare(projection)
+        events[projection.uid_suffix] = "".join(
+            emitter.render(prepared, start, english_dates, dtstamp_line)
+            for start in emitter.starts(english_dates)
+        )
+    return events
+
+
+def render_event_resources(
+    rows: Sequence[tuple[FeedRow, list[date]]],
+    alarm_trigger: timedelta = DEFAULT_ALARM_TRIGGER,
+) -> list[str]:
+    """
+    One CalDAV resource per ``(row, dates)`` pair: a VCALENDAR holding the
+    row's :class:`RdateEmitter` VEVENT.
+
+    A resource holds exactly one UID, so unlike the expanded feed's UIDs
+    these carry no date. DTSTAMP is the row's ``modified``, keeping each
+    resource a function of its row alone (see ``caldav.resource_etag``).
+    """
+    emitter = RdateEmitter(alarm_trigger)
+    projections = project_rows([hebrew_date for hebrew_date, _ in rows])
+    header = (
+        "BEGIN:VCALENDAR"
+        + CRLF
+        + text_line("VERSION", "2.0")
+        + text_line("PRODID", "-//MyHebrewDates.com//Hebrew Calendar Events//EN")
+        + text_line("CALSCALE", "GREGORIAN")
+    )
+    return [
+        header
+        + emitter.render(
+            emitter.prepare(projection),
+            english_dates[0],
+            english_dates,
+            _dtstamp_line(hebrew_date.modified),
         )
-        alarm.add("description", alarm_desc)
-
-        alarm.add("trigger", alarm_trigger)
-        event.add_component(alarm)
-        event.add(
-            "rrule",
-            {
-                "rscale": "hebrew",
-                "freq": "yearly",
-                "bymonth": hebrew_date.get_rfc7529_month(),
-                "bymonthday": hebrew_date.day,
-            },
+        + "END:VCALENDAR"
+        + CRLF
+        for projection, (hebrew_date, english_dates) in zip(
+            projections,
+            rows,
+            strict=True,
         )
+    ]
 
-        events.append(event)
 
-    sorted_events = sorted(events, key=lambda e: e["dtstart"].dt)
+def generate_ical(
+    model_calendar: ModelCalendar,
+    options: FeedOptions = CANONICAL_FEED,
+    dtstamp: datetime | None = None,
+) -> str:
+    return "".join(iter_ical(model_calendar, options, dtstamp))
 
-    for event in sorted_events:
-        newcal.add_component(event)
 
-    ical_str = newcal.to_ical()
-    return ical_str.decode("utf8")
+def generate_ical_experimental(
+    model_calendar: ModelCalendar,
+    options: FeedOptions = CANONICAL_FEED,
+    dtstamp: datetime | None = None,
+) -> str:
+    return "".join(iter_ical_experimental(model_calendar, options, dtstamp))
+
+
+def materialize_feed(calendar_id: int, *, force: bool = False) -> bool:
+    """
+    Regenerate and store the canonical feed of a calendar, plain and compressed.
+
+    The calendar row stays locked until the feed is stored, so a concurrent
+    write either lands before the events are read or invalidates the stored
+    copy after it is written. Returns ``False`` when the calendar is gone or
+    its feed is already fresh (unless ``force``).
+    """
+    with transaction.atomic():
+        calendar = (
+            ModelCalendar.objects.select_for_update()
+            .defer(*ModelCalendar.MATERIALIZED_FEED_FIELDS.values())
+            .filter(pk=calendar_id)
+            .first()
+        )
+        if calendar is None or (not force and calendar.has_fresh_feed()):
+            return False
+        generated = timezone.now()
+        calendar_str = generate_ical(
+            calendar,
+            dtstamp=calendar.get_feed_last_modified(),
+        )
+        variants = compress_variants(calendar_str.encode())
+        # update() rather than save(): saving a calendar invalidates its feed.
+        ModelCalendar.objects.filter(pk=calendar_id).update(
+            calendar_file_str=calendar_str,
+            calendar_file_gzip=variants.get(GZIP),
+            calendar_file_br=variants.get(BROTLI),
+            calendar_file_generated=generated,
+        )
+    return True
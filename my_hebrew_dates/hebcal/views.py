@@ -1,36 +1,86 @@
 import base64
 import logging
+from collections.abc import Iterable
+from datetime import UTC
+from datetime import date
+from datetime import datetime
 from datetime import timedelta
+from hashlib import sha1
+from http import HTTPStatus
+from typing import NamedTuple
+from urllib.parse import urlsplit
 from uuid import UUID
 
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.messages.views import SuccessMessageMixin
 from django.contrib.sites.models import Site
+from django.db.models import Q
+from django.http import Http404
 from django.http import HttpRequest
+from django.http import HttpResponseBadRequest
+from django.http import JsonResponse
 from django.http.response import HttpResponse
+from django.http.response import HttpResponseBase
+from django.http.response import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.shortcuts import redirect
 from django.shortcuts import render
+from django.urls import reverse
 from django.urls import reverse_lazy
-from django.views.decorators.cache import cache_page
+from django.utils.cache import get_conditional_response
+from django.utils.cache import patch_response_headers
+from django.utils.decorators import method_decorator
+from django.utils.http import http_date
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
+from django.views.decorators.vary import vary_on_headers
 from django.views.generic.edit import DeleteView
 from django_htmx_modal_forms import HtmxModalUpdateView
 
+from my_hebrew_dates.hebcal import caldav
+from my_hebrew_dates.hebcal import sync
+from my_hebrew_dates.hebcal.clients import FeedVariant
+from my_hebrew_dates.hebcal.clients import detect_client
+from my_hebrew_dates.hebcal.compression import GZIP
+from my_hebrew_dates.hebcal.compression import IDENTITY
+from my_hebrew_dates.hebcal.compression import compress
+from my_hebrew_dates.hebcal.compression import compress_stream
+from my_hebrew_dates.hebcal.compression import negotiate_encoding
 from my_hebrew_dates.hebcal.decorators import requires_htmx
+from my_hebrew_dates.hebcal.feed_cache import feed_cache
 from my_hebrew_dates.hebcal.forms import CalendarForm
 from my_hebrew_dates.hebcal.forms import HebrewDateForm
+from my_hebrew_dates.hebcal.hebrew_calendar import new_year
+from my_hebrew_dates.hebcal.hebrew_date import DEFAULT_HORIZON
+from my_hebrew_dates.hebcal.hebrew_date import ConversionTable
+from my_hebrew_dates.hebcal.hebrew_date import DateWindow
+from my_hebrew_dates.hebcal.hebrew_date import Horizon
 from my_hebrew_dates.hebcal.models import Calendar
+from my_hebrew_dates.hebcal.models import FeedRow
 from my_hebrew_dates.hebcal.models import HebrewDate
+from my_hebrew_dates.hebcal.models import HebrewDateChange
+from my_hebrew_dates.hebcal.models import HebrewDateQuerySet
 from my_hebrew_dates.hebcal.models import HebrewDayEnum
 from my_hebrew_dates.hebcal.models import HebrewMonthEnum
+from my_hebrew_dates.hebcal.search import search
+from my_hebrew_dates.hebcal.tasks import refresh_calendar_feed
+from my_hebrew_dates.hebcal.utils import DEFAULT_ALARM_TRIGGER
+from my_hebrew_dates.hebcal.utils import MYHEBREWDATES_DOMAIN
+from my_hebrew_dates.hebcal.utils import FeedOptions
 from my_hebrew_dates.hebcal.utils import generate_ical
-from my_hebrew_dates.hebcal.utils import generate_ical_experimental
+from my_hebrew_dates.hebcal.utils import iter_ical
+from my_hebrew_dates.hebcal.utils import render_event_resources
+from my_hebrew_dates.hebcal.utils import render_row_events
 
 # Setup logger
 logger = logging.getLogger(__name__)
 
+# Seconds clients may use a feed before revalidating it.
+FEED_MAX_AGE = 60 * 60
+
 
 def calendar_list_view(request):
     user_owned_calendars = Calendar.objects.filter(owner=request.user)
@@ -119,7 +169,94 @@ class CalendarUpdateModalView(SuccessMessageMixin, HtmxModalUpdateView):  # type
     success_message = "Calendar updated successfully"
 
 
+# The edit table's sort orders, each a keyset ending in the primary key and
+# matching a (calendar, ...) index on HebrewDate.
+EDIT_SORTS = {
+    "day": ("day", "pk"),
+    "month": ("month", "day", "pk"),
+}
+# Search results, best match first, whatever the sort.
+SEARCH_KEYS = ("-search_rank", "pk")
+
+
+def keyset_ordering(keys: tuple[str, ...], *, descending: bool) -> list[str]:
+    """``order_by()`` arguments for ``keys``, a "-" prefix reversing a key."""
+    if not descending:
+        return list(keys)
+    return [key[1:] if key.startswith("-") else f"-{key}" for key in keys]
+
+
+def parse_cursor(value: str, keys: tuple[str, ...]) -> tuple[int, ...] | None:
+    """The sort key values in an ``?after=`` cursor, or ``None`` if invalid."""
+    try:
+        values = tuple(int(part) for part in value.split("."))
+    except ValueError:
+        return None
+    return values if len(values) == len(keys) else None
+
+
+def keyset_filter(
+    keys: tuple[str, ...],
+    values: tuple[int, ...],
+    *,
+    descending: bool,
+) -> Q:
+    """Rows after the row with sort key ``values``, in the ``keys`` order."""
+    ordering = keyset_ordering(keys, descending=descending)
+    fields = [key.removeprefix("-") for key in ordering]
+    ops = ["lt" if key.startswith("-") else "gt" for key in ordering]
+    after = Q()
+    for index, field in enumerate(fields):
+        after |= Q(
+            **dict(zip(fields[:index], values[:index], strict=True)),
+            **{f"{field}__{ops[index]}": values[index]},
+        )
+    # Redundant, but it lets the index scan start at the cursor.
+    return Q(**{f"{fields[0]}__{ops[0]}e": values[0]}) & after
+
+
+def edit_page(
+    request: HttpRequest,
+    hebrew_dates: HebrewDateQuerySet,
+    keys: tuple[str, ...],
+    *,
+    descending: bool,
+) -> tuple[list[HebrewDate], str | None]:
+    """
+    The page of ``hebrew_dates`` after the request's ``?after=`` cursor, and
+    the URL of the next page if there is one.
+    """
+    after = request.GET.get("after", "")
+    if after:
+        cursor = parse_cursor(after, keys)
+        if cursor is None:
+            logger.warning("Invalid calendar_edit_view cursor: %s", after)
+        else:
+            hebrew_dates = hebrew_dates.filter(
+                keyset_filter(keys, cursor, descending=descending),
+            )
+
+    page_size = settings.HEBCAL_EDIT_PAGE_SIZE
+    # One row more than the page, to tell whether there is another.
+    page = list(hebrew_dates[: page_size + 1])
+    if len(page) <= page_size:
+        return page, None
+    page = page[:page_size]
+    query = request.GET.copy()
+    query["after"] = ".".join(
+        str(getattr(page[-1], key.removeprefix("-"))) for key in keys
+    )
+    return page, f"{request.path}?{query.urlencode()}"
+
+
 def calendar_edit_view(request: HttpRequest, uuid: UUID):
+    """
+    The calendar's events, filtered and sorted, a page at a time.
+
+    The table shows the first ``HEBCAL_EDIT_PAGE_SIZE`` events; the last row
+    loads the next page (``?after=<cursor>``) when it scrolls into view.
+    Pages are fetched by keyset, so each costs the same however deep it is.
+    """
     calendar = get_object_or_404(Calendar, owner=request.user, uuid=uuid)
     month_values = request.GET.getlist("month")
     day_values = request.GET.getlist("day")
@@ -131,15 +268,17 @@ def calendar_edit_view(request: HttpRequest, uuid: UUID):
     event_choices = HebrewDate.EVENT_CHOICES
 
     sort_by = request.GET.get("sort", "day")
+    if sort_by not in EDIT_SORTS:
+        sort_by = "day"
     order = request.GET.get("order", "asc")
+    descending = order == "desc"
 
     # Determine if current sort is descending
-    day_desc = sort_by == "day" and order == "desc"
-    month_desc = sort_by == "month" and order == "desc"
+    day_desc = sort_by == "day" and descending
+    month_desc = sort_by == "month" and descending
 
-    # Apply sorting to your queryset
-    sort_order = f"-{sort_by}" if order == "desc" else sort_by
-    hebrew_dates = calendar.calendarOf.all().order_by(sort_order)
+    hebrew_dates = calendar.calendarOf.all()
+    keys = EDIT_SORTS[sort_by]
 
     # Filter by month if provided
     if "month" in request.GET:
@@ -149,19 +288,34 @@ def calendar_edit_view(request: HttpRequest, uuid: UUID):
     if "day" in request.GET:
         hebrew_dates = hebrew_dates.filter(day__in=day_values)
 
-    # Additional filters can be added similarly
+    # Search results are ranked rather than sorted.
     if search_query:
-        hebrew_dates = hebrew_dates.filter(name__icontains=search_query)
+        hebrew_dates = search(hebrew_dates, search_query)
+        keys = SEARCH_KEYS
+        descending = False
 
     if event_type:
         hebrew_dates = hebrew_dates.filter(event_type=event_type)
 
+    # Apply sorting to your queryset
+    hebrew_dates = hebrew_dates.order_by(
+        *keyset_ordering(keys, descending=descending),
+    )
+
+    page, next_page_url = edit_page(
+        request,
+        hebrew_dates,
+        keys,
+        descending=descending,
+    )
+
     context = {
         "calendar": calendar,
         "month_choices": month_choices,
         "day_choices": day_choices,
         "event_choices": event_choices,
-        "hebrew_dates": hebrew_dates,
+        "hebrew_dates": page,
+        "next_page_url": next_page_url,
         "selected_months": month_values,
         "selected_days": day_values,
         "day_desc": day_desc,
@@ -176,7 +330,10 @@ def calendar_edit_view(request: HttpRequest, uuid: UUID):
     )
 
     if hasattr(request, "htmx") and request.htmx:
-        log_msg = "search_query: %s | Month: %s | Day: %s | Sort: %s | Order: %s"
+        after = request.GET.get("after", "")
+        log_msg = (
+            "search_query: %s | Month: %s | Day: %s | Sort: %s | Order: %s | After: %s"
+        )
         logger.info(
             log_msg,
             search_query,
@@ -184,7 +341,10 @@ def calendar_edit_view(request: HttpRequest, uuid: UUID):
             day_values,
             sort_by,
             order,
+            after,
         )
+        if after:
+            return render(request, "hebcal/_hebrew_date_rows.html", context)
         return render(request, "hebcal/_calendar_table.html", context)
     return render(request, "hebcal/calendar_edit.html", context)
 
@@ -353,15 +513,86 @@ def serve_pixel(request, pixel_id: UUID, pk: int):
     return HttpResponse(base64.b64decode(pixel_data), content_type="image/png")
 
 
-@cache_page(60 * 60)  # Cache the page for 15 minutes
-def calendar_file(request, uuid: UUID):
-    x_forwarded_for = request.headers.get("x-forwarded-for")
-    ip = (
-        x_forwarded_for.split(",")[0]
-        if x_forwarded_for
-        else request.META.get("REMOTE_ADDR")
+def _get_years_param(request: HttpRequest, name: str, default: int, maximum: int):
+    value = request.GET.get(name, "")
+    if value == "":
+        return default
+    try:
+        years = int(value)
+    except ValueError:
+        logger.warning("Invalid %s value: %s", name, value)
+        return default
+    return min(max(years, 0), maximum)
+
+
+def get_feed_horizon(request: HttpRequest) -> Horizon:
+    """The ``?past=`` / ``?future=`` years requested, clamped to the server limits."""
+    return Horizon(
+        past=_get_years_param(
+            request,
+            "past",
+            DEFAULT_HORIZON.past,
+            settings.HEBCAL_FEED_MAX_PAST_YEARS,
+        ),
+        future=_get_years_param(
+            request,
+            "future",
+            DEFAULT_HORIZON.future,
+            settings.HEBCAL_FEED_MAX_FUTURE_YEARS,
+        ),
     )
-    user_agent = request.headers.get("user-agent", "")
+
+
+def _get_date_param(request: HttpRequest, name: str) -> date | None:
+    value = request.GET.get(name, "")
+    if value == "":
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        logger.warning("Invalid %s value: %s", name, value)
+        return None
+
+
+def get_feed_window(request: HttpRequest, horizon: Horizon) -> DateWindow | None:
+    """
+    The ``?start=`` / ``?end=`` dates requested, if any.
+
+    ``start`` defaults to today. ``?days=`` is shorthand for an ``end`` that
+    many days after ``start``; without either, the window runs to the end
+    of ``horizon``.
+    """
+    start = _get_date_param(request, "start")
+    end = _get_date_param(request, "end")
+    days = request.GET.get("days", "")
+    if start is None and end is None and days == "":
+        return None
+    start = start or ConversionTable.today()
+    if end is None and days != "":
+        try:
+            # No window is longer than the longest horizon, at 385 days a year.
+            max_days = 385 * (
+                settings.HEBCAL_FEED_MAX_PAST_YEARS
+                + settings.HEBCAL_FEED_MAX_FUTURE_YEARS
+                + 1
+            )
+            end = start + timedelta(days=min(max(int(days), 1), max_days) - 1)
+        except (ValueError, OverflowError):
+            logger.warning("Invalid days value: %s", days)
+    if end is None:
+        current_year = ConversionTable.current_year()
+        end = date.fromordinal(new_year(current_year + horizon.future + 1) - 1)
+    return DateWindow(start, end)
+
+
+def should_stream_feed(calendar: Calendar) -> bool:
+    """Whether ``calendar`` is big enough to stream."""
+    threshold = settings.HEBCAL_FEED_STREAMING_MIN_EVENTS
+    return bool(threshold) and calendar.calendarOf.count() >= threshold
+
+
+def get_feed_options(request: HttpRequest) -> FeedOptions:
+    """The feed a request asks for."""
     alarm_trigger_hours = request.GET.get("alarm", "9")
     if alarm_trigger_hours == "":
         alarm_trigger_hours = "9"
@@ -369,37 +600,447 @@ def calendar_file(request, uuid: UUID):
         alarm_trigger = timedelta(hours=int(alarm_trigger_hours))
     except ValueError:
         logger.warning("Invalid alarm trigger value: %s", alarm_trigger_hours)
-        alarm_trigger = timedelta(hours=9)
-
-    calendar: Calendar = get_object_or_404(
-        Calendar.objects.filter(uuid=uuid).prefetch_related("calendarOf"),
+        alarm_trigger = DEFAULT_ALARM_TRIGGER
+    client = detect_client(
+        request.headers.get("user-agent", ""),
+        request.GET.get("client"),
+    )
+    # ?expirimental forces the compact form for any client.
+    if request.GET.get("expirimental", False):
+        variant = FeedVariant.COMPACT
+    else:
+        variant = client.variant
+    horizon = get_feed_horizon(request)
+    window = get_feed_window(request, horizon)
+    if window is not None:
+        # Only the years the window touches, within the server limits.
+        window_horizon = window.horizon(ConversionTable.current_year())
+        horizon = Horizon(
+            past=min(window_horizon.past, settings.HEBCAL_FEED_MAX_PAST_YEARS),
+            future=min(window_horizon.future, settings.HEBCAL_FEED_MAX_FUTURE_YEARS),
+        )
+    return FeedOptions(alarm_trigger, horizon, client, variant, window)
+
+
+class FeedVersion(NamedTuple):
+    calendar_id: int
+    # Digest of everything the feed's bytes depend on (except the encoding).
+    key: str
+    last_modified: datetime
+
+    @property
+    def etag(self) -> str:
+        # Weak: the same feed is served in several content encodings.
+        return f'W/"{self.key}"'
+
+
+def get_feed_version(uuid: UUID, options: FeedOptions) -> FeedVersion | None:
+    """
+    The version of the requested feed, or ``None`` if there is no calendar.
+
+    Costs one query of the calendar row alone, so conditional requests are
+    answered before anything is generated. ``last_modified`` doubles as the
+    feed's DTSTAMP.
+    """
+    calendar = Calendar.objects.filter(uuid=uuid).only("pk", "modified").first()
+    if calendar is None:
+        return None
+    last_modified = calendar.get_feed_last_modified()
+    if options.window is not None:
+        # A window without ?start= starts today, so its feed changes daily.
+        window_start = min(options.window.start, ConversionTable.today())
+        last_modified = max(
+            last_modified,
+            datetime(
+                window_start.year,
+                window_start.month,
+                window_start.day,
+                tzinfo=UTC,
+            ),
+        )
+    key = f"{uuid}|{last_modified.isoformat()}|{options.key}"
+    return FeedVersion(
+        calendar.pk,
+        sha1(key.encode(), usedforsecurity=False).hexdigest(),
+        last_modified,
     )
 
-    logger.info(
-        "Calendar file requested for %s with ip %s User-Agent %s, Alarm: %s",
-        calendar.name,
-        ip,
-        user_agent,
-        alarm_trigger,
+
+def with_feed_headers(
+    response: HttpResponseBase,
+    encoding: str,
+    cache_status: str,
+) -> HttpResponseBase:
+    if encoding != IDENTITY:
+        response["Content-Encoding"] = encoding
+    # "hit" (feed cache), "stored" (materialized feed) or "miss" (generated).
+    response["X-Feed-Cache"] = cache_status
+    return response
+
+
+def stored_feed(
+    calendar: Calendar,
+    options: FeedOptions,
+    encoding: str,
+) -> bytes | None:
+    """The calendar's materialized feed, if it is the one requested and fresh."""
+    if not options.is_canonical:
+        return None
+    if calendar.has_fresh_feed():
+        return calendar.get_materialized_feed(encoding)
+    if calendar.calendar_file_generated is not None:
+        # Stored before this Hebrew year began. (Writes clear the timestamp
+        # and queue their own refresh.)
+        refresh_calendar_feed.delay(calendar.pk)
+    return None
+
+
+def streamed_feed(
+    calendar: Calendar,
+    options: FeedOptions,
+    version: FeedVersion,
+    encoding: str,
+    cache_key: str,
+) -> HttpResponseBase:
+    """
+    The feed generated from the calendar's events, its VEVENTs sent as they
+    are serialized instead of building the whole feed in memory, and cached
+    under ``cache_key`` once sent.
+    """
+    chunks = iter_ical(calendar, options, version.last_modified)
+    response = StreamingHttpResponse(
+        feed_cache.tee(cache_key, compress_stream(chunks, encoding)),
+        content_type="text/calendar",
+    )
+    return with_feed_headers(response, encoding, "miss")
+
+
+def generated_feed(
+    calendar: Calendar,
+    options: FeedOptions,
+    version: FeedVersion,
+    encoding: str,
+    cache_key: str,
+) -> HttpResponseBase:
+    """The feed generated from the calendar's events, cached under ``cache_key``."""
+    body = generate_ical(calendar, options, version.last_modified).encode()
+    if encoding != IDENTITY:
+        body = compress(body, encoding)
+    feed_cache.set(cache_key, body)
+    response = HttpResponse(body, content_type="text/calendar")
+    return with_feed_headers(response, encoding, "miss")
+
+
+def feed_response(
+    request: HttpRequest,
+    uuid: UUID,
+    options: FeedOptions,
+    version: FeedVersion,
+) -> HttpResponseBase:
+    """
+    The feed from the feed cache, else the calendar's stored feed, else
+    generated.
+
+    Feeds are compressed once, when stored or cached, in the best encoding
+    the client accepts; streamed feeds can only be gzipped, so they are
+    cached, and looked up, in that encoding. Writes invalidate every cached
+    variant (signals.py), and the feed's version is part of the key, so an
+    entry can't outlive its version even if an invalidation is lost; the
+    Hebrew year is part of the key so the window rolls over too.
+    """
+    accept_encoding = request.headers.get("accept-encoding", "")
+    encoding = negotiate_encoding(accept_encoding)
+    stream_encoding = negotiate_encoding(accept_encoding, (GZIP,))
+    variant = f"{ConversionTable.current_year()}:{version.key}"
+    cache_keys = {
+        key_encoding: feed_cache.key(version.calendar_id, variant, key_encoding)
+        for key_encoding in dict.fromkeys((encoding, stream_encoding))
+    }
+    for key_encoding, cache_key in cache_keys.items():
+        feed = feed_cache.get(cache_key)
+        if feed is not None:
+            response = HttpResponse(feed, content_type="text/calendar")
+            return with_feed_headers(response, key_encoding, "hit")
+    calendar = get_object_or_404(
+        Calendar.objects.defer(*Calendar.MATERIALIZED_FEED_FIELDS.values()),
+        uuid=uuid,
+    )
+    feed = stored_feed(calendar, options, encoding)
+    if feed is not None:
+        feed_cache.set(cache_keys[encoding], feed)
+        response = HttpResponse(feed, content_type="text/calendar")
+        return with_feed_headers(response, encoding, "stored")
+    if should_stream_feed(calendar):
+        return streamed_feed(
+            calendar,
+            options,
+            version,
+            stream_encoding,
+            cache_keys[stream_encoding],
+        )
+    return generated_feed(calendar, options, version, encoding, cache_keys[encoding])
+
+
+# The feed variant depends on the client, its encoding on Accept-Encoding.
+@vary_on_headers("User-Agent", "Accept-Encoding")
+def calendar_file(request: HttpRequest, uuid: UUID) -> HttpResponseBase:
+    options = get_feed_options(request)
+    version = get_feed_version(uuid, options)
+    if version is None:
+        msg = "No calendar matches the given query."
+        raise Http404(msg)
+    last_modified = int(version.last_modified.timestamp())
+    # Answers If-None-Match / If-Modified-Since before anything is loaded.
+    response: HttpResponseBase | None = get_conditional_response(
+        request,
+        etag=version.etag,
+        last_modified=last_modified,
     )
-    expirimental = request.GET.get("expirimental", False)
-    if expirimental:
-        calendar_str = generate_ical_experimental(
-            model_calendar=calendar,
-            user_agent=user_agent,
-            alarm_trigger=alarm_trigger,
+    if response is None:
+        x_forwarded_for = request.headers.get("x-forwarded-for")
+        ip = (
+            x_forwarded_for.split(",")[0]
+            if x_forwarded_for
+            else request.META.get("REMOTE_ADDR")
         )
+        logger.info(
+            "Calendar file requested for %s with ip %s User-Agent %s, Alarm: %s, "
+            "Horizon: %s, Window: %s, Client: %s, Variant: %s",
+            uuid,
+            ip,
+            request.headers.get("user-agent", ""),
+            options.alarm_trigger,
+            options.horizon,
+            options.window,
+            options.client.name,
+            options.variant,
+        )
+        response = feed_response(request, uuid, options, version)
+        response["Content-Disposition"] = f'attachment; filename="{uuid}.ics"'
+        patch_response_headers(response, FEED_MAX_AGE)
+    response["ETag"] = version.etag
+    response["Last-Modified"] = http_date(last_modified)
+    return response
+
+
+def calendar_sync(request: HttpRequest, uuid: UUID):
+    """
+    The calendar's events changed since ``?token=``, or all of them without one.
+
+    Answers JSON: ``sync_token`` to send next time, ``updated`` mapping the
+    UID suffix of each created or modified event to its VEVENTs (one per
+    occurrence, with UID ``<date><suffix>``), and ``deleted`` listing the UID
+    suffixes of events that no longer exist. Feed options (``?alarm=``,
+    ``?client=``, ...) apply as for :func:`calendar_file`. A malformed or
+    expired token, or a deleted calendar, gets 410 Gone: the client should
+    drop what it synced and start again without a token.
+    """
+    alarm_trigger, horizon, _, variant, _ = get_feed_options(request)
+    # Taken before reading events, so a write racing this request is at worst
+    # sent again next time.
+    token = sync.current_token(uuid)
+    calendar = Calendar.objects.filter(uuid=uuid).only("pk", "modified").first()
+    if calendar is None:
+        if HebrewDateChange.objects.filter(
+            calendar_uuid=uuid,
+            hebrew_date_id__isnull=True,
+        ).exists():
+            return JsonResponse({"error": "calendar-deleted"}, status=HTTPStatus.GONE)
+        msg = "No calendar matches the given query."
+        raise Http404(msg)
+
+    since = request.GET.get("token", "")
+    if since:
+        since_token = sync.SyncToken.parse(since)
+        if since_token is None or not sync.is_valid_token(since_token):
+            logger.info("Rejected sync token %s for calendar %s", since, uuid)
+            return JsonResponse(
+                {"error": "invalid-sync-token"},
+                status=HTTPStatus.GONE,
+            )
+        updated, deleted = sync.changes_since(calendar.pk, uuid, since_token)
     else:
-        calendar_str = generate_ical(
-            model_calendar=calendar,
-            user_agent=user_agent,
-            alarm_trigger=alarm_trigger,
+        updated, deleted = calendar.calendarOf.all(), []
+    rows = updated.feed_rows(horizon)
+    logger.info(
+        "Calendar sync for %s since %s: %s updated, %s deleted",
+        uuid,
+        since or "the start",
+        len(rows),
+        len(deleted),
+    )
+    return JsonResponse(
+        {
+            "sync_token": str(token),
+            "updated": render_row_events(
+                rows,
+                alarm_trigger,
+                calendar.get_feed_last_modified(),
+                variant,
+            ),
+            "deleted": [uid_hash + MYHEBREWDATES_DOMAIN for uid_hash in deleted],
+        },
+    )
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class CalendarDavView(View):
+    """
+    Read-only CalDAV access to a calendar (the collection) and its events
+    (``<pk>.ics`` resources); see ``caldav.py``.
+
+    Supports PROPFIND at depth 0 and 1, the calendar-query (with an optional
+    VEVENT time-range) and calendar-multiget REPORTs, and GET on resources.
+    Anything that would write is refused with 405.
+    """
+
+    http_method_names = ["get", "head", "options", "propfind", "report"]
+
+    def get_calendar(self) -> Calendar:
+        return get_object_or_404(
+            Calendar.objects.defer(
+                *Calendar.MATERIALIZED_FEED_FIELDS.values(),
+            ),
+            uuid=self.kwargs["uuid"],
         )
 
-    response = HttpResponse(calendar_str, content_type="text/calendar")
-    response["Content-Disposition"] = f'attachment; filename="{uuid}.ics"'
+    def get_rows(
+        self,
+        calendar: Calendar,
+        pks: Iterable[int] | None = None,
+        window: DateWindow | None = None,
+    ) -> list[tuple[FeedRow, list[date]]]:
+        hebrew_dates = calendar.calendarOf.order_by("pk")
+        if pks is not None:
+            hebrew_dates = hebrew_dates.filter(pk__in=pks)
+        # The window only selects events; a resource always has all its dates.
+        return [
+            (hebrew_date, english_dates)
+            for hebrew_date, english_dates in hebrew_dates.feed_rows()
+            if english_dates
+            and (window is None or any(map(window.includes, english_dates)))
+        ]
+
+    def resource_url(self, pk: int) -> str:
+        return reverse("hebcal:calendar_dav_event", args=[self.kwargs["uuid"], pk])
+
+    def resource_responses(
+        self,
+        rows: list[tuple[FeedRow, list[date]]],
+        requested: list[str] | None,
+    ) -> list[caldav.DavResponse]:
+        current_year = ConversionTable.current_year()
+        # RFC 4791 keeps calendar-data out of allprop.
+        resources: list[str] | list[None]
+        if requested is not None and caldav.CALENDAR_DATA in requested:
+            resources = render_event_resources(rows)
+        else:
+            resources = [None] * len(rows)
+        return [
+            caldav.DavResponse(
+                self.resource_url(hebrew_date.pk),
+                caldav.resource_props(
+                    caldav.resource_etag(hebrew_date, current_year),
+                    resource,
+                ),
+            )
+            for (hebrew_date, _), resource in zip(rows, resources, strict=True)
+        ]
+
+    def multistatus(
+        self,
+        responses: list[caldav.DavResponse],
+        requested: list[str] | None,
+    ) -> HttpResponse:
+        return HttpResponse(
+            caldav.multistatus(responses, requested),
+            status=HTTPStatus.MULTI_STATUS,
+            content_type='application/xml; charset="utf-8"',
+        )
 
-    return response
+    def options(self, request, *args, **kwargs):
+        response = super().options(request, *args, **kwargs)
+        response["DAV"] = "1, calendar-access"
+        return response
+
+    def get(self, request, *args, **kwargs):
+        calendar = self.get_calendar()
+        pk = kwargs.get("pk")
+        if pk is None:
+            return redirect("hebcal:calendar_file", uuid=calendar.uuid)
+        rows = self.get_rows(calendar, [pk])
+        if not rows:
+            msg = "No event matches the given query."
+            raise Http404(msg)
+        hebrew_date, _ = rows[0]
+        etag = caldav.resource_etag(hebrew_date, ConversionTable.current_year())
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(
+                render_event_resources(rows)[0],
+                content_type=caldav.RESOURCE_CONTENT_TYPE,
+            )
+        response["ETag"] = etag
+        return response
+
+    def propfind(self, request, *args, **kwargs):
+        try:
+            requested = caldav.parse_propfind(request.body)
+        except caldav.BadRequestError as error:
+            return HttpResponseBadRequest(str(error))
+        calendar = self.get_calendar()
+        pk = kwargs.get("pk")
+        if pk is not None:
+            rows = self.get_rows(calendar, [pk])
+            if not rows:
+                msg = "No event matches the given query."
+                raise Http404(msg)
+            return self.multistatus(
+                self.resource_responses(rows, requested),
+                requested,
+            )
+        responses = [
+            caldav.DavResponse(request.path, caldav.collection_props(calendar)),
+        ]
+        if request.headers.get("depth", "infinity") != "0":
+            responses += self.resource_responses(self.get_rows(calendar), requested)
+        return self.multistatus(responses, requested)
+
+    def report(self, request, *args, **kwargs):
+        try:
+            report = caldav.parse_report(request.body)
+        except caldav.BadRequestError as error:
+            return HttpResponseBadRequest(str(error))
+        calendar = self.get_calendar()
+        if report.tag == caldav.CALENDAR_QUERY:
+            return self.multistatus(
+                self.resource_responses(
+                    self.get_rows(calendar, window=report.window),
+                    report.props,
+                ),
+                report.props,
+            )
+        # calendar-multiget: answer every href, 404 for unknown ones.
+        hrefs = {}
+        for href in report.hrefs:
+            name = urlsplit(href).path.rsplit("/", 1)[-1]
+            pk = name.removesuffix(".ics")
+            hrefs[href] = int(pk) if pk.isdigit() and name.endswith(".ics") else None
+        rows = self.get_rows(calendar, [pk for pk in hrefs.values() if pk])
+        found = {
+            response.href: response
+            for response in self.resource_responses(rows, report.props)
+        }
+        return self.multistatus(
+            [
+                found.get(
+                    self.resource_url(pk) if pk else "",
+                    caldav.DavResponse(href, None),
+                )
+                for href, pk in hrefs.items()
+            ],
+            report.props,
+        )
 
 
 @requires_htmx